@@ -24,6 +24,11 @@ requires = [
     'requests',
     'clinlog'
 ]
+extras_requires = {
+    'fastjson': ['orjson'],
+    'zstd': ['zstandard'],
+    'columnar': ['numpy']
+}
 setup(
     name=about['__title__'],
     version=about['__version__'],
@@ -34,6 +39,7 @@ setup(
     author_email=about['__author_email__'],
     url=about['__url__'],
     install_requires=requires,
+    extras_require=extras_requires,
     license=about['__license__'],
     packages=find_packages(exclude=('tests', 'tests.*', 'assets', 'venv', 'examples'))
 )
@@ -5,6 +5,9 @@ import unittest
 import unittest.mock as mock
 
 from transpydata.config.datainput import MysqlDataInput
+from transpydata.util.batches import RecordBatch
+from transpydata.util.predicates import Predicate
+from transpydata.util.records import Record
 
 
 class TestMysqlDataInput(unittest.TestCase):
@@ -38,6 +41,129 @@ class TestMysqlDataInput(unittest.TestCase):
 
         mysql_input.dispose()
 
+    def test_predicates_pushed_down(self):
+        mysql_input = MysqlDataInput({
+            'db_config': {},
+            'get_all_query': 'SELECT * FROM module WHERE credits <= %(credits)s;',
+            'all_query_params': {'credits': 10}
+        })
+
+        applied = mysql_input.push_down_predicates([
+            Predicate('module_Id', 'in', ['CS101', None]),
+            Predicate('module_name', 'not_null'),
+            Predicate('credits', '>', 5)
+        ])
+
+        with mock.patch.object(mysql_input, '_fetch_all_query') as fetch_all:
+            mysql_input.get_all()
+
+        self.assertTrue(applied)
+        fetch_all.assert_called_once_with(
+            'SELECT * FROM (SELECT * FROM module WHERE credits <= %(credits)s) '
+            'AS _tpd_filtered WHERE `module_Id` IN (%(_tpd_p0)s) '
+            'AND `module_name` IS NOT NULL AND `credits` > %(_tpd_p1)s',
+            {'credits': 10, '_tpd_p0': 'CS101', '_tpd_p1': 5}
+        )
+        self.assertFalse(mysql_input.push_down_predicates([
+            Predicate('user.name', '==', 'Ikora')
+        ]))
+
+    def test_compact_records(self):
+        mysql_input = MysqlDataInput({
+            'db_config': {},
+            'get_all_query': 'SELECT * FROM module',
+            'compact_records': True
+        })
+        mysql_input._db_connection = mock.Mock()
+        cursor = mysql_input._db_connection.cursor.return_value
+        cursor.column_names = ('module_Id', 'credits')
+        cursor.fetchall.return_value = [('CS101', 10), ('CS102', 20)]
+
+        data = mysql_input.get_all()
+
+        mysql_input._db_connection.cursor.assert_called_once_with(dictionary=False)
+        self.assertIsInstance(data[0], Record)
+        self.assertIs(data[0].schema, data[1].schema)
+        self.assertEqual([{'module_Id': 'CS101', 'credits': 10},
+                          {'module_Id': 'CS102', 'credits': 20}], data)
+
+    def test_record_batches(self):
+        mysql_input = MysqlDataInput({
+            'db_config': {},
+            'get_all_query': 'SELECT * FROM module',
+            'record_batches': True
+        })
+        mysql_input._db_connection = mock.Mock()
+        cursor = mysql_input._db_connection.cursor.return_value
+        cursor.column_names = ('module_Id', 'credits')
+        cursor.fetchall.return_value = [('CS101', 10), ('CS102', 20)]
+
+        data = mysql_input.get_all()
+
+        self.assertIsInstance(data, RecordBatch)
+        self.assertEqual([10, 20], data.column('credits'))
+
+    def test_iter_all(self):
+        mysql_input = MysqlDataInput({
+            'db_config': {},
+            'get_all_query': 'SELECT * FROM module',
+            'compact_records': True,
+            'fetch_size': 2
+        })
+        mysql_input._db_connection = mock.Mock()
+        cursor = mysql_input._db_connection.cursor.return_value
+        cursor.column_names = ('module_Id', 'credits')
+        cursor.fetchmany.side_effect = [[('CS101', 10), ('CS102', 20)],
+                                        [('CS103', 30)], []]
+
+        data = list(mysql_input.iter_all())
+
+        cursor.fetchmany.assert_called_with(2)
+        cursor.fetchall.assert_not_called()
+        cursor.close.assert_called_once()
+        self.assertIsInstance(data[2], Record)
+        self.assertEqual(['CS101', 'CS102', 'CS103'], [d['module_Id'] for d in data])
+
+    def test_checkpoint_keyset(self):
+        mysql_input = MysqlDataInput({
+            'db_config': {},
+            'get_one_query': 'SELECT * FROM module WHERE module_Id = %(id)s',
+            'get_all_query': 'SELECT * FROM module',
+            'checkpoint_key': 'module_Id'
+        })
+
+        with mock.patch.object(mysql_input, '_fetch_all_query') as fetch_all:
+            mysql_input.get_all()
+
+        fetch_all.assert_called_once_with(
+            'SELECT * FROM (SELECT * FROM module) AS _tpd_filtered '
+            'ORDER BY `module_Id`', {}
+        )
+
+        state = mysql_input.checkpoint_state({'module_Id': 'CS101', 'credits': 10})
+        resumed = mysql_input.restore_checkpoint(state)
+        mysql_input.push_down_predicates([Predicate('credits', '<=', 10)])
+
+        with mock.patch.object(mysql_input, '_fetch_all_query') as fetch_all:
+            mysql_input.get_all()
+
+        self.assertTrue(resumed)
+        fetch_all.assert_called_once_with(
+            'SELECT * FROM (SELECT * FROM module) AS _tpd_filtered '
+            'WHERE `credits` <= %(_tpd_p0)s AND `module_Id` > %(_tpd_resume)s '
+            'ORDER BY `module_Id`',
+            {'_tpd_p0': 10, '_tpd_resume': 'CS101'}
+        )
+
+        with mock.patch.object(mysql_input, '_fetch_one_query') as fetch_one:
+            mysql_input.get_one({'id': 'CS100'})
+
+        fetch_one.assert_called_once_with(
+            'SELECT * FROM (SELECT * FROM module WHERE module_Id = %(id)s) '
+            'AS _tpd_filtered WHERE `credits` <= %(_tpd_p0)s',
+            {'id': 'CS100', '_tpd_p0': 10}
+        )
+
     def _get_input_config(self):
         return {
         'db_config': {
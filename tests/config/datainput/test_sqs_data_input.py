@@ -1,10 +1,12 @@
 import unittest
+import tempfile
 import os
 import json
 
 import boto3
 
 from transpydata.config.datainput import SQSDataInput
+from transpydata.config.dataoutput import SQSDataOutput
 
 class TestSqsDataInput(unittest.TestCase):
 
@@ -54,6 +56,40 @@ class TestSqsDataInput(unittest.TestCase):
         self.assertEqual(2, len(sqs_msgs))
         self.assertDictEqual(msg1, sqs_msgs[1][SQSDataInput.BODY_KEY])
 
+    def test_compressed_and_claim_checked_msgs(self):
+        with tempfile.TemporaryDirectory() as blob_dir:
+            sqs_dataoutput = SQSDataOutput({
+                'url': 'http://sqs.test/queue',
+                'attributes': {'attr1': 'attr1'},
+                'compression': 'zlib',
+                'compression_threshold': 0,
+                'blob_store': blob_dir,
+                'claim_check_threshold': 200
+            })
+            sqs_datainput = SQSDataInput({
+                'url': 'http://sqs.test/queue',
+                'parse_body_as_json': True,
+                'blob_store': blob_dir
+            })
+
+            small_msg = self._get_test_msg()
+            big_msg = {**self._get_test_msg(), 'bio': os.urandom(512).hex()}
+            for msg in [small_msg, big_msg]:
+                sqs_msg = sqs_dataoutput._get_sqs_message_data({**msg, 'attr1': '12'})
+
+                self.assertIn(SQSDataOutput.ENCODING_ATTR, sqs_msg['MessageAttributes'])
+                self.assertNotEqual(json.dumps(msg), sqs_msg['MessageBody'])
+
+                res = sqs_datainput._process_msg({
+                    'Body': sqs_msg['MessageBody'],
+                    'MessageAttributes': sqs_msg['MessageAttributes']
+                })
+
+                self.assertDictEqual(msg, res[SQSDataInput.BODY_KEY])
+                self.assertDictEqual({'attr1': '12'}, res[SQSDataInput.ATTR_KEY])
+
+            self.assertEqual(1, len(os.listdir(blob_dir)))
+
     def _post_msg_to_sqs(self, sqs_queue: str, msg: dict, attributes: dict = {}):
         sqs_client = boto3.client('sqs', endpoint_url = self.BASE_URL)
 
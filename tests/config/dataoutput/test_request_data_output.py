@@ -1,6 +1,10 @@
 from typing import Tuple
 import sys
 import json
+import gzip
+import zlib
+import time
+import threading
 import unittest
 import unittest.mock as mock
 
@@ -22,7 +26,7 @@ class TestRequestDataOutput(unittest.TestCase):
         data = self._get_dummy_payload()
         res = request_output.send_one(data)
 
-        requests_mock.request.assert_called_once()
+        requests_mock.Session.return_value.request.assert_called_once()
 
         req_data = self._get_request_mock_call_data(requests_mock)
 
@@ -43,13 +47,57 @@ class TestRequestDataOutput(unittest.TestCase):
         data = self._get_dummy_payload()
         request_output.send_one(data)
 
-        request_mock.request.assert_called_once()
+        request_mock.Session.return_value.request.assert_called_once()
 
         req_data = self._get_request_mock_call_data(request_mock)
         self.assertEqual('http://testurl.net/category/character/hunters',
                          req_data['url'])
         self.assertEqual(data[config['query_params'][0]],
                          req_data['query_params'][config['query_params'][0]])
+        self.assertDictEqual({'weapon': 'Ace of spades'}, req_data['data'])
+
+        # Query params without value are kept in the payload
+        request_output.send_one({**data, 'name': None})
+        req_data = self._get_request_mock_call_data(request_mock)
+        self.assertDictEqual({}, req_data['query_params'])
+        self.assertDictEqual({'name': None, 'weapon': 'Ace of spades'},
+                             req_data['data'])
+
+    def test_url_values_encoded(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        request_output.configure({
+            'url': 'http://testurl.net/{category}/{id}?weapon={weapon}',
+            'encode_json': True
+        })
+
+        data = {**self._get_dummy_payload(), 'id': 6}
+        request_output.send_one(data)
+
+        req_data = self._get_request_mock_call_data(request_mock)
+        self.assertEqual('http://testurl.net/character/6?weapon=Ace%20of%20spades',
+                         req_data['url'])
+        self.assertDictEqual({'name': 'Cade-6', 'class': 'hunters'},
+                             json.loads(req_data['data']))
+        self.assertEqual(6, data['id'])
+
+    def test_inplace_payload(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        request_output.configure({
+            'url': 'http://testurl.net/category/{category}',
+            'query_params': ['name']
+        })
+        request_output.set_records_owned(True)
+
+        data = self._get_dummy_payload()
+        request_output.send_one(data)
+
+        req_data = self._get_request_mock_call_data(request_mock)
+        self.assertIs(data, req_data['data'])
+        self.assertDictEqual({'weapon': 'Ace of spades', 'class': 'hunters'}, data)
 
     def test_json_response_parse(self):
         request_mock = self._get_requests_module_mock()
@@ -67,13 +115,200 @@ class TestRequestDataOutput(unittest.TestCase):
 
         out_res = request_output.send_one(data)
 
-        request_mock.request.assert_called_once()
-        request_mock.request.return_value.json.assert_called_once()
+        request_mock.Session.return_value.request.assert_called_once()
+        request_mock.Session.return_value.request.return_value.json.assert_called_once()
+
+    def test_session_pooling(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        config = {
+            'url': 'http://testurl.net/category',
+            'pool_maxsize': 4,
+            'keep_alive': False
+        }
+        request_output.configure(config)
+        request_output.initialize()
+
+        request_output.send_one(self._get_dummy_payload())
+        request_output.send_one(self._get_dummy_payload())
+
+        request_mock.Session.assert_called_once()
+        adapter_kwargs = request_mock.adapters.HTTPAdapter.call_args[1]
+        self.assertEqual(4, adapter_kwargs['pool_maxsize'])
+
+        session_mock = request_mock.Session.return_value
+        self.assertEqual('close', session_mock.headers['Connection'])
+        self.assertEqual(2, session_mock.request.call_count)
+
+        request_output.dispose()
+        session_mock.close.assert_called_once()
+
+    def test_concurrent_send_all(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        in_flight = {'current': 0, 'max': 0}
+        lock = threading.Lock()
+        def request(verb, url, **kwargs):
+            with lock:
+                in_flight['current'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['current'])
+            time.sleep(0.02)
+            with lock:
+                in_flight['current'] -= 1
+
+            res = mock.Mock()
+            res.status_code = 200
+            res.content = kwargs['params']['name']
+            return res
+
+        request_mock.Session.return_value.request.side_effect = request
+
+        request_output.configure({
+            'url': 'http://testurl.net/category',
+            'query_params': ['name'],
+            'concurrency': 4,
+            'timeout': 5
+        })
+        request_output.initialize()
+
+        data = [{**self._get_dummy_payload(), 'name': str(i)} for i in range(12)]
+        res = request_output.send_all(data)
+
+        self.assertEqual([str(i) for i in range(12)], [r['message'] for r in res])
+        self.assertLessEqual(in_flight['max'], 4)
+        self.assertGreater(in_flight['max'], 1)
+        self.assertEqual(5, request_mock.Session.return_value.request.call_args[1]['timeout'])
+
+        request_output.dispose()
+
+    def test_bulk_send_all(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        def request(verb, url, **kwargs):
+            records = json.loads(kwargs['data'])
+            res = mock.Mock()
+            res.status_code = 207
+            res.json.return_value = [r['name'] for r in records]
+            return res
+
+        request_mock.Session.return_value.request.side_effect = request
+
+        request_output.configure({
+            'url': 'http://testurl.net/category/{category}',
+            'bulk_url': 'http://testurl.net/bulk',
+            'bulk_size': 3,
+            'json_response': True
+        })
+
+        data = [{**self._get_dummy_payload(), 'name': str(i)} for i in range(7)]
+        res = request_output.send_all(data)
+
+        session_mock = request_mock.Session.return_value
+        self.assertEqual(3, session_mock.request.call_count)
+        self.assertEqual('http://testurl.net/bulk', session_mock.request.call_args[0][1])
+        self.assertEqual([{'code': 207, 'message': str(i)} for i in range(7)], res)
+
+        # Responses not split by record are shared, each record gets its dict
+        request_mock.Session.return_value.request.side_effect = None
+        request_mock.Session.return_value.request.return_value.json.return_value = 'ok'
+        res = request_output.send_all(data[:3])
+        self.assertEqual([{'code': 200, 'message': 'ok'}] * 3, res)
+        self.assertIsNot(res[0], res[1])
+
+    def test_response_modes(self):
+        request_mock = self._get_requests_module_mock()
+        response_mock = request_mock.Session.return_value.request.return_value
+        response_mock.iter_content.return_value = [b'<html>', b'...</html>']
+        response_mock.headers = {'x-id': '12'}
+        response_mock.json.return_value = {'data': {'items': [{'id': 7}]}}
+
+        request_output = self._get_request_data_output_instance(request_mock)
+        url = 'http://testurl.net/category'
+
+        request_output.configure({'url': url, 'response_mode': 'status'})
+        self.assertDictEqual({'code': 200, 'message': None},
+                             request_output.send_one(self._get_dummy_payload()))
+        self.assertTrue(request_mock.Session.return_value.request.call_args[1]['stream'])
+        response_mock.close.assert_called()
+
+        request_output.configure({'url': url, 'response_mode': 'headers'})
+        self.assertDictEqual({'x-id': '12'},
+                             request_output.send_one(self._get_dummy_payload())['message'])
+
+        request_output.configure({'url': url, 'response_mode': 'json_field',
+                                  'response_field': 'data.items.0.id'})
+        self.assertEqual(7, request_output.send_one(self._get_dummy_payload())['message'])
+        response_mock.json.side_effect = ValueError('Expecting value')
+        self.assertEqual([None, None],
+                         [r['message'] for r in request_output.send_all(
+                             [self._get_dummy_payload()] * 2)])
+        response_mock.json.side_effect = None
+
+        request_output.configure({'url': url, 'response_mode': 'full',
+                                  'response_max_bytes': 8})
+        self.assertEqual(b'<html>..',
+                         request_output.send_one(self._get_dummy_payload())['message'])
+
+    def test_request_compression(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        request_output.configure({
+            'url': 'http://testurl.net/category',
+            'encode_json': True,
+            'request_compression': 'gzip',
+            'request_compression_threshold': 100
+        })
+
+        request_output.send_one({'name': 'Cade-6'})
+        req_data = self._get_request_mock_call_data(request_mock)
+        self.assertNotIn('Content-Encoding', req_data['headers'])
+        self.assertDictEqual({'name': 'Cade-6'}, json.loads(req_data['data']))
+
+        payload = {'bio': 'Exo hunter ' * 20}
+        request_output.send_one(payload)
+        req_data = self._get_request_mock_call_data(request_mock)
+        self.assertEqual('gzip', req_data['headers']['Content-Encoding'])
+        self.assertDictEqual(payload, json.loads(gzip.decompress(req_data['data'])))
+
+    def test_bulk_stream(self):
+        request_mock = self._get_requests_module_mock()
+        request_output = self._get_request_data_output_instance(request_mock)
+
+        bodies = []
+        def request(verb, url, **kwargs):
+            bodies.append(zlib.decompress(b''.join(kwargs['data'])))
+            self.assertEqual('deflate', kwargs['headers']['Content-Encoding'])
+            res = mock.Mock()
+            res.status_code = 200
+            res.content = b'ok'
+            return res
+
+        request_mock.Session.return_value.request.side_effect = request
+
+        request_output.configure({
+            'url': 'http://testurl.net/category',
+            'bulk_url': 'http://testurl.net/bulk',
+            'bulk_size': 2,
+            'bulk_stream': True,
+            'request_compression': 'deflate'
+        })
+
+        data = [{'name': str(i)} for i in range(3)]
+        res = request_output.send_all(data)
+
+        self.assertEqual([data[:2], data[2:]], [json.loads(b) for b in bodies])
+        self.assertEqual(3, len(res))
 
     def _get_requests_module_mock(self, code=200, content='Message') -> mock.Mock:
         requests_mock = mock.Mock()
-        requests_mock.request.return_value.status_code = code
-        requests_mock.request.return_value.content = content
+        session_mock = requests_mock.Session.return_value
+        session_mock.headers = {}
+        session_mock.request.return_value.status_code = code
+        session_mock.request.return_value.content = content
 
         return requests_mock
 
@@ -89,7 +324,7 @@ class TestRequestDataOutput(unittest.TestCase):
         return RequestDataOutput()
 
     def _get_request_mock_call_data(self, requests_mock: mock.Mock):
-        args, kwargs = requests_mock.request.call_args
+        args, kwargs = requests_mock.Session.return_value.request.call_args
 
         return {
             'req_verb': args[0],
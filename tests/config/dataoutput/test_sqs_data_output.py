@@ -1,5 +1,6 @@
 from typing import Tuple
 import unittest
+import unittest.mock as mock
 import os
 import json
 from uuid import uuid4
@@ -81,6 +82,62 @@ class TestSqsDataOutput(unittest.TestCase):
 
         self.assertDictEqual(test_msg2, json.loads(sqs_msg_data['message']))
 
+    def test_buffered_send_one(self):
+        sqs_data_output = SQSDataOutput({
+            'url': 'http://sqs.test/queue',
+            'buffered': True,
+            'buffer_size': 2,
+            'max_linger': 0
+        })
+        sqs_client = self._mock_sqs_client(sqs_data_output)
+
+        first = sqs_data_output.send_one(self._get_test_msg())
+        self.assertFalse(first.done())
+        sqs_client.send_message_batch.assert_not_called()
+
+        second = sqs_data_output.send_one(self._get_test_msg())
+        third = sqs_data_output.send_one(self._get_test_msg())
+
+        sqs_client.send_message_batch.assert_called_once()
+        sqs_client.send_message.assert_not_called()
+        self.assertDictEqual({'success': True, 'message_id': 'msg-0'}, first.result())
+        self.assertDictEqual({'success': True, 'message_id': 'msg-1'}, second.result())
+        self.assertFalse(third.done())
+
+        sqs_data_output.dispose()
+
+        self.assertEqual(2, sqs_client.send_message_batch.call_count)
+        self.assertDictEqual({'success': True, 'message_id': 'msg-0'}, third.result())
+
+    def test_buffered_max_linger(self):
+        sqs_data_output = SQSDataOutput({
+            'url': 'http://sqs.test/queue',
+            'buffered': True,
+            'max_linger': 0.05
+        })
+        sqs_client = self._mock_sqs_client(sqs_data_output)
+        sqs_data_output.initialize()
+
+        result = sqs_data_output.send_one(self._get_test_msg())
+
+        self.assertDictEqual({'success': True, 'message_id': 'msg-0'},
+                             result.result(timeout=2))
+        sqs_client.send_message_batch.assert_called_once()
+
+        sqs_data_output.dispose()
+
+    def _mock_sqs_client(self, sqs_data_output: SQSDataOutput) -> mock.Mock:
+        def send_message_batch(QueueUrl, Entries):
+            return {'Successful': [
+                {'Id': e['Id'], 'MessageId': 'msg-' + e['Id']} for e in Entries
+            ]}
+
+        sqs_client = mock.Mock()
+        sqs_client.send_message_batch.side_effect = send_message_batch
+        sqs_data_output._sqs_client = sqs_client
+
+        return sqs_client
+
     def _get_sqs_message(self, sqs_queue_url: str) -> dict:
         sqs_client = boto3.client('sqs', endpoint_url=self.BASE_URL)
 
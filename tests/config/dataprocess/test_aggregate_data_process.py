@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from transpydata.config.dataprocess import AggregateDataProcess
+
+
+ORDERS = [
+    {'user': 'Cade-6', 'amount': 10, 'status': 'new', 'ts': 1},
+    {'user': 'Ikora', 'amount': 5, 'status': 'new', 'ts': 2},
+    {'user': 'Cade-6', 'amount': None, 'status': 'paid', 'ts': 3},
+    {'user': 'Zavala', 'amount': 7, 'status': 'new', 'ts': 4},
+    {'user': 'Cade-6', 'amount': 20, 'status': 'sent', 'ts': 5},
+    {'user': 'Ikora', 'amount': 1, 'status': 'paid', 'ts': 6}
+]
+
+AGGREGATIONS = {
+    'orders': {'op': 'count'},
+    'amounts': {'op': 'count', 'field': 'amount'},
+    'total': {'op': 'sum', 'field': 'amount'},
+    'avg': {'op': 'avg', 'field': 'amount'},
+    'min': {'op': 'min', 'field': 'amount'},
+    'first': {'op': 'first', 'field': 'status'},
+    'last': {'op': 'last', 'field': 'status'},
+    'status': {'op': 'latest', 'field': 'status', 'order_by': 'ts'}
+}
+
+EXPECTED = {
+    'Cade-6': {'user': 'Cade-6', 'orders': 3, 'amounts': 2, 'total': 30,
+               'avg': 15.0, 'min': 10, 'first': 'new', 'last': 'sent',
+               'status': 'sent'},
+    'Ikora': {'user': 'Ikora', 'orders': 2, 'amounts': 2, 'total': 6,
+              'avg': 3.0, 'min': 1, 'first': 'new', 'last': 'paid',
+              'status': 'paid'},
+    'Zavala': {'user': 'Zavala', 'orders': 1, 'amounts': 1, 'total': 7,
+               'avg': 7.0, 'min': 7, 'first': 'new', 'last': 'new',
+               'status': 'new'}
+}
+
+
+class TestAggregateDataProcess(unittest.TestCase):
+
+    def test_in_memory(self):
+        dataprocess = AggregateDataProcess({'group_by': ['user'],
+                                            'aggregations': AGGREGATIONS})
+
+        res = dataprocess.process_all(ORDERS)
+
+        self.assertEqual([EXPECTED['Cade-6'], EXPECTED['Ikora'],
+                          EXPECTED['Zavala']], res)
+        self.assertEqual(0, dataprocess.spills)
+
+    def test_spilled(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            dataprocess = AggregateDataProcess({'group_by': ['user'],
+                                                'aggregations': AGGREGATIONS,
+                                                'max_groups': 1,
+                                                'spill_dir': spill_dir})
+
+            res = dataprocess.process_all(ORDERS)
+
+            self.assertEqual(EXPECTED, {r['user']: r for r in res})
+            self.assertEqual(3, len(res))
+            self.assertEqual(6, dataprocess.spills)
+            self.assertEqual([], os.listdir(spill_dir))
+
+    def test_latest_unsorted(self):
+        records = [
+            {'user': 'Cade-6', 'status': 'new', 'ts': 5},
+            {'user': 'Ikora', 'status': 'new', 'ts': 2},
+            {'user': 'Cade-6', 'status': 'old', 'ts': 1},
+            {'user': 'Ikora', 'status': 'old', 'ts': 1}
+        ]
+        aggregations = {'status': {'op': 'latest', 'field': 'status',
+                                   'order_by': 'ts'}}
+        expected = {'Cade-6': 'new', 'Ikora': 'new'}
+
+        for max_groups in (100, 1):
+            with tempfile.TemporaryDirectory() as spill_dir:
+                dataprocess = AggregateDataProcess({'group_by': ['user'],
+                                                    'aggregations': aggregations,
+                                                    'max_groups': max_groups,
+                                                    'spill_dir': spill_dir})
+
+                res = dataprocess.process_all(records)
+
+            self.assertEqual(expected, {r['user']: r['status'] for r in res})
+            self.assertEqual(max_groups == 1, dataprocess.spills > 0)
+
+    def test_high_cardinality(self):
+        dataprocess = AggregateDataProcess({
+            'group_by': ['k', 'sub.k'],
+            'aggregations': {'n': {'op': 'count'}},
+            'max_groups': 100
+        })
+
+        res = dataprocess.process_all([{'k': i % 1000, 'sub': {'k': i % 2}}
+                                       for i in range(4000)])
+
+        self.assertEqual(1000, len(res))
+        self.assertTrue(all(r['n'] == 4 for r in res))
+        self.assertEqual({'k', 'sub.k', 'n'}, set(res[0]))
+
+    def test_process_one_not_supported(self):
+        dataprocess = AggregateDataProcess({'aggregations': AGGREGATIONS})
+
+        with self.assertRaises(RuntimeError):
+            dataprocess.process_one({})
+        self.assertFalse(dataprocess.is_record_wise())
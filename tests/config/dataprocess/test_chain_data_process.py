@@ -0,0 +1,81 @@
+import unittest
+import unittest.mock as mock
+from typing import List
+
+from transpydata.config.dataprocess import (
+    ChainDataProcess, FilterDataProcess, IDataProcess, NoneDataProcess,
+    TranslateDataProcess
+)
+
+
+class CountDataProcess(IDataProcess):
+    """ Not record wise process, adds the number of records to each one.
+    """
+    def configure(self, config: dict):
+        pass
+
+    def process_one(self, data: dict) -> dict:
+        return {**data, 'count': 1}
+
+    def process_all(self, data: List[dict]) -> List[dict]:
+        return [{**d, 'count': len(data)} for d in data]
+
+
+class TestChainDataProcess(unittest.TestCase):
+
+    def test_stages_fused(self):
+        first = TranslateDataProcess({'translations': {'name': 'userName'}})
+        second = TranslateDataProcess({'transformations': {'userName': str.upper}})
+        count = CountDataProcess()
+        last = NoneDataProcess()
+
+        chain = ChainDataProcess({'stages': [first, second, count, last]})
+
+        with mock.patch.object(first, 'process_all') as first_all, \
+             mock.patch.object(second, 'process_all') as second_all:
+            res = chain.process_all([{'name': 'Cade-6'}, {'name': 'Ikora'}])
+
+            first_all.assert_not_called()
+            second_all.assert_not_called()
+
+        self.assertEqual([
+            {'userName': 'CADE-6', 'count': 2},
+            {'userName': 'IKORA', 'count': 2}
+        ], res)
+        self.assertFalse(chain.is_record_wise())
+        self.assertEqual([[first, second], [count], [last]], chain._segments)
+
+    def test_process_one(self):
+        chain = ChainDataProcess({'stages': [
+            TranslateDataProcess({'translations': {'name': 'userName'}}),
+            CountDataProcess()
+        ]})
+
+        self.assertDictEqual({'userName': 'Cade-6', 'count': 1},
+                             chain.process_one({'name': 'Cade-6'}))
+
+    def test_dropped_records(self):
+        last = mock.create_autospec(IDataProcess)
+        last.is_record_wise.return_value = True
+        last.process_one.side_effect = lambda data: data
+
+        chain = ChainDataProcess({'stages': [
+            FilterDataProcess({'predicates': [{'field': 'id', 'op': '!=', 'value': 1}]}),
+            last
+        ]})
+
+        self.assertEqual([{'id': 2}], chain.process_all([{'id': 1}, {'id': 2}]))
+        self.assertIsNone(chain.process_one({'id': 1}))
+        last.process_one.assert_called_once_with({'id': 2})
+
+    def test_initialize_and_dispose_stages(self):
+        stage = mock.create_autospec(IDataProcess)
+        stage.logger = None
+
+        chain = ChainDataProcess({'stages': [stage]})
+        chain.initialize()
+        chain.dispose()
+
+        stage.initialize.assert_called_once()
+        stage.dispose.assert_called_once()
+        self.assertIs(chain.logger, stage.logger)
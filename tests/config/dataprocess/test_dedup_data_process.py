@@ -0,0 +1,49 @@
+import unittest
+
+from transpydata.config.dataprocess import DedupDataProcess
+
+
+class TestDedupDataProcess(unittest.TestCase):
+
+    def test_exact(self):
+        dataprocess = DedupDataProcess({'keys': ['id', 'user.name']})
+
+        res = dataprocess.process_all([
+            {'id': 1, 'user': {'name': 'Cade-6'}},
+            {'id': 1, 'user': {'name': 'Ikora'}},
+            {'id': 1, 'user': {'name': 'Cade-6'}, 'extra': True},
+            {'id': 2},
+            {'id': 2, 'user': {}}
+        ])
+
+        self.assertEqual([
+            {'id': 1, 'user': {'name': 'Cade-6'}},
+            {'id': 1, 'user': {'name': 'Ikora'}},
+            {'id': 2}
+        ], res)
+        self.assertIsNone(dataprocess.process_one({'id': 2}))
+        self.assertEqual(3, dataprocess.stats()['duplicates'])
+
+    def test_approximate(self):
+        dataprocess = DedupDataProcess({'keys': ['id'], 'mode': 'approximate',
+                                        'capacity': 1000, 'fp_rate': 0.001})
+
+        res = dataprocess.process_all([{'id': i % 500} for i in range(1000)])
+
+        self.assertGreater(len(res), 490)
+        self.assertLessEqual(len(res), 500)
+
+    def test_reset_on_initialize(self):
+        dataprocess = DedupDataProcess({'keys': ['id'], 'max_memory_keys': 2})
+        dataprocess.process_all([{'id': 1}, {'id': 2}, {'id': 3}])
+
+        dataprocess.initialize()
+
+        self.assertEqual([{'id': 1}], dataprocess.process_all([{'id': 1}]))
+
+    def test_config_errors(self):
+        with self.assertRaises(RuntimeError):
+            DedupDataProcess({'keys': []})
+
+        with self.assertRaises(RuntimeError):
+            DedupDataProcess({'keys': ['id'], 'mode': 'cuckoo'})
@@ -0,0 +1,107 @@
+import unittest
+import unittest.mock as mock
+
+from transpydata.config import IPredicatePushdown
+from transpydata.config.datainput import IDataInput
+from transpydata.config.dataprocess import EnrichDataProcess
+
+
+USERS = [
+    {'id': 1, 'name': 'Cade-6', 'class': 'Hunter'},
+    {'id': 2, 'name': 'Ikora', 'class': 'Warlock'},
+    {'id': 3, 'name': 'Zavala', 'class': 'Titan'}
+]
+
+
+class TestEnrichDataProcess(unittest.TestCase):
+
+    def test_preload(self):
+        lookup = self._get_lookup_mock()
+        dataprocess = EnrichDataProcess({
+            'lookup': lookup,
+            'lookup_key': 'id',
+            'record_key': 'user.id',
+            'fields': {'name': 'userName'}
+        })
+
+        res = dataprocess.process_all([
+            {'user': {'id': 2}}, {'user': {'id': 4}}, {'user': {'id': 1}}
+        ])
+        one = dataprocess.process_one({'user': {'id': 3}})
+
+        self.assertEqual([
+            {'user': {'id': 2}, 'userName': 'Ikora'},
+            {'user': {'id': 4}},
+            {'user': {'id': 1}, 'userName': 'Cade-6'}
+        ], res)
+        self.assertEqual({'user': {'id': 3}, 'userName': 'Zavala'}, one)
+        lookup.get_all.assert_called_once()
+        lookup.initialize.assert_called_once()
+        self.assertTrue(dataprocess.is_record_wise())
+
+    def test_batched(self):
+        lookup = self._get_lookup_mock()
+        dataprocess = EnrichDataProcess({
+            'lookup': lookup,
+            'lookup_key': 'id',
+            'mode': 'batched',
+            'batch_size': 2,
+            'missing': 'drop'
+        })
+
+        res = dataprocess.process_all([{'id': 1}, {'id': 4}, {'id': 2}, {'id': 1}])
+        dataprocess.process_all([{'id': 2}, {'id': 4}])
+
+        self.assertEqual([
+            {'id': 1, 'name': 'Cade-6', 'class': 'Hunter'},
+            {'id': 2, 'name': 'Ikora', 'class': 'Warlock'},
+            {'id': 1, 'name': 'Cade-6', 'class': 'Hunter'}
+        ], res)
+        self.assertEqual(2, lookup.get_all.call_count)
+        pushed = [c[0][0][0] for c in lookup.push_down_predicates.call_args_list]
+        self.assertEqual([frozenset([1, 4]), frozenset([2])],
+                         [p.value for p in pushed])
+        self.assertFalse(dataprocess.is_record_wise())
+
+        # Lookup is left without the batch filter
+        dataprocess.dispose()
+        lookup.push_down_predicates.assert_called_with([])
+        self.assertEqual(USERS, lookup.get_all())
+
+    def test_inplace(self):
+        dataprocess = EnrichDataProcess({'lookup': self._get_lookup_mock(),
+                                         'lookup_key': 'id',
+                                         'fields': ['class']})
+        dataprocess.set_records_owned(True)
+
+        data = {'id': 3}
+        res = dataprocess.process_one(data)
+
+        self.assertIs(data, res)
+        self.assertEqual({'id': 3, 'class': 'Titan'}, data)
+
+    def test_batched_needs_pushdown(self):
+        with self.assertRaises(RuntimeError):
+            EnrichDataProcess({'lookup': mock.create_autospec(IDataInput),
+                               'lookup_key': 'id',
+                               'mode': 'batched'})
+
+    def _get_lookup_mock(self):
+        lookup = mock.create_autospec(type('LookupInput',
+                                           (IDataInput, IPredicatePushdown), {}))
+        lookup.logger = None
+        predicates = []
+
+        def push_down(preds):
+            predicates[:] = preds
+            return True
+
+        def get_all():
+            if not predicates:
+                return USERS
+            return [u for u in USERS if predicates[0](u)]
+
+        lookup.push_down_predicates.side_effect = push_down
+        lookup.get_all.side_effect = get_all
+
+        return lookup
@@ -0,0 +1,58 @@
+import unittest
+
+from transpydata.config.dataprocess import FilterDataProcess
+from transpydata.util.predicates import Predicate
+
+
+class TestFilterDataProcess(unittest.TestCase):
+
+    def test_process_all(self):
+        dataprocess = FilterDataProcess({'predicates': [
+            {'field': 'credits', 'op': '<=', 'value': 10},
+            {'field': 'module_Id', 'op': 'in', 'value': ['CS101', 'CS102']}
+        ]})
+
+        res = dataprocess.process_all([
+            {'module_Id': 'CS101', 'credits': 10},
+            {'module_Id': 'CS102', 'credits': 20},
+            {'module_Id': 'CS103', 'credits': 5},
+            {'module_Id': 'CS102', 'credits': None}
+        ])
+
+        self.assertEqual([{'module_Id': 'CS101', 'credits': 10}], res)
+
+    def test_process_one(self):
+        dataprocess = FilterDataProcess({'predicates': [
+            Predicate('user.deleted_at', 'is_null'),
+            Predicate('name', '!=', 'Ikora')
+        ]})
+
+        data = {'name': 'Cade-6', 'user': {'deleted_at': None}}
+
+        self.assertIs(data, dataprocess.process_one(data))
+        self.assertIsNone(dataprocess.process_one({'name': 'Ikora'}))
+        self.assertIsNone(dataprocess.process_one({
+            'name': 'Cade-6', 'user': {'deleted_at': '2020-01-01'}
+        }))
+        self.assertTrue(dataprocess.is_record_wise())
+
+    def test_operators(self):
+        record = {'a': 5, 'b': None}
+        cases = [
+            (Predicate('a', '==', 5), True),
+            (Predicate('a', '>', 5), False),
+            (Predicate('a', '>=', 5), True),
+            (Predicate('a', '<', 6), True),
+            (Predicate('a', 'not_in', [1, 2]), True),
+            (Predicate('a', 'not_null'), True),
+            (Predicate('b', 'is_null'), True),
+            (Predicate('b', '!=', 5), False),
+            (Predicate('b', 'not_in', [1]), False),
+            (Predicate('c', 'is_null'), True)
+        ]
+
+        for predicate, expected in cases:
+            self.assertEqual(expected, predicate(record), predicate)
+
+        with self.assertRaises(RuntimeError):
+            Predicate('a', 'like', '%x')
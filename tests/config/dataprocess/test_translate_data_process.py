@@ -1,7 +1,14 @@
 import unittest
 import re
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from transpydata.config.dataprocess import TranslateDataProcess
+from transpydata.util.batches import RecordBatch
+from transpydata.util.records import Record
 
 
 class TestTranslateDataProcess(unittest.TestCase):
@@ -63,6 +70,252 @@ class TestTranslateDataProcess(unittest.TestCase):
 
         self.assertDictEqual(data, res)
 
+    def test_codegen_same_output(self):
+        config = {
+            'exclude': ['weapon'],
+            'translations': {'name': 'userName', 'class': 'type'},
+            'transformations': {
+                'name': lambda n: n.upper(),
+                'category': 'guardian'
+            }
+        }
+        data = self._get_test_data()
+
+        translate_process = TranslateDataProcess(config)
+        codegen_process = TranslateDataProcess({**config, 'codegen': True})
+
+        res = translate_process.process_all([data, {'name': 'Ikora', 'extra': 1}])
+        codegen_res = codegen_process.process_all([data, {'name': 'Ikora', 'extra': 1}])
+
+        self.assertEqual(res, codegen_res)
+        self.assertEqual([list(r) for r in res], [list(r) for r in codegen_res])
+        self.assertDictEqual({
+            'userName': 'CADE-6',
+            'category': 'guardian',
+            'type': 'hunters'
+        }, codegen_res[0])
+
+    def test_nested_paths(self):
+        config = {
+            'exclude': ['user.password'],
+            'translations': {
+                'user.address.zip': 'zip',
+                'name': 'profile.name'
+            },
+            'transformations': {
+                'user.address.city': lambda c: c.upper(),
+                'user.tags[0]': 'hunter'
+            },
+            'nested_paths': True
+        }
+        data = {
+            'name': 'Cade-6',
+            'user': {
+                'password': 'secret',
+                'address': {'zip': '08001', 'city': 'Tower'},
+                'tags': ['exo', 'guardian']
+            },
+            'other': {'untouched': True}
+        }
+
+        for codegen in (False, True):
+            translate_process = TranslateDataProcess({**config, 'codegen': codegen})
+            res = translate_process.process_one(data)
+
+            self.assertDictEqual({
+                'user': {
+                    'address': {'city': 'TOWER'},
+                    'tags': ['hunter', 'guardian']
+                },
+                'other': {'untouched': True},
+                'zip': '08001',
+                'profile': {'name': 'Cade-6'}
+            }, res)
+            self.assertIs(data['other'], res['other'])
+
+        # Input record is not modified
+        self.assertEqual('secret', data['user']['password'])
+        self.assertDictEqual({'zip': '08001', 'city': 'Tower'}, data['user']['address'])
+        self.assertEqual(['exo', 'guardian'], data['user']['tags'])
+
+        # Without 'nested_paths' keys are top level field names
+        translate_process = TranslateDataProcess({
+            'exclude': ['a..b'],
+            'translations': {'user.id': 'userId'}
+        })
+        self.assertDictEqual({'userId': 7, 'a..b_': 1},
+                             translate_process.process_one({'user.id': 7, 'a..b': 0,
+                                                            'a..b_': 1}))
+
+    @unittest.skipIf(np is None, 'numpy not installed')
+    def test_vectorized_transformations(self):
+        config = {
+            'exclude': ['weapon'],
+            'translations': {'class': 'type'},
+            'transformations': {'name': lambda n: n.lower()},
+            'vectorized_transformations': {
+                'power': lambda p: p * 2,
+                'category': lambda c: np.char.upper(c)
+            }
+        }
+        data = [{**self._get_test_data(), 'power': i} for i in range(3)]
+
+        translate_process = TranslateDataProcess(config)
+        res = translate_process.process_all(data)
+
+        self.assertEqual([{
+            'name': 'cade-6',
+            'category': 'CHARACTER',
+            'type': 'hunters',
+            'power': i * 2
+        } for i in range(3)], res)
+        self.assertIsInstance(res[1]['power'], int)
+        self.assertEqual(res[1], translate_process.process_one(data[1]))
+
+        # Records with different fields fall back to row processing
+        res = translate_process.process_all([data[0], {'power': 2}])
+        self.assertDictEqual({'power': 4}, res[1])
+
+    @unittest.skipIf(np is None, 'numpy not installed')
+    def test_vectorized_transformations_checks(self):
+        translate_process = TranslateDataProcess({
+            'vectorized_transformations': {'power': lambda p: p[p > 0]}
+        })
+
+        with self.assertRaises(RuntimeError):
+            translate_process.process_all([{'power': i} for i in range(3)])
+
+        translate_process = TranslateDataProcess({
+            'vectorized_transformations': {'power': lambda p: list(p + 1),
+                                           'level': lambda l: 5}
+        })
+        data = [{'power': i, 'level': i} for i in range(3)]
+        self.assertEqual([{'power': i + 1, 'level': 5} for i in range(3)],
+                         translate_process.process_all(data))
+        self.assertEqual({'power': 1, 'level': 5}, translate_process.process_one(data[0]))
+
+        with self.assertRaises(RuntimeError):
+            TranslateDataProcess({
+                'transformations': {'power': abs},
+                'vectorized_transformations': {'power': np.abs}
+            })
+
+    def test_cached_transformations(self):
+        calls = []
+        def lookup(category):
+            calls.append(category)
+            return category.upper()
+
+        config = {
+            'transformations': {'category': lookup},
+            'cached_transformations': {'category': {'maxsize': 10, 'ttl': 60}}
+        }
+
+        translate_process = TranslateDataProcess(config)
+        res = translate_process.process_all([self._get_test_data()] * 3)
+
+        self.assertEqual(['CHARACTER'] * 3, [r['category'] for r in res])
+        self.assertEqual(['character'], calls)
+        self.assertEqual(2, translate_process.cache_stats()['category']['hits'])
+
+    def test_inplace(self):
+        config = {
+            'exclude': ['weapon', 'user.password'],
+            'translations': {'name': 'category', 'category': 'name'},
+            'transformations': {'class': lambda c: c.upper()},
+            'nested_paths': True,
+            'inplace': True
+        }
+        data = {**self._get_test_data(), 'user': {'password': 'secret'}}
+
+        translate_process = TranslateDataProcess(config)
+        copy_process = TranslateDataProcess({**config, 'inplace': False})
+
+        expected = copy_process.process_one(data)
+        res = translate_process.process_one(data)
+
+        self.assertIs(data, res)
+        self.assertDictEqual(expected, res)
+        self.assertDictEqual({
+            'category': 'Cade-6',
+            'name': 'character',
+            'class': 'HUNTERS',
+            'user': {}
+        }, res)
+
+    def test_inplace_collisions(self):
+        configs = [
+            # Target is an untranslated field of the record
+            {'translations': {'name': 'class'}},
+            # Two fields renamed to the same target
+            {'translations': {'name': 'class', 'weapon': 'class'}}
+        ]
+        for config in configs:
+            data = self._get_test_data()
+            expected = TranslateDataProcess(config).process_one(data)
+
+            res = TranslateDataProcess({**config, 'inplace': True}).process_one(data)
+
+            self.assertDictEqual(expected, res)
+            self.assertDictEqual(self._get_test_data(), data)
+
+        # Records without the colliding field are processed in place
+        data = {'name': 'Cade-6'}
+        res = TranslateDataProcess({**configs[0], 'inplace': True}).process_one(data)
+        self.assertIs(data, res)
+        self.assertDictEqual({'class': 'Cade-6'}, res)
+
+    def test_compact_records(self):
+        translate_process = TranslateDataProcess({
+            'exclude': ['weapon'],
+            'translations': {'name': 'category', 'category': 'name'},
+            'transformations': {'class': lambda c: c.upper(), 'level': 10}
+        })
+        data = self._get_test_data()
+
+        expected = translate_process.process_one(data)
+        res = translate_process.process_all([Record.from_dict(data),
+                                             Record.from_dict(data)])
+
+        self.assertIsInstance(res[0], Record)
+        self.assertIs(res[0].schema, res[1].schema)
+        self.assertDictEqual(expected, res[0].to_dict())
+        self.assertEqual(['category', 'name', 'class'], list(res[0]))
+
+    def test_record_batches(self):
+        config = {
+            'exclude': ['weapon'],
+            'translations': {'name': 'category', 'category': 'name'},
+            'transformations': {'class': lambda c: c.upper()}
+        }
+        data = [self._get_test_data(), {**self._get_test_data(), 'name': 'Ikora'}]
+
+        translate_process = TranslateDataProcess(config)
+        res = translate_process.process_all(RecordBatch.from_records(data))
+
+        self.assertIsInstance(res, RecordBatch)
+        self.assertEqual(TranslateDataProcess(config).process_all(data),
+                         res.to_records())
+        self.assertFalse(TranslateDataProcess({
+            'translations': {'user.name': 'name'},
+            'nested_paths': True
+        }).accepts_batches())
+
+    @unittest.skipIf(np is None, "'numpy' not installed")
+    def test_record_batches_vectorized(self):
+        translate_process = TranslateDataProcess({
+            'vectorized_transformations': {'credits': lambda c: c * 2}
+        })
+
+        res = translate_process.process_all(RecordBatch.from_records([
+            {'id': 'CS101', 'credits': 10}, {'id': 'CS102', 'credits': 5}
+        ]))
+
+        self.assertIsInstance(res.column('credits'), np.ndarray)
+        self.assertEqual([{'id': 'CS101', 'credits': 20},
+                          {'id': 'CS102', 'credits': 10}], res.to_records())
+        self.assertIs(type(res.to_records()[0]['credits']), int)
+
     def _get_test_data(self):
         return {
             'name': 'Cade-6',
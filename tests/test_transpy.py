@@ -1,13 +1,23 @@
 from typing import Tuple
 from logging import getLogger, NullHandler, Logger
+import json
+import os
+import tempfile
 import unittest
 import unittest.mock as mock
-
+from concurrent.futures import Future
 
 from transpydata.TransPy import TransPy
 from transpydata.config.datainput import IDataInput
-from transpydata.config.dataprocess import IDataProcess
+from transpydata.config import (
+    ICheckpointable, IPredicatePushdown, IStreamingInput
+)
+from transpydata.config.dataprocess import (
+    IDataProcess, FilterDataProcess, TranslateDataProcess
+)
 from transpydata.config.dataoutput import IDataOutput
+from transpydata.util.batches import RecordBatch
+from transpydata.util.spill import RecordSpool
 
 class TestTransPy(unittest.TestCase):
 
@@ -174,6 +184,409 @@ class TestTransPy(unittest.TestCase):
 
         self.assertListEqual(result, dataoutput_returns)
 
+    def test_deferred_results_resolved(self):
+        datainput, dataprocess, dataoutput = self._get_mocked_dataservices()
+
+        deferred = Future()
+        datainput.get_all.return_value = ['dinA', 'dinB']
+        dataprocess.process_one.side_effect = ['dprA', 'dprB']
+        dataoutput.send_one.side_effect = [deferred, 'doutB']
+        dataoutput.dispose.side_effect = lambda: deferred.set_result('doutA')
+
+        config = {
+            'datainput_by_one': False,
+            'dataprocess_by_one': True,
+            'dataoutput_by_one': True
+        }
+
+        trans_py = self._get_transpy_instance(datainput, dataprocess,
+                                             dataoutput, config)
+
+        result = trans_py.run()
+
+        self.assertListEqual(['doutA', 'doutB'], result)
+
+    def test_inplace_records(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        records = [{'id': 1, 'name': 'Cade-6'}, {'id': 2, 'name': 'Ikora'}]
+        datainput.get_all.return_value = records
+        dataoutput.send_all.side_effect = lambda data: data
+        dataprocess = TranslateDataProcess({'translations': {'name': 'userName'}})
+
+        trans_py = self._get_transpy_instance(datainput, dataprocess, dataoutput,
+                                              {'inplace_records': True})
+
+        result = trans_py.run()
+
+        self.assertIs(records[0], result[0])
+        self.assertDictEqual({'id': 1, 'userName': 'Cade-6'}, records[0])
+
+    def test_inplace_records_unset(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        records = [{'id': 1, 'name': 'Cade-6'}]
+        datainput.get_all.return_value = records
+        dataoutput.send_all.side_effect = lambda data: data
+        dataprocess = TranslateDataProcess({'translations': {'name': 'userName'},
+                                            'inplace': True})
+
+        trans_py = self._get_transpy_instance(datainput, dataprocess, dataoutput)
+
+        result = trans_py.run()
+
+        self.assertIs(records[0], result[0])
+
+    def test_dataprocess_list(self):
+        datainput, dataprocess, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = [{'name': 'Cade-6'}]
+        dataoutput.send_all.side_effect = lambda data: data
+        dataprocess.process_one.side_effect = lambda data: {**data, 'proc': True}
+        dataprocess.is_record_wise.return_value = True
+
+        trans_py = self._get_transpy_instance(datainput, [
+            TranslateDataProcess({'translations': {'name': 'userName'}}),
+            dataprocess
+        ], dataoutput)
+
+        result = trans_py.run()
+
+        self.assertEqual([{'userName': 'Cade-6', 'proc': True}], result)
+        dataprocess.initialize.assert_called_once()
+        dataprocess.dispose.assert_called_once()
+
+    def test_dropped_records_not_sent(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = [{'id': 1}, {'id': 2}]
+        dataoutput.send_one.side_effect = lambda data: data
+        dataprocess = FilterDataProcess({'predicates': [
+            {'field': 'id', 'op': '>', 'value': 1}
+        ]})
+
+        trans_py = self._get_transpy_instance(datainput, dataprocess, dataoutput, {
+            'dataprocess_by_one': True,
+            'dataoutput_by_one': True
+        })
+
+        result = trans_py.run()
+
+        self.assertEqual([{'id': 2}], result)
+        dataoutput.send_one.assert_called_once_with({'id': 2})
+
+    def test_filters_pushed_down(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        pushdown_input = mock.create_autospec(type('PushdownInput',
+                                                   (IDataInput, IPredicatePushdown),
+                                                   {}))
+        pushdown_input.process_all_method_name.return_value = 'get_all'
+        pushdown_input.get_all.return_value = [{'id': 2}]
+        pushdown_input.push_down_predicates.return_value = True
+        dataoutput.send_all.side_effect = lambda data: data
+
+        first = FilterDataProcess({'predicates': [{'field': 'id', 'op': '>', 'value': 1}]})
+        second = FilterDataProcess({'predicates': [{'field': 'id', 'op': 'not_null'}]})
+        last = FilterDataProcess({'predicates': [{'field': 'id', 'op': '<', 'value': 5}]})
+
+        trans_py = self._get_transpy_instance(pushdown_input, [
+            first, second, TranslateDataProcess(), last
+        ], dataoutput)
+
+        result = trans_py.run()
+
+        self.assertEqual([{'id': 2}], result)
+        pushdown_input.push_down_predicates.assert_called_once_with(
+            first.predicates + second.predicates
+        )
+
+    def test_filters_pushed_down_by_one(self):
+        _, _, dataoutput = self._get_mocked_dataservices()
+
+        pushdown_input = mock.create_autospec(type('PushdownInput',
+                                                   (IDataInput, IPredicatePushdown),
+                                                   {}))
+        pushdown_input.process_one_method_name.return_value = 'get_one'
+        pushdown_input.get_one.side_effect = lambda key: {'id': key} if key > 1 else None
+        pushdown_input.push_down_predicates.return_value = True
+        dataoutput.send_one.side_effect = lambda data: data
+
+        dataprocess = FilterDataProcess({'predicates': [
+            {'field': 'id', 'op': '>', 'value': 1}
+        ]})
+
+        trans_py = self._get_transpy_instance(pushdown_input, [dataprocess],
+                                              dataoutput, {
+            'datainput_by_one': True,
+            'dataprocess_by_one': True,
+            'dataoutput_by_one': True,
+            'datainput_source': [1, 2]
+        })
+
+        result = trans_py.run()
+
+        self.assertEqual([{'id': 2}], result)
+        dataoutput.send_one.assert_called_once_with({'id': 2})
+
+    def test_record_batches(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = RecordBatch.from_records([
+            {'name': 'Cade-6'}, {'name': 'Ikora'}
+        ])
+        dataoutput.accepts_batches.return_value = False
+        dataoutput.send_all.side_effect = lambda data: data
+        dataprocess = TranslateDataProcess({'translations': {'name': 'userName'}})
+
+        with mock.patch.object(dataprocess, 'process_one') as process_one:
+            trans_py = self._get_transpy_instance(datainput, dataprocess,
+                                                  dataoutput)
+            result = trans_py.run()
+
+            process_one.assert_not_called()
+
+        self.assertIsInstance(result, list)
+        self.assertEqual([{'userName': 'Cade-6'}, {'userName': 'Ikora'}], result)
+
+    def test_memory_budget_spill(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = [{'id': i} for i in range(50)]
+        dataoutput.accepts_batches.return_value = False
+        outputs = []
+
+        def send_all(data):
+            outputs.append((type(data), data.spilled, list(data)))
+            return [d['key'] for d in data]
+
+        dataoutput.send_all.side_effect = send_all
+        dataprocess = TranslateDataProcess({'translations': {'id': 'key'}})
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            trans_py = self._get_transpy_instance(datainput, dataprocess, dataoutput, {
+                'memory_budget': 10,
+                'spill_dir': spill_dir,
+                'spill_frame_size': 8
+            })
+            with mock.patch.object(dataprocess, 'process_all') as process_all:
+                result = trans_py.run()
+
+                process_all.assert_not_called()
+
+            self.assertEqual([], os.listdir(spill_dir))
+
+        self.assertEqual(list(range(50)), result)
+        self.assertEqual([(RecordSpool, True, [{'key': i} for i in range(50)])],
+                         outputs)
+
+    def test_memory_budget_streamed_input(self):
+        _, _, dataoutput = self._get_mocked_dataservices()
+
+        streaming_input = mock.create_autospec(type('StreamingInput',
+                                                    (IDataInput, IStreamingInput),
+                                                    {}))
+        streaming_input.iter_all.return_value = iter([{'id': i} for i in range(30)])
+        dataoutput.accepts_batches.return_value = False
+        outputs = []
+
+        def send_all(data):
+            outputs.append((type(data), data.spilled, len(data)))
+            return [d['id'] for d in data]
+
+        dataoutput.send_all.side_effect = send_all
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            trans_py = self._get_transpy_instance(streaming_input,
+                                                  TranslateDataProcess(),
+                                                  dataoutput, {
+                'memory_budget': 10,
+                'spill_dir': spill_dir,
+                'spill_frame_size': 8
+            })
+            result = trans_py.run()
+
+        self.assertEqual(list(range(30)), result)
+        self.assertEqual([(RecordSpool, True, 30)], outputs)
+        streaming_input.get_all.assert_not_called()
+        streaming_input.initialize.assert_called_once()
+
+    def test_memory_budget_spills_batches(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = RecordBatch.from_records(
+            [{'id': i} for i in range(30)]
+        )
+        dataoutput.accepts_batches.return_value = False
+        outputs = []
+
+        def send_all(data):
+            outputs.append((type(data), data.spilled))
+            return [d['id'] for d in data]
+
+        dataoutput.send_all.side_effect = send_all
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            trans_py = self._get_transpy_instance(datainput, TranslateDataProcess(),
+                                                  dataoutput, {
+                'memory_budget': 10,
+                'spill_dir': spill_dir
+            })
+            result = trans_py.run()
+
+        self.assertEqual(list(range(30)), result)
+        self.assertEqual((RecordSpool, True), outputs[0])
+
+    def test_datainput_slice(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_one.side_effect = lambda key: {'id': key}
+        dataoutput.send_all.side_effect = lambda data: [d['id'] for d in data]
+
+        trans_py = self._get_transpy_instance(datainput, TranslateDataProcess(),
+                                              dataoutput, {
+            'datainput_by_one': True,
+            'datainput_source': list(range(10)),
+            'datainput_slice': (2, 5)
+        })
+
+        self.assertEqual([2, 3, 4], trans_py.run())
+        self.assertEqual(3, datainput.get_one.call_count)
+
+        with self.assertRaises(RuntimeError):
+            trans_py.configure({'datainput_by_one': False})
+
+    def test_checkpoint_resume_by_one(self):
+        datainput, dataprocess, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = [{'id': i} for i in range(10)]
+        dataprocess.process_one.side_effect = lambda data: data
+        sent = []
+        failures = [RuntimeError('Connection lost')]
+
+        def send_one(data):
+            if data['id'] == 7 and failures:
+                raise failures.pop()
+            sent.append(data['id'])
+            return data['id']
+
+        dataoutput.send_one.side_effect = send_one
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            config = {
+                'dataprocess_by_one': True,
+                'dataoutput_by_one': True,
+                'checkpoint_path': os.path.join(state_dir, 'state.json'),
+                'checkpoint_interval': 5
+            }
+            trans_py = self._get_transpy_instance(datainput, dataprocess,
+                                                  dataoutput, config)
+            with self.assertRaises(RuntimeError):
+                trans_py.run()
+
+            result = trans_py.run(resume=True)
+            finished = trans_py.run(resume=True)
+
+        self.assertEqual([7, 8, 9], result)
+        self.assertEqual(list(range(10)), sent)
+        self.assertEqual([], finished)
+
+    def test_checkpoint_failed_send_resent(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = [{'id': i} for i in range(6)]
+        sent = []
+        failures = [3]
+
+        def send_one(data):
+            sent.append(data['id'])
+            if data['id'] in failures:
+                failures.remove(data['id'])
+                return {'success': False, 'error': 'Throttled'}
+            return {'success': True}
+
+        dataoutput.send_one.side_effect = send_one
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            trans_py = self._get_transpy_instance(datainput, TranslateDataProcess(),
+                                                  dataoutput, {
+                'dataprocess_by_one': True,
+                'dataoutput_by_one': True,
+                'checkpoint_path': os.path.join(state_dir, 'state.json'),
+                'checkpoint_interval': 1
+            })
+            trans_py.run()
+            with open(os.path.join(state_dir, 'state.json')) as f:
+                state = json.load(f)
+
+            trans_py.run(resume=True)
+
+        self.assertEqual(3, state['position'])
+        self.assertFalse(state['finished'])
+        self.assertEqual([0, 1, 2, 3, 4, 5, 3, 4, 5], sent)
+
+    def test_checkpoint_resume_input_by_one(self):
+        _, _, dataoutput = self._get_mocked_dataservices()
+
+        checkpoint_input = mock.create_autospec(type('CheckpointInput',
+                                                     (IDataInput, ICheckpointable),
+                                                     {}))
+        checkpoint_input.process_one_method_name.return_value = 'get_one'
+        checkpoint_input.get_one.side_effect = lambda key: {'id': key}
+        checkpoint_input.checkpoint_state.side_effect = lambda r: {'key': r['id']}
+        checkpoint_input.restore_checkpoint.return_value = True
+        dataoutput.send_one.side_effect = lambda data: data['id']
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            state_path = os.path.join(state_dir, 'state.json')
+            with open(state_path, 'w') as f:
+                f.write('{"position": 2, "delivered": 2, "finished": false, '
+                        '"input": {"key": 2}}')
+
+            trans_py = self._get_transpy_instance(checkpoint_input,
+                                                  TranslateDataProcess(),
+                                                  dataoutput, {
+                'datainput_by_one': True,
+                'dataprocess_by_one': True,
+                'dataoutput_by_one': True,
+                'datainput_source': list(range(6)),
+                'datainput_slice': (1, 5),
+                'checkpoint_path': state_path
+            })
+            result = trans_py.run(resume=True)
+
+        # Resumed by position in the slice
+        self.assertEqual([3, 4], result)
+        checkpoint_input.restore_checkpoint.assert_not_called()
+
+    def test_checkpoint_chunks(self):
+        datainput, _, dataoutput = self._get_mocked_dataservices()
+
+        datainput.get_all.return_value = [{'id': i} for i in range(10)]
+        dataoutput.accepts_batches.return_value = False
+        dataoutput.send_all.side_effect = lambda data: [d['id'] for d in data]
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            state_path = os.path.join(state_dir, 'state.json')
+            with open(state_path, 'w') as f:
+                f.write('{"position": 4, "delivered": 4, "finished": false}')
+
+            trans_py = self._get_transpy_instance(datainput, TranslateDataProcess(),
+                                                  dataoutput, {
+                'checkpoint_path': state_path,
+                'checkpoint_interval': 4
+            })
+            result = trans_py.run(resume=True)
+
+            with open(state_path) as f:
+                state = json.load(f)
+
+        self.assertEqual([4, 5, 6, 7, 8, 9], result)
+        self.assertEqual(2, dataoutput.send_all.call_count)
+        self.assertEqual(10, state['position'])
+        self.assertEqual(10, state['delivered'])
+        self.assertTrue(state['finished'])
+
     def test_logging(self):
         datainput, dataprocess, dataoutput = self._get_mocked_dataservices()
 
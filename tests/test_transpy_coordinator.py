@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+from logging import getLogger, NullHandler
+from typing import List
+
+from transpydata import TransPy, TransPyCoordinator
+from transpydata.config import IPredicatePushdown
+from transpydata.config.datainput import IDataInput
+from transpydata.config.dataprocess import NoneDataProcess
+from transpydata.config.dataoutput import IDataOutput
+
+
+class RangeDataInput(IDataInput, IPredicatePushdown):
+    predicates = ()
+
+    def configure(self, config: dict):
+        pass
+
+    def get_one(self, data: dict) -> dict:
+        return {'id': data}
+
+    def get_all(self) -> List[dict]:
+        return [{'id': i} for i in range(20)
+                if all(p({'id': i}) for p in self.predicates)]
+
+    def push_down_predicates(self, predicates: list) -> bool:
+        self.predicates = predicates
+        return True
+
+
+class ListDataInput(IDataInput):
+    def configure(self, config: dict):
+        pass
+
+    def get_one(self, data: dict) -> dict:
+        return {'id': data}
+
+    def get_all(self) -> List[dict]:
+        return [{'id': i} for i in range(20)]
+
+
+class FileDataOutput(IDataOutput):
+    """ Appends record ids to a file, one line per record.
+    """
+    def configure(self, config: dict):
+        self.path = config['path']
+
+    def send_one(self, data: dict) -> dict:
+        return self.send_all([data])[0]
+
+    def send_all(self, data: List[dict]) -> List[dict]:
+        with open(self.path, 'a') as f:
+            f.writelines('{}\n'.format(d['id']) for d in data)
+        return list(data)
+
+
+def build_transpy() -> TransPy:
+    logger = getLogger('dummy')
+    logger.addHandler(NullHandler())
+
+    trans_py = TransPy()
+    trans_py.logger = logger
+    trans_py.datainput = RangeDataInput()
+    trans_py.dataprocess = NoneDataProcess()
+    trans_py.dataoutput = FileDataOutput()
+    trans_py.dataoutput.configure({'path': os.environ['TRANSPY_TEST_OUTPUT']})
+
+    return trans_py
+
+
+def build_transpy_by_one() -> TransPy:
+    trans_py = build_transpy()
+    trans_py.configure({'datainput_by_one': True,
+                        'datainput_source': list(range(20))})
+
+    return trans_py
+
+
+class TestTransPyCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self._tmp_dir.name, 'output.txt')
+        os.environ['TRANSPY_TEST_OUTPUT'] = self.output_path
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+        del os.environ['TRANSPY_TEST_OUTPUT']
+
+    def test_run_source_slices(self):
+        coordinator = self._get_coordinator({'workers': 2,
+                                             'factory': build_transpy_by_one})
+        coordinator.partition_source(20, 6)
+
+        metrics = coordinator.run()
+
+        self.assertEqual(20, metrics['records'])
+        self.assertEqual(4, metrics['units']['done'])
+        self.assertEqual(list(range(20)), self._get_output())
+
+    def test_work_key_ranges(self):
+        coordinator = self._get_coordinator()
+        coordinator.partition_key_ranges('id', 3, low=5, high=14)
+
+        completed = coordinator.work('w1')
+
+        self.assertEqual(3, completed)
+        self.assertEqual(list(range(5, 15)), self._get_output())
+        self.assertEqual({'units': 3, 'records': 10},
+                         {k: v for k, v in coordinator.metrics()['workers']['w1'].items()
+                          if k != 'seconds'})
+
+    def test_key_ranges_need_pushdown(self):
+        def build_no_pushdown() -> TransPy:
+            trans_py = build_transpy()
+            trans_py.datainput = ListDataInput()
+            return trans_py
+
+        coordinator = self._get_coordinator({'factory': build_no_pushdown})
+
+        with self.assertRaises(RuntimeError):
+            coordinator.partition_key_ranges('id', 3, low=0, high=10)
+
+    def test_unit_keeps_transpy_config(self):
+        def build_output_by_one() -> TransPy:
+            trans_py = build_transpy()
+            trans_py.configure({'datainput_by_one': True,
+                                'dataprocess_by_one': False,
+                                'dataoutput_by_one': True,
+                                'checkpoint_path': 'checkpoint.json'})
+            return trans_py
+
+        coordinator = self._get_coordinator({'factory': build_output_by_one})
+
+        trans_py = coordinator._get_unit_transpy({'kind': 'slice',
+                                                  'start': 0, 'stop': 5})
+
+        self.assertTrue(trans_py._dataoutput_by_one)
+        self.assertEqual((0, 5), trans_py._datainput_slice)
+        self.assertIsNone(trans_py._checkpoint_path)
+
+    def _get_coordinator(self, config: dict = None) -> TransPyCoordinator:
+        coordinator = TransPyCoordinator({
+            'factory': build_transpy,
+            'queue_dir': os.path.join(self._tmp_dir.name, 'queue'),
+            'poll_interval': 0.05,
+            **(config or {})
+        })
+        coordinator.logger = getLogger('dummy')
+
+        return coordinator
+
+    def _get_output(self) -> List[int]:
+        with open(self.output_path) as f:
+            return sorted(int(line) for line in f)
@@ -0,0 +1,39 @@
+import unittest
+import unittest.mock as mock
+
+from transpydata.util.batches import RecordBatch, adapt_input
+from transpydata.util.records import Record, Schema
+
+
+class TestRecordBatch(unittest.TestCase):
+
+    def test_from_rows(self):
+        batch = RecordBatch.from_rows(Schema.get(['id', 'name']),
+                                      [(1, 'Cade-6'), (2, 'Ikora')])
+
+        self.assertEqual(2, len(batch))
+        self.assertEqual(['Cade-6', 'Ikora'], batch.column('name'))
+        self.assertEqual([{'id': 1, 'name': 'Cade-6'}, {'id': 2, 'name': 'Ikora'}],
+                         batch.to_records())
+        self.assertIsInstance(next(iter(batch)), Record)
+
+    def test_from_records(self):
+        batch = RecordBatch.from_records([{'id': 1}, {'id': 2}])
+
+        self.assertEqual(('id',), batch.schema.fields)
+        self.assertEqual([[1, 2]], batch.columns)
+        self.assertEqual(0, len(RecordBatch.from_records([])))
+
+        with self.assertRaises(RuntimeError):
+            RecordBatch(Schema.get(['id', 'name']), [[1, 2], ['Cade-6']])
+
+    def test_adapt_input(self):
+        batch = RecordBatch.from_records([{'id': 1}])
+        processor = mock.Mock()
+
+        processor.accepts_batches.return_value = True
+        self.assertIs(batch, adapt_input(processor, batch))
+
+        processor.accepts_batches.return_value = False
+        self.assertEqual([{'id': 1}], adapt_input(processor, batch))
+        self.assertEqual([{'id': 1}], adapt_input(object(), batch))
@@ -0,0 +1,51 @@
+import unittest
+import time
+
+from transpydata.util.cache import LRUCache, cached
+
+
+class TestCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertDictEqual({
+            'size': 2,
+            'maxsize': 2,
+            'hits': 2,
+            'misses': 1,
+            'hit_ratio': 2 / 3,
+            'evictions': 1,
+            'expirations': 0
+        }, cache.stats())
+
+    def test_ttl(self):
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(1, cache.stats()['expirations'])
+
+    def test_cached_transformation(self):
+        calls = []
+
+        @cached(maxsize=10)
+        def region(country):
+            calls.append(country)
+            return 'EU' if country in ('ES', 'FR') else 'OTHER'
+
+        res = [region(c) for c in ['ES', 'US', 'ES', 'FR', 'ES']]
+
+        self.assertEqual(['EU', 'OTHER', 'EU', 'EU', 'EU'], res)
+        self.assertEqual(['ES', 'US', 'FR'], calls)
+        self.assertEqual(2, region.stats()['hits'])
+
+        # Unhashable values are not cached
+        self.assertEqual('OTHER', region(['ES']))
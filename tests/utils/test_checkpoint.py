@@ -0,0 +1,63 @@
+import datetime
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+
+from transpydata.util.checkpoint import (
+    Checkpointer, CheckpointStore, is_failed_result
+)
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def test_store(self):
+        with tempfile.TemporaryDirectory() as state_dir:
+            store = CheckpointStore(os.path.join(state_dir, 'state.json'))
+
+            self.assertIsNone(store.load())
+            store.save({'position': 1, 'at': datetime.date(2020, 1, 1)})
+            store.save({'position': 2, 'at': datetime.date(2020, 1, 2)})
+
+            self.assertEqual({'position': 2, 'at': '2020-01-02'}, store.load())
+            self.assertEqual(['state.json'], os.listdir(state_dir))
+
+    def test_pending_results(self):
+        with tempfile.TemporaryDirectory() as state_dir:
+            store = CheckpointStore(os.path.join(state_dir, 'state.json'))
+            checkpointer = Checkpointer(store, interval=2,
+                                        input_state=lambda r: {'key': r['id']})
+            pending = Future()
+
+            checkpointer.commit(1, {'id': 1}, ['ok'])
+            checkpointer.commit(2, {'id': 2}, [pending])
+            checkpointer.commit(3, {'id': 3}, ['ok'])
+
+            self.assertEqual(1, checkpointer.position)
+            self.assertIsNone(store.load())
+
+            pending.set_exception(RuntimeError('Throttled'))
+            checkpointer.commit(4, {'id': 4}, [{'success': False}])
+            checkpointer.commit(5, {'id': 5}, [{'code': 200}])
+            checkpointer.save()
+
+            # Position is kept before the first failed record
+            state = store.load()
+            self.assertEqual(1, state['position'])
+            self.assertEqual({'key': 1}, state['input'])
+            self.assertEqual(3, state['delivered'])
+            self.assertEqual(2, state['failed'])
+            self.assertFalse(state['finished'])
+
+            checkpointer.finish()
+            self.assertFalse(store.load()['finished'])
+
+    def test_failed_results(self):
+        done = Future()
+        done.set_result({'success': True})
+
+        self.assertTrue(is_failed_result({'success': False, 'error': 'x'}))
+        self.assertTrue(is_failed_result({'code': 503, 'message': None}))
+        self.assertFalse(is_failed_result({'code': 201, 'message': None}))
+        self.assertFalse(is_failed_result(done))
+        self.assertFalse(is_failed_result('sent'))
@@ -0,0 +1,43 @@
+import decimal
+import os
+import tempfile
+import unittest
+
+from transpydata.util.keysets import BloomKeySet, ExactKeySet, key_digest
+
+
+class TestKeySets(unittest.TestCase):
+
+    def test_exact_spill(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            keys = ExactKeySet(max_memory_keys=10, spill_dir=spill_dir)
+
+            added = [keys.add(key_digest(i % 25)) for i in range(50)]
+
+            self.assertEqual([True] * 25 + [False] * 25, added)
+            self.assertEqual(25, len(keys))
+            self.assertEqual(20, keys.stats()['spilled_keys'])
+            self.assertEqual(1, len(os.listdir(spill_dir)))
+
+            keys.close()
+            self.assertEqual([], os.listdir(spill_dir))
+
+    def test_equal_numbers_same_digest(self):
+        self.assertEqual(key_digest((1, 'a')), key_digest((1.0, 'a')))
+        self.assertEqual(key_digest(1), key_digest(decimal.Decimal('1.00')))
+        self.assertEqual(key_digest(1.5), key_digest(decimal.Decimal('1.5')))
+        self.assertNotEqual(key_digest(0.1), key_digest(decimal.Decimal('0.1')))
+        self.assertNotEqual(key_digest(1), key_digest('1'))
+
+    def test_bloom_fp_rate(self):
+        keys = BloomKeySet(capacity=10000, fp_rate=0.01)
+
+        for i in range(10000):
+            keys.add(key_digest(('a', i)))
+
+        repeated = sum(keys.add(key_digest(('a', i))) for i in range(10000))
+        false_positives = sum(key_digest(('b', i)) in keys for i in range(10000))
+
+        self.assertEqual(0, repeated)
+        self.assertLess(false_positives, 200)
+        self.assertLess(keys.stats()['memory_bytes'], 12500)
@@ -0,0 +1,34 @@
+import unittest
+
+from transpydata.util.paths import (
+    MISSING, delete_path, get_path, parse_path, set_path
+)
+
+
+class TestPaths(unittest.TestCase):
+
+    def test_parse_path(self):
+        self.assertEqual(('user', 'address', 'zip'), parse_path('user.address.zip'))
+        self.assertEqual(('user', 'address', 'zip'), parse_path('$.user.address.zip'))
+        self.assertEqual(('items', 0, 'id'), parse_path('items[0].id'))
+        self.assertEqual(('meta', 'a.b'), parse_path("meta['a.b']"))
+        self.assertEqual(('name',), parse_path('name'))
+
+    def test_copy_on_write(self):
+        data = {'a': {'b': {'c': 1}, 'keep': {}}, 'items': [{'id': 1}]}
+        res = dict(data)
+        copied = {id(res)}
+
+        set_path(res, parse_path('a.b.d'), 2, copied)
+        set_path(res, parse_path('x.y'), 3, copied)
+        delete_path(res, parse_path('items.0.id'), copied)
+
+        self.assertDictEqual({'c': 1, 'd': 2}, res['a']['b'])
+        self.assertDictEqual({'y': 3}, res['x'])
+        self.assertDictEqual({}, res['items'][0])
+        self.assertIs(data['a']['keep'], res['a']['keep'])
+        self.assertDictEqual({'a': {'b': {'c': 1}, 'keep': {}}, 'items': [{'id': 1}]},
+                             data)
+
+        self.assertEqual(2, get_path(res, ('a', 'b', 'd')))
+        self.assertIs(MISSING, get_path(res, ('a', 'z')))
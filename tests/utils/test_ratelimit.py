@@ -0,0 +1,46 @@
+import unittest
+import time
+
+from transpydata.util.ratelimit import AdaptiveRateLimiter, TokenBucket
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=100, burst=1)
+
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_aimd_limits(self):
+        limiter = AdaptiveRateLimiter(target_rps=1000, max_concurrency=8)
+
+        start = limiter.acquire()
+        limiter.release(start, success=False, throttled=True)
+
+        metrics = limiter.metrics()
+        self.assertEqual(4, metrics['concurrency_limit'])
+        self.assertEqual(500, metrics['rate_limit'])
+        self.assertEqual(1, metrics['throttled'])
+
+        for _ in range(50):
+            limiter.release(limiter.acquire())
+
+        metrics = limiter.metrics()
+        self.assertEqual(8, metrics['concurrency_limit'])
+        self.assertGreater(metrics['rate_limit'], 500)
+        self.assertLessEqual(metrics['rate_limit'], 1000)
+        self.assertEqual(0, metrics['in_flight'])
+
+    def test_latency_target(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=10, latency_target=0.001)
+
+        start = limiter.acquire()
+        time.sleep(0.01)
+        limiter.release(start)
+
+        self.assertEqual(5, limiter.metrics()['concurrency_limit'])
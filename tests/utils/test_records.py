@@ -0,0 +1,35 @@
+import pickle
+import unittest
+
+from transpydata.util.records import Record, Schema
+from transpydata.util.serialization import JsonSerializer
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_mapping(self):
+        record = Record(Schema.get(['id', 'name']), (1, 'Cade-6'))
+
+        self.assertEqual(1, record['id'])
+        self.assertEqual('Cade-6', record.get('name'))
+        self.assertIsNone(record.get('class'))
+        self.assertIn('name', record)
+        self.assertEqual(['id', 'name'], list(record))
+        self.assertEqual([1, 'Cade-6'], list(record.values()))
+        self.assertEqual({'id': 1, 'name': 'Cade-6'}, {**record})
+        self.assertEqual({'id': 1, 'name': 'Cade-6'}, record)
+        with self.assertRaises(KeyError):
+            record['class']
+
+    def test_shared_schema(self):
+        first = Record.from_dict({'id': 1, 'name': 'Cade-6'})
+        second = pickle.loads(pickle.dumps(Record.from_dict({'id': 2, 'name': 'Ikora'})))
+
+        self.assertIs(first.schema, second.schema)
+        self.assertEqual((2, 'Ikora'), second.row)
+
+    def test_serialization(self):
+        record = Record.from_dict({'id': 1, 'name': 'Cade-6'})
+
+        self.assertEqual('{"id": 1, "name": "Cade-6"}',
+                         JsonSerializer().dumps(record))
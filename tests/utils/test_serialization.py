@@ -0,0 +1,53 @@
+import unittest
+import datetime
+import decimal
+
+from transpydata.util import serialization
+from transpydata.util.serialization import (
+    JsonSerializer, OrjsonSerializer, get_serializer
+)
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_db_values_encoded(self):
+        serializer = get_serializer('json')
+        data = {
+            'created': datetime.datetime(2021, 3, 4, 10, 30),
+            'day': datetime.date(2021, 3, 4),
+            'price': decimal.Decimal('12345678901234567.89'),
+            'blob': b'data'
+        }
+
+        res = serializer.loads(serializer.dumps(data))
+
+        self.assertDictEqual({
+            'created': '2021-03-04T10:30:00',
+            'day': '2021-03-04',
+            'price': '12345678901234567.89',
+            'blob': 'ZGF0YQ=='
+        }, res)
+
+    @unittest.skipIf(serialization.orjson is None, 'orjson not installed')
+    def test_backends_equivalent(self):
+        data = {
+            'name': 'Nerevar',
+            'created': datetime.datetime(2021, 3, 4, 10, 30),
+            'price': decimal.Decimal('10.5'),
+            1: [1, 2]
+        }
+
+        json_res = JsonSerializer().loads(JsonSerializer().dumps(data))
+        orjson_res = JsonSerializer().loads(OrjsonSerializer().dumps(data))
+
+        self.assertDictEqual(json_res, orjson_res)
+
+    def test_auto_and_custom_serializer(self):
+        serializer = get_serializer('auto')
+        self.assertIsInstance(serializer, JsonSerializer)
+
+        custom = JsonSerializer(default=str)
+        self.assertIs(custom, get_serializer(custom))
+
+        with self.assertRaises(RuntimeError):
+            get_serializer('unknown')
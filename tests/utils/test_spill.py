@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from transpydata.util.spill import RecordSpool, SpillFile
+
+
+class TestSpill(unittest.TestCase):
+
+    def test_spill_file(self):
+        spill = SpillFile()
+        first = spill.write({'id': 1})
+        second = spill.write([{'id': 2}])
+
+        self.assertEqual([{'id': 2}], spill.read(second))
+        self.assertEqual({'id': 1}, spill.read(first))
+        self.assertEqual([{'id': 1}, [{'id': 2}]], list(spill))
+
+        spill.close()
+        self.assertFalse(os.path.exists(spill.path))
+
+    def test_record_spool(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            spool = RecordSpool(10, spill_dir, frame_size=4)
+
+            spool.extend({'id': i} for i in range(8))
+            self.assertFalse(spool.spilled)
+
+            spool.extend({'id': i} for i in range(8, 25))
+            self.assertTrue(spool.spilled)
+            self.assertEqual(1, len(os.listdir(spill_dir)))
+            self.assertEqual(1, len(spool._buffer))
+
+            self.assertEqual(25, len(spool))
+            self.assertEqual(list(range(25)), [r['id'] for r in spool])
+            self.assertEqual({'id': 24}, spool[-1])
+            self.assertEqual([{'id': 3}, {'id': 4}], spool[3:5])
+            with self.assertRaises(IndexError):
+                spool[25]
+
+            spool.close()
+            self.assertEqual([], os.listdir(spill_dir))
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+
+from transpydata.util.workqueue import WorkQueue, key_ranges, source_slices
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(self._tmp_dir.name, lease_timeout=30,
+                               max_attempts=2)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_claim_and_complete(self):
+        self.assertEqual(3, self.queue.submit(source_slices(10, 4)))
+        self.assertEqual(0, self.queue.submit(source_slices(10, 4)))
+
+        unit, claim = self.queue.claim('w1')
+        other, _ = self.queue.claim('w2')
+
+        self.assertEqual({'start': 0, 'stop': 4}, {k: unit[k] for k in ('start', 'stop')})
+        self.assertNotEqual(unit['id'], other['id'])
+        self.assertTrue(self.queue.complete(claim, {'records': 4}))
+        self.assertEqual({'pending': 1, 'claimed': 1, 'done': 1, 'failed': 0},
+                         self.queue.counts())
+        self.assertEqual({'records': 4}, self.queue.units('done')[0]['metrics'])
+        self.assertFalse(self.queue.is_finished())
+
+    def test_expired_lease_reassigned(self):
+        self.queue.submit(source_slices(4, 4))
+        _, claim = self.queue.claim('dead')
+
+        past = time.time() - 60
+        os.utime(claim, (past, past))
+
+        self.assertEqual(1, self.queue.requeue_expired())
+        unit, new_claim = self.queue.claim('alive')
+
+        self.assertEqual(1, unit['attempts'])
+        self.assertFalse(self.queue.heartbeat(claim))
+        self.assertFalse(self.queue.complete(claim, {}))
+        self.assertTrue(self.queue.complete(new_claim, {}))
+
+    def test_failed_after_max_attempts(self):
+        self.queue.submit(source_slices(4, 4))
+
+        for _ in range(2):
+            _, claim = self.queue.claim('w1')
+            self.assertTrue(self.queue.release(claim, 'Boom'))
+
+        self.assertIsNone(self.queue.claim('w1'))
+        self.assertTrue(self.queue.is_finished())
+        self.assertEqual('Boom', self.queue.units('failed')[0]['error'])
+
+    def test_key_ranges(self):
+        units = key_ranges('id', 1, 10, 3)
+
+        self.assertEqual([(1, 4), (4, 8), (8, 11)],
+                         [(u['low'], u['high']) for u in units])
+        self.assertEqual(1, len(key_ranges('id', 5, 5, 3)))
@@ -1,12 +1,23 @@
 import logging
+from collections.abc import Sequence
+from concurrent.futures import Future
+from itertools import islice
 from typing import Type, Union, List
 
 from clinlog.logging import get_logger
 
-from transpydata.config import IProcessor, IResourceAware
+from transpydata.config import (
+    IProcessor, IResourceAware, IOwnershipAware, IPredicatePushdown,
+    ICheckpointable, IStreamingInput
+)
 from transpydata.config.datainput import IDataInput
-from transpydata.config.dataprocess import IDataProcess
+from transpydata.config.dataprocess import (
+    IDataProcess, ChainDataProcess, FilterDataProcess
+)
 from transpydata.config.dataoutput import IDataOutput
+from transpydata.util.batches import RecordBatch, adapt_input
+from transpydata.util.checkpoint import Checkpointer, CheckpointStore
+from transpydata.util.spill import RecordSpool
 
 
 
@@ -22,7 +33,7 @@ class TransPy():
         self.log_level = logging.INFO
 
         self.datainput = None # type: IDataInput
-        self.dataprocess = None # type: IDataProcess
+        self.dataprocess = None # type: Union[IDataProcess, List[IDataProcess]]
         self.dataoutput = None # type: IDataOutput
 
         self._datainput_by_one = False
@@ -32,37 +43,122 @@ class TransPy():
         self._dataservices_init = self._default_dataservices_init()
 
         self._datainput_source = []
+        self._datainput_slice = None # type: tuple
+        self._inplace_records = None # type: bool
+
+        self._memory_budget = None # type: int
+        self._spill_dir = None # type: str
+        self._spill_frame_size = 1000
+        self._spools = [] # type: List[RecordSpool]
+
+        self._checkpoint_path = None # type: str
+        self._checkpoint_interval = 1000
+        self._checkpointer = None # type: Checkpointer
 
     def configure(self, config: dict):
         self._datainput_by_one = config.get('datainput_by_one',
                                             self._datainput_by_one)
         self._datainput_source = config.get('datainput_source',
                                             self._datainput_source)
+        self._datainput_slice = config.get('datainput_slice',
+                                           self._datainput_slice)
         self._dataprocess_by_one = config.get('dataprocess_by_one',
                                               self._dataprocess_by_one)
         self._dataoutput_by_one = config.get('dataoutput_by_one',
                                              self._dataprocess_by_one)
-
-    def run(self) -> List[dict]:
+        self._inplace_records = config.get('inplace_records',
+                                           self._inplace_records)
+        self._memory_budget = config.get('memory_budget', self._memory_budget)
+        self._spill_dir = config.get('spill_dir', self._spill_dir)
+        self._spill_frame_size = config.get('spill_frame_size',
+                                            self._spill_frame_size)
+        self._checkpoint_path = config.get('checkpoint_path',
+                                           self._checkpoint_path)
+        self._checkpoint_interval = config.get('checkpoint_interval',
+                                               self._checkpoint_interval)
+        self._check_datainput_slice()
+
+    def set_datainput_slice(self, datainput_slice: Union[tuple, None]):
+        """ Set `datainput_slice` (start, stop) without reconfiguring.
+        """
+        self._datainput_slice = datainput_slice
+        self._check_datainput_slice()
+
+    def set_checkpoint_path(self, checkpoint_path: Union[str, None]):
+        """ Set `checkpoint_path` without reconfiguring, `None` disables
+            checkpointing.
+        """
+        self._checkpoint_path = checkpoint_path
+
+    def run(self, resume: bool = False) -> List[dict]:
+        """ Run the migration.
+
+        Args:
+            resume (bool, optional): Resume from the state in
+                `checkpoint_path`, skipping input records already delivered.
+                Defaults to False.
+
+        Returns:
+            List[dict]: Output results (of the records processed in this run)
+        """
+        self._build_dataprocess_chain()
         self._processors_checks()
+        self._check_datainput_slice()
         self._setup()
+        self._set_records_ownership()
+        self._push_down_filters()
+
+        skip = self._start_checkpoint(resume)
+        if skip is None:
+            self.logger.info(">> Migration already finished, nothing to resume")
+            return []
+
         self.logger.info(">> Migration started")
 
+        try:
+            processed_data = self._run_pipeline(skip)
+        except BaseException:
+            if self._checkpointer is not None:
+                self._checkpointer.save()
+            raise
+        finally:
+            self._close_spools()
+
+        self.logger.info(">> Migration finished")
+
+        return processed_data
+
+    def _run_pipeline(self, skip: int) -> List[dict]:
         # Get data input
         self._log_input_pipeline()
         processed_data = []
         if self._datainput_by_one:
-            processed_data = self._single_processing_pipe(self._datainput_source,
+            source = self._skip(self._slice_input(self._datainput_source), skip)
+            processed_data = self._single_processing_pipe(source,
                                                           self._datainput_by_one,
                                                           self._dataprocess_by_one,
                                                           self._dataoutput_by_one)
+        elif self._is_input_streamable():
+            processed_data = self._stream_input()
+            self.logger.info("Datainput result lenght: %s", len(processed_data))
+            processed_data = self._skip(processed_data, skip)
         else:
             processed_data = self._exec_process(self.datainput, False,
                                                 self.DATAINPUT_PROC_ID)
             self.logger.info("Datainput result lenght: %s", len(processed_data))
+            # Already in memory, copying it to a spool would not lower the
+            # peak memory use
+            processed_data = self._skip(processed_data, skip)
 
         self._dispose_dataservice(self.datainput, self.DATAINPUT_PROC_ID)
 
+        if self._is_checkpoint_chunked():
+            processed_data = self._checkpointed_pipe(processed_data)
+            self._dispose_dataservice(self.dataprocess, self.DATAPROCESS_PROC_ID)
+            self._dispose_dataservice(self.dataoutput, self.DATAOUTPUT_PROC_ID)
+
+            return self._finish_results(processed_data)
+
         # Process data
         self._log_process_pipeline()
         if not self._datainput_by_one and self._dataprocess_by_one:
@@ -72,10 +168,17 @@ class TransPy():
                                                           self._dataoutput_by_one)
         elif not self._dataprocess_by_one:
             self.logger.info("Dataprocess input data lenght: %s", len(processed_data))
-            processed_data = self._exec_process(self.dataprocess, False,
-                                                self.DATAPROCESS_PROC_ID,
-                                                processed_data)
+            input_data = processed_data
+            if self._is_streamable(input_data):
+                processed_data = self._stream_process(input_data)
+            else:
+                processed_data = self._exec_process(self.dataprocess, False,
+                                                    self.DATAPROCESS_PROC_ID,
+                                                    input_data)
             self.logger.info("Dataprocess result lenght: %s", len(processed_data))
+            processed_data = self._spool(processed_data)
+            self._release(input_data, processed_data)
+            del input_data # Not referenced while data is sent
 
         self._dispose_dataservice(self.dataprocess, self.DATAPROCESS_PROC_ID)
 
@@ -95,17 +198,33 @@ class TransPy():
 
         self._dispose_dataservice(self.dataoutput, self.DATAOUTPUT_PROC_ID)
 
-        self.logger.info(">> Migration finished")
+        return self._finish_results(processed_data)
 
-        return processed_data
+    def _finish_results(self, results: list) -> list:
+        results = self._resolve_deferred_results(results)
+        if self._checkpointer is not None:
+            self._checkpointer.finish()
+            self.logger.info("Checkpoint finished. Delivered: %s, failed: %s",
+                             self._checkpointer.delivered,
+                             self._checkpointer.failed)
+
+        return results
 
     def _single_processing_pipe(self, input_data: list, datainput_by_one: bool,
                                 dataprocess_by_one: bool, dataoutput_by_one: bool):
         self.logger.info("Starting processing by one pipeline. Input length: %s",
                          len(input_data))
-        collected_data = []
+        collected_data = self._new_collection()
         piped_data = None
-        for input_datum in input_data:
+
+        # Output results are delivered by input record when input or process
+        # go by one too
+        checkpointer = None
+        if dataoutput_by_one and (datainput_by_one or dataprocess_by_one):
+            checkpointer = self._checkpointer
+        base_position = checkpointer.position if checkpointer else 0
+
+        for i, input_datum in enumerate(input_data):
             piped_data = input_datum
 
             if datainput_by_one:
@@ -113,12 +232,21 @@ class TransPy():
                                                 datainput_by_one,
                                                 self.DATAINPUT_PROC_ID,
                                                 piped_data)
+                if piped_data is None: # Dropped by pushed down predicates
+                    if checkpointer:
+                        checkpointer.commit(base_position + i + 1, input_datum, [])
+                    continue
+            input_record = piped_data
 
             if dataprocess_by_one:
                 piped_data = self._exec_process(self.dataprocess,
                                                 dataprocess_by_one,
                                                 self.DATAPROCESS_PROC_ID,
                                                 piped_data)
+                if piped_data is None: # Dropped by dataprocess
+                    if checkpointer:
+                        checkpointer.commit(base_position + i + 1, input_record, [])
+                    continue
 
             if datainput_by_one and not dataprocess_by_one:
                 collected_data.append(piped_data)
@@ -131,20 +259,209 @@ class TransPy():
                                                 piped_data)
 
             collected_data.append(piped_data)
+            if checkpointer:
+                checkpointer.commit(base_position + i + 1, input_record,
+                                    [piped_data])
 
         self.logger.info("Finished processing by one pipeline. Output length: %s",
                          len(input_data))
 
         return collected_data
 
+    def _start_checkpoint(self, resume: bool) -> Union[int, None]:
+        """ Create the checkpointer and load the resumed state.
+
+        Returns:
+            Union[int, None]: Input records to skip. `None` if the resumed
+                run already finished.
+        """
+        self._checkpointer = None
+        if not self._checkpoint_path:
+            if resume:
+                raise RuntimeError("'checkpoint_path' is needed to resume")
+            return 0
+
+        store = CheckpointStore(self._checkpoint_path)
+        state = store.load() if resume else None
+
+        input_state = None
+        if isinstance(self.datainput, ICheckpointable):
+            input_state = self.datainput.checkpoint_state
+
+        self._checkpointer = Checkpointer(store, self._checkpoint_interval,
+                                          state, input_state)
+        if not state:
+            return 0
+
+        if state.get('finished'):
+            return None
+
+        self.logger.info("Resuming migration from input position %s",
+                         state['position'])
+        # Keyset resume returns the input from the last delivered key, only
+        # for inputs run all at once and without `datainput_slice` (its
+        # indexes refer to the whole input, positions are skipped instead)
+        if (not self._datainput_by_one and self._datainput_slice is None
+            and state.get('input') is not None
+            and input_state is not None
+            and self.datainput.restore_checkpoint(state['input'])):
+            return 0
+
+        return state['position']
+
+    def _skip(self, data, skip: int):
+        """ Input data without the first `skip` records.
+        """
+        if not skip:
+            return data
+
+        return self._get_input_range(data, skip, None)
+
+    def _slice_input(self, data):
+        """ Items of `datainput_source` in `datainput_slice` (start, stop),
+            e.g. the work unit of a coordinated worker.
+        """
+        if self._datainput_slice is None:
+            return data
+
+        return self._get_input_range(data, *self._datainput_slice)
+
+    def _get_input_range(self, data, start: int, stop: Union[int, None]):
+        if isinstance(data, RecordBatch):
+            data = data.to_records()
+
+        if isinstance(data, RecordSpool) and data.spilled:
+            spool = self._new_collection()
+            spool.extend(islice(data, start, stop))
+            data.close()
+            return spool
+
+        if isinstance(data, Sequence):
+            return data[start:stop]
+
+        return list(islice(data, start, stop))
+
+    def _is_checkpoint_chunked(self) -> bool:
+        """ All at once pipelines are run by chunks of `checkpoint_interval`
+            input records when checkpointing, if the dataprocess is record
+            wise (otherwise only the finished state is saved).
+        """
+        if (self._checkpointer is None or self._datainput_by_one
+            or self._dataprocess_by_one or self._dataoutput_by_one):
+            return False
+
+        is_record_wise = getattr(self.dataprocess, 'is_record_wise', None)
+
+        return bool(is_record_wise and is_record_wise())
+
+    def _checkpointed_pipe(self, input_data: list) -> list:
+        if isinstance(input_data, RecordBatch):
+            input_data = input_data.to_records()
+
+        checkpointer = self._checkpointer
+        base_position = checkpointer.position
+        interval = self._checkpoint_interval
+
+        results = []
+        for start in range(0, len(input_data), interval):
+            chunk = input_data[start:start + interval]
+            processed_data = self._exec_process(self.dataprocess, False,
+                                                self.DATAPROCESS_PROC_ID,
+                                                chunk)
+            sent = list(self._exec_process(self.dataoutput, False,
+                                           self.DATAOUTPUT_PROC_ID,
+                                           processed_data))
+            results.extend(sent)
+            checkpointer.commit(base_position + start + len(chunk), chunk[-1],
+                                sent)
+
+        return results
+
+    def _spool(self, data: list) -> list:
+        """ Move an intermediate result over the memory budget to a
+            `RecordSpool`, next stage reads it from disk. Batches over the
+            budget are spilled as records.
+        """
+        if (self._memory_budget is None or isinstance(data, RecordSpool)
+            or len(data) <= self._memory_budget):
+            return data
+
+        spool = self._new_collection()
+        spool.extend(data)
+        self.logger.info("Intermediate data spilled to disk: %s records",
+                         len(spool))
+
+        return spool
+
+    def _is_input_streamable(self) -> bool:
+        """ With a memory budget, inputs able to fetch by chunks are read
+            straight into a `RecordSpool`.
+        """
+        return (self._memory_budget is not None
+                and isinstance(self.datainput, IStreamingInput))
+
+    def _stream_input(self) -> RecordSpool:
+        self._initialize_dataservice(self.datainput, self.DATAINPUT_PROC_ID)
+        spool = self._new_collection()
+        spool.extend(self.datainput.iter_all())
+        if spool.spilled:
+            self.logger.info("Datainput spilled to disk: %s records", len(spool))
+
+        return spool
+
+    def _new_collection(self) -> list:
+        if self._memory_budget is None:
+            return []
+
+        spool = RecordSpool(self._memory_budget, self._spill_dir,
+                            self._spill_frame_size)
+        self._spools.append(spool)
+
+        return spool
+
+    def _is_streamable(self, data: list) -> bool:
+        """ Spilled data, or records over the memory budget, through a
+            record wise dataprocess are processed by one, so the result is
+            spilled as it is produced.
+        """
+        if self._memory_budget is None or isinstance(data, RecordBatch):
+            return False
+
+        is_record_wise = getattr(self.dataprocess, 'is_record_wise', None)
+        if not (is_record_wise and is_record_wise()):
+            return False
+
+        if isinstance(data, RecordSpool):
+            return data.spilled
+
+        return len(data) > self._memory_budget
+
+    def _stream_process(self, input_data: list) -> RecordSpool:
+        processed_data = self._new_collection()
+        for datum in input_data:
+            piped_data = self._exec_process(self.dataprocess, True,
+                                            self.DATAPROCESS_PROC_ID, datum)
+            if piped_data is not None:
+                processed_data.append(piped_data)
+
+        return processed_data
+
+    def _release(self, previous: list, current: list):
+        """ Remove spilled data of a stage input once it is processed.
+        """
+        if previous is not current and isinstance(previous, RecordSpool):
+            previous.close()
+
+    def _close_spools(self):
+        for spool in self._spools:
+            spool.close()
+        self._spools = []
+
     def _exec_process(self, processor: IProcessor,
                       process_by_one: bool, dataprocessor_id: str,
                       process_input: Union[dict,list]=None) -> Union[dict,list]:
 
-        if (not self._dataservices_init[dataprocessor_id]
-            and isinstance(processor, IResourceAware)):
-            processor.initialize()
-            self._dataservices_init[dataprocessor_id] = True
+        self._initialize_dataservice(processor, dataprocessor_id)
 
         process_m_name = processor.process_all_method_name()
         if process_by_one:
@@ -155,8 +472,24 @@ class TransPy():
         if process_input is None:
             return process_m()
 
+        if not process_by_one:
+            process_input = adapt_input(processor, process_input)
+
         return process_m(process_input)
 
+    def _initialize_dataservice(self, dataservice: IProcessor,
+                                dataservice_id: str):
+        if (not self._dataservices_init[dataservice_id]
+            and isinstance(dataservice, IResourceAware)):
+            dataservice.initialize()
+            self._dataservices_init[dataservice_id] = True
+
+    def _resolve_deferred_results(self, results: list) -> list:
+        """ Replace `Future` results (e.g. from buffered outputs) with their
+            values. Outputs flush pending work on dispose, so they are done here.
+        """
+        return [r.result() if isinstance(r, Future) else r for r in results]
+
     def _setup(self):
         if not self.logger:
             self.logger = get_logger()
@@ -171,6 +504,54 @@ class TransPy():
         if self.dataoutput.logger is None:
             self.dataoutput.logger = self.logger
 
+    def _build_dataprocess_chain(self):
+        """ A list of data processes is run as a `ChainDataProcess`.
+        """
+        if isinstance(self.dataprocess, (list, tuple)):
+            self.dataprocess = ChainDataProcess({'stages': self.dataprocess})
+
+    def _set_records_ownership(self):
+        """ Records produced by datainput are only referenced by the pipeline,
+            when enabled dataprocess and dataoutput can modify them in place.
+            Services keep their own `inplace` config when `inplace_records` is
+            not set.
+        """
+        if self._inplace_records is None:
+            return
+
+        for dataservice in [self.dataprocess, self.dataoutput]:
+            if isinstance(dataservice, IOwnershipAware):
+                dataservice.set_records_owned(self._inplace_records)
+
+    def _push_down_filters(self):
+        """ Predicates of the filters at the start of dataprocess are pushed
+            down to datainput when it supports it, so it does not fetch
+            records that would be dropped.
+        """
+        if not isinstance(self.datainput, IPredicatePushdown):
+            return
+
+        stages = [self.dataprocess]
+        if isinstance(self.dataprocess, ChainDataProcess):
+            stages = self.dataprocess.stages
+
+        predicates = []
+        for stage in stages:
+            if not isinstance(stage, FilterDataProcess) or not stage.pushdown:
+                break
+            predicates.extend(stage.predicates)
+
+        if predicates and self.datainput.push_down_predicates(predicates):
+            self.logger.info("%s predicates pushed down to datainput",
+                             len(predicates))
+
+    def _check_datainput_slice(self):
+        """ Slices apply to `datainput_source`. Inputs run all at once would
+            still read (and maybe consume) records out of the slice.
+        """
+        if self._datainput_slice is not None and not self._datainput_by_one:
+            raise RuntimeError("'datainput_slice' needs 'datainput_by_one'")
+
     def _processors_checks(self):
         if not isinstance(self.datainput, IDataInput):
             self._raise_processor_not_implemented(self.datainput, IDataInput)
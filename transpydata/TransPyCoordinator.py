@@ -0,0 +1,317 @@
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List
+
+from clinlog.logging import get_logger
+
+from transpydata.TransPy import TransPy
+from transpydata.config import IPredicatePushdown
+from transpydata.config.dataprocess import ChainDataProcess, FilterDataProcess
+from transpydata.util.predicates import Predicate
+from transpydata.util.workqueue import WorkQueue, key_ranges, source_slices
+
+
+class TransPyCoordinator():
+    """ Run a migration split in work units across worker processes, in one
+        or several machines sharing the queue directory. Config dict format:
+        {
+            'factory': Callable[[], TransPy], # Returns a configured `TransPy`
+                for a work unit. Must be picklable (module level function) to
+                run in worker processes
+            'queue_dir': str, # Work queue directory (refer to `WorkQueue`).
+                Shared filesystem path when running in several machines
+            'workers': int, # Worker processes started by `run`. Default
+                number of CPUs
+            'lease_timeout': float, # Seconds without heartbeat after which a
+                unit is reassigned. Default 60
+            'heartbeat_interval': float, # Seconds between worker heartbeats.
+                Default 10
+            'max_attempts': int, # Attempts per unit before it is marked as
+                failed. Default 3
+            'poll_interval': float # Seconds between queue checks. Default 1
+        }
+
+        Work units are slices of the input records (`partition_source`,
+        applied as `datainput_slice`, so the unit `TransPy` must get its
+        records by one from `datainput_source`) or ranges of an integer key
+        (`partition_key_ranges`, applied as a `FilterDataProcess` before the
+        unit dataprocess and pushed down, so inputs like `MysqlDataInput` only
+        query the range). Key range units need an input implementing
+        `IPredicatePushdown`, otherwise every unit would read the whole
+        source. Units are submitted once, `run` (or `work` on other
+        machines) processes them until the queue is finished and `metrics`
+        merges the metrics of done units. Units are delivered at least once:
+        a unit reassigned from a worker that was only slow runs twice.
+
+        `TransPy` checkpointing is disabled in units, done units are skipped
+        when the queue is run again.
+    """
+
+    def __init__(self, config: dict = None):
+        self.logger = None # type: logging.Logger
+        self.log_level = logging.INFO
+
+        self._factory = None # type: Callable[[], TransPy]
+        self._queue_dir = None # type: str
+        self._workers = os.cpu_count() or 1
+        self._lease_timeout = 60.0
+        self._heartbeat_interval = 10.0
+        self._max_attempts = 3
+        self._poll_interval = 1.0
+
+        self._queue = None # type: WorkQueue
+
+        if config: self.configure(config)
+
+    def configure(self, config: dict):
+        self._factory = config.get('factory', self._factory)
+        self._queue_dir = config.get('queue_dir', self._queue_dir)
+        self._workers = config.get('workers', self._workers)
+        self._lease_timeout = config.get('lease_timeout', self._lease_timeout)
+        self._heartbeat_interval = config.get('heartbeat_interval',
+                                              self._heartbeat_interval)
+        self._max_attempts = config.get('max_attempts', self._max_attempts)
+        self._poll_interval = config.get('poll_interval', self._poll_interval)
+
+        if not callable(self._factory):
+            raise RuntimeError("'factory' needs to be provided")
+        if not self._queue_dir:
+            raise RuntimeError("'queue_dir' needs to be provided")
+        if self._heartbeat_interval >= self._lease_timeout:
+            raise RuntimeError("'heartbeat_interval' must be lower than 'lease_timeout'")
+
+        self._queue = WorkQueue(self._queue_dir, self._lease_timeout,
+                                self._max_attempts)
+
+    @property
+    def queue(self) -> WorkQueue:
+        return self._queue
+
+    def partition_source(self, length: int, unit_size: int) -> int:
+        """ Submit units with slices of `unit_size` items of the
+            `datainput_source` (run by one) of `length` items.
+
+        Returns:
+            int: Units submitted
+        """
+        return self._queue.submit(source_slices(length, unit_size))
+
+    def partition_key_ranges(self, key: str, num_units: int,
+                             low: int = None, high: int = None) -> int:
+        """ Submit units with ranges of integer column `key`. Bounds default
+            to the ones returned by the datainput `get_key_bounds` (e.g.
+            `MysqlDataInput`).
+
+        Returns:
+            int: Units submitted
+        """
+        datainput = self._factory().datainput
+        self._check_pushdown(datainput)
+        if low is None or high is None:
+            if not hasattr(datainput, 'get_key_bounds'):
+                raise RuntimeError(
+                    "'{}' can not get key bounds, provide 'low' and 'high'"
+                    .format(datainput.__class__.__name__)
+                )
+
+            datainput.initialize()
+            try:
+                low, high = datainput.get_key_bounds(key)
+            finally:
+                datainput.dispose()
+
+        if low is None: # No records
+            return 0
+
+        return self._queue.submit(key_ranges(key, low, high, num_units))
+
+    def run(self) -> dict:
+        """ Process the queue with `workers` local processes. Workers that die
+            are replaced while there is work left, their units are reassigned
+            when the lease expires.
+
+        Returns:
+            dict: Merged metrics (refer to `metrics`)
+        """
+        self._setup()
+        self.logger.info(">> Coordinated migration started. Units: %s",
+                         self._queue.counts())
+
+        context = multiprocessing.get_context()
+        processes = [] # type: List[multiprocessing.Process]
+        try:
+            while True:
+                self._queue.requeue_expired()
+                if self._queue.is_finished():
+                    break
+
+                processes = [p for p in processes if p.is_alive()]
+                while len(processes) < self._workers:
+                    process = context.Process(target=_work,
+                                              args=(self._config_for_workers(),))
+                    process.start()
+                    processes.append(process)
+
+                time.sleep(self._poll_interval)
+        finally:
+            for process in processes:
+                process.join()
+
+        metrics = self.metrics()
+        self.logger.info(">> Coordinated migration finished. %s", metrics)
+
+        return metrics
+
+    def work(self, worker_id: str = None) -> int:
+        """ Process units in this process until the queue is finished. Run it
+            in each machine sharing the queue directory.
+
+        Returns:
+            int: Units completed by this worker
+        """
+        self._setup()
+        worker_id = worker_id or '{}-{}'.format(socket.gethostname(), os.getpid())
+
+        completed = 0
+        while True:
+            claimed = self._queue.claim(worker_id)
+            if claimed is None:
+                self._queue.requeue_expired()
+                if self._queue.is_finished():
+                    return completed
+
+                time.sleep(self._poll_interval)
+                continue
+
+            unit, claim = claimed
+            if self._run_unit(worker_id, unit, claim):
+                completed += 1
+
+    def metrics(self) -> dict:
+        """ Metrics of done units merged: records, seconds and throughput, in
+            total and by worker.
+        """
+        counts = self._queue.counts()
+        workers = {} # type: Dict[str, dict]
+        records = 0
+        seconds = 0.0
+        start = end = None
+        for unit in self._queue.units('done'):
+            unit_metrics = unit.get('metrics', {})
+            records += unit_metrics.get('records', 0)
+            seconds += unit_metrics.get('seconds', 0.0)
+            start = min(filter(None, [start, unit_metrics.get('started')]), default=None)
+            end = max(filter(None, [end, unit_metrics.get('finished')]), default=None)
+
+            worker = workers.setdefault(unit_metrics.get('worker'),
+                                        {'units': 0, 'records': 0, 'seconds': 0.0})
+            worker['units'] += 1
+            worker['records'] += unit_metrics.get('records', 0)
+            worker['seconds'] += unit_metrics.get('seconds', 0.0)
+
+        elapsed = end - start if start is not None and end is not None else 0.0
+
+        return {
+            'units': counts,
+            'records': records,
+            'unit_seconds': seconds,
+            'elapsed': elapsed,
+            'throughput': records / elapsed if elapsed else 0.0,
+            'workers': workers
+        }
+
+    def _run_unit(self, worker_id: str, unit: dict, claim: str) -> bool:
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(claim, stop),
+                                     daemon=True)
+        heartbeat.start()
+
+        started = time.time()
+        try:
+            results = self._get_unit_transpy(unit).run()
+        except Exception:
+            self.logger.error("Unit %s failed:\n%s", unit['id'], traceback.format_exc())
+            self._queue.release(claim, traceback.format_exc(limit=5))
+            return False
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        finished = time.time()
+        done = self._queue.complete(claim, {
+            'worker': worker_id,
+            'records': len(results),
+            'seconds': finished - started,
+            'started': started,
+            'finished': finished,
+            'attempt': unit.get('attempts', 0) + 1
+        })
+        if not done:
+            self.logger.warning("Unit %s lease lost, it was reassigned", unit['id'])
+
+        return done
+
+    def _get_unit_transpy(self, unit: dict) -> TransPy:
+        trans_py = self._factory()
+        trans_py.set_checkpoint_path(None)
+
+        if unit['kind'] == 'slice':
+            trans_py.set_datainput_slice((unit['start'], unit['stop']))
+        elif unit['kind'] == 'key_range':
+            self._check_pushdown(trans_py.datainput)
+            unit_filter = FilterDataProcess({'predicates': [
+                Predicate(unit['key'], '>=', unit['low']),
+                Predicate(unit['key'], '<', unit['high'])
+            ]})
+            stages = trans_py.dataprocess
+            if isinstance(stages, ChainDataProcess):
+                stages = stages.stages
+            elif not isinstance(stages, (list, tuple)):
+                stages = [stages]
+            trans_py.dataprocess = ChainDataProcess({
+                'stages': [unit_filter] + list(stages)
+            })
+        else:
+            raise RuntimeError("Unknown work unit kind '{}'".format(unit['kind']))
+
+        return trans_py
+
+    def _check_pushdown(self, datainput):
+        if not isinstance(datainput, IPredicatePushdown):
+            raise RuntimeError(
+                "Key range units need a datainput implementing "
+                "'IPredicatePushdown', '{}' does not"
+                .format(datainput.__class__.__name__)
+            )
+
+    def _heartbeat(self, claim: str, stop: threading.Event):
+        while not stop.wait(self._heartbeat_interval):
+            if not self._queue.heartbeat(claim):
+                return
+
+    def _config_for_workers(self) -> dict:
+        return {
+            'factory': self._factory,
+            'queue_dir': self._queue_dir,
+            'workers': self._workers,
+            'lease_timeout': self._lease_timeout,
+            'heartbeat_interval': self._heartbeat_interval,
+            'max_attempts': self._max_attempts,
+            'poll_interval': self._poll_interval
+        }
+
+    def _setup(self):
+        if not self.logger:
+            self.logger = get_logger()
+        self.logger.setLevel(self.log_level)
+
+
+def _work(config: dict):
+    """ Worker process entry point.
+    """
+    TransPyCoordinator(config).work()
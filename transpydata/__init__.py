@@ -1 +1,2 @@
 from .TransPy import TransPy
+from .TransPyCoordinator import TransPyCoordinator
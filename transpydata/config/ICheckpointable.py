@@ -0,0 +1,31 @@
+from abc import ABCMeta, abstractmethod
+
+
+class ICheckpointable(metaclass=ABCMeta):
+    @abstractmethod
+    def checkpoint_state(self, record: dict) -> dict:
+        """ State needed to resume reading after `record`, the last input
+            record delivered. Stored as JSON in the checkpoint file.
+
+        Args:
+            record (dict): Last delivered input record
+
+        Returns:
+            dict: JSON serializable state
+        """
+        pass
+
+    @abstractmethod
+    def restore_checkpoint(self, state: dict) -> bool:
+        """ Resume reading from a state returned by `checkpoint_state`. Only
+            called when the input runs all at once, inputs run by one are
+            resumed by position in `datainput_source`.
+
+        Args:
+            state (dict): Checkpointed state
+
+        Returns:
+            bool: Whether the input skips delivered records itself. If not,
+                `TransPy` skips them by position.
+        """
+        pass
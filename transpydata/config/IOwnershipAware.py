@@ -0,0 +1,14 @@
+from abc import ABCMeta, abstractmethod
+
+
+class IOwnershipAware(metaclass=ABCMeta):
+    @abstractmethod
+    def set_records_owned(self, owned: bool):
+        """ Set whether the records received are owned by the class. Owned
+            records are not referenced anywhere else, so they can be modified
+            in place instead of being copied.
+
+        Args:
+            owned (bool): Records are owned
+        """
+        pass
@@ -0,0 +1,18 @@
+from abc import ABCMeta, abstractmethod
+from typing import List
+
+
+class IPredicatePushdown(metaclass=ABCMeta):
+    @abstractmethod
+    def push_down_predicates(self, predicates: List['Predicate']) -> bool:
+        """ Apply filter predicates on the source, so records not matching
+            them are not fetched. Replaces predicates pushed previously, an
+            empty list removes them.
+
+        Args:
+            predicates (List[Predicate]): Predicates (all must match)
+
+        Returns:
+            bool: Whether predicates were applied.
+        """
+        pass
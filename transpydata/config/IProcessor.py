@@ -19,3 +19,14 @@ class IProcessor(metaclass=ABCMeta):
             str: Method name
         """
         raise NotImplementedError
+
+    def accepts_batches(self) -> bool:
+        """ Whether the process all method accepts columnar batches
+            (`transpydata.util.batches.RecordBatch`) besides record lists.
+            Batches are converted to records for processors not accepting
+            them.
+
+        Returns:
+            bool: Processor accepts batches. Defaults to `False`.
+        """
+        return False
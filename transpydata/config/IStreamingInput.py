@@ -0,0 +1,14 @@
+from abc import ABCMeta, abstractmethod
+from typing import Iterator
+
+
+class IStreamingInput(metaclass=ABCMeta):
+    @abstractmethod
+    def iter_all(self) -> Iterator[dict]:
+        """ Get all input data as `get_all` does, fetched from the source in
+            chunks, so the whole result is never held in memory.
+
+        Returns:
+            Iterator[dict]: Data entries
+        """
+        pass
@@ -1,6 +1,10 @@
 from .IConfigurable import IConfigurable
 from .IProcessor import IProcessor
 from .IResourceAware import IResourceAware
+from .IOwnershipAware import IOwnershipAware
+from .IPredicatePushdown import IPredicatePushdown
+from .ICheckpointable import ICheckpointable
+from .IStreamingInput import IStreamingInput
 from .LoggableMixin import LoggableMixin
 
 from .IDataService import IDataService
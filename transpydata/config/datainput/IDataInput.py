@@ -26,7 +26,8 @@ class IDataInput(IDataService, metaclass=ABCMeta):
             data (dict): Data to parametrize/query the data input.
 
         Returns:
-            dict: Data entry
+            dict: Data entry. `None` drops the entry (e.g. rejected by pushed
+                down predicates).
         """
         raise NotImplementedError
 
@@ -1,9 +1,16 @@
+from typing import Iterator, List
+
 import mysql.connector
 
+from transpydata.config import ICheckpointable, IPredicatePushdown, IStreamingInput
+from transpydata.util.batches import RecordBatch
+from transpydata.util.predicates import Predicate
+from transpydata.util.records import Record, Schema
 from .IDataInput import IDataInput
 
 
-class MysqlDataInput(IDataInput):
+class MysqlDataInput(IDataInput, IPredicatePushdown, ICheckpointable,
+                     IStreamingInput):
     """ DataInput to get data from Mysql. Config dict format:
     {
         'db_config': {
@@ -20,9 +27,35 @@ class MysqlDataInput(IDataInput):
             with printf synthax
 
         'all_query_params': dict, # Params to interpolate in query
+
+        'compact_records': bool, # Return `Record` instances (column names
+            shared by all rows of a query) instead of dicts. Default `False`
+
+        'record_batches': bool, # `get_all` returns a columnar `RecordBatch`
+            built from the cursor rows. Default `False`
+
+        'fetch_size': int, # Rows fetched at a time by `iter_all`, used by
+            `TransPy` with a `memory_budget` to spill `get_all_query` results
+            without loading them in memory. It yields `Record` instances
+            with `compact_records` or `record_batches`. Default 1000
+
+        'checkpoint_key': str, # Unique column `get_all_query` is ordered
+            by. Checkpoints store the key of the last delivered row and resumed
+            runs only query rows after it (keyset). Without it resumed runs
+            skip rows by position, as `get_one` queries always do
     }
 
+    Filter predicates pushed down (`push_down_predicates`) wrap the queries
+    as `SELECT * FROM (<query>) AS _tpd_filtered WHERE ...`, so the query
+    columns must have unique names. Predicates on nested fields are not
+    pushed down. With `checkpoint_key` the `get_all_query` is always wrapped
+    and ordered by it.
     """
+
+    SQL_OPS = {'==': '=', '!=': '<>', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+    PARAM_PREFIX = '_tpd_p'
+    RESUME_PARAM = '_tpd_resume'
+
     def __init__(self, config: dict = None):
         self._config = config
 
@@ -31,9 +64,18 @@ class MysqlDataInput(IDataInput):
         self._get_one_query = ''
         self._get_all_query = ''
         self._all_query_params = {}
+        self._compact_records = False
+        self._record_batches = False
+        self._fetch_size = 1000
 
         self._page_size = 0 # TODO: Not used for now
 
+        self._filter_where = ''
+        self._filter_params = {}
+
+        self._checkpoint_key = None # type: str
+        self._resume_after = None
+
         if config: self.configure(config)
 
     def configure(self, config: dict):
@@ -48,6 +90,11 @@ class MysqlDataInput(IDataInput):
         self._get_one_query = config.get('get_one_query', '')
         self._get_all_query = config.get('get_all_query', '')
         self._all_query_params = config.get('all_query_params', {})
+        self._compact_records = config.get('compact_records', False)
+        self._record_batches = config.get('record_batches', False)
+        self._fetch_size = config.get('fetch_size', 1000)
+        self._checkpoint_key = config.get('checkpoint_key', None)
+        self._resume_after = None
 
         if not self._get_one_query and not self._get_all_query:
             raise RuntimeError(
@@ -68,14 +115,139 @@ class MysqlDataInput(IDataInput):
             self._db_connection.close()
 
     def _get_db_cursor(self) -> mysql.connector.cursor.MySQLCursor:
-        return self._db_connection.cursor(dictionary=True)
+        return self._db_connection.cursor(
+            dictionary=not (self._compact_records or self._record_batches)
+        )
 
     def get_all(self):
-        return self._fetch_all_query(self._get_all_query, self._all_query_params)
+        return self._fetch_all_query(*self._get_all_query_and_params())
+
+    def iter_all(self) -> Iterator[dict]:
+        query, params = self._get_all_query_and_params()
+        cursor = self._get_db_cursor()
+        try:
+            cursor.execute(query, params)
+            schema = None
+            if self._compact_records or self._record_batches:
+                schema = Schema.get(cursor.column_names)
+
+            rows = cursor.fetchmany(self._fetch_size)
+            while rows:
+                if schema is not None:
+                    yield from (Record(schema, row) for row in rows)
+                else:
+                    yield from rows
+                rows = cursor.fetchmany(self._fetch_size)
+
+        finally:
+            cursor.close()
 
     def get_one(self, data: dict):
-        all_params = {**data, **self._all_query_params}
-        return self._fetch_one_query(self._get_one_query, all_params)
+        all_params = {**data, **self._all_query_params, **self._filter_params}
+        return self._fetch_one_query(self._filter_query(self._get_one_query),
+                                     all_params)
+
+    def push_down_predicates(self, predicates: List[Predicate]) -> bool:
+        if any(p.is_nested for p in predicates):
+            return False
+
+        conditions = []
+        params = {}
+        for predicate in predicates:
+            conditions.append(self._get_condition(predicate, params))
+
+        self._filter_where = ' AND '.join(conditions)
+        self._filter_params = params
+
+        return True
+
+    def get_key_bounds(self, key: str) -> tuple:
+        """ Min and max values of column `key` in `get_all_query` results,
+            to partition the query in key ranges.
+        """
+        column = self._quote_column(key)
+        query = 'SELECT MIN({0}) AS low, MAX({0}) AS high FROM ({1}) AS _tpd_bounds'.format(
+            column, self._get_all_query.strip().rstrip(';')
+        )
+        row = self._fetch_one_query(query, self._all_query_params)
+
+        return row['low'], row['high']
+
+    def checkpoint_state(self, record: dict) -> dict:
+        if not self._checkpoint_key:
+            return {}
+
+        return {'key': record.get(self._checkpoint_key)}
+
+    def restore_checkpoint(self, state: dict) -> bool:
+        if not self._checkpoint_key or state.get('key') is None:
+            return False
+
+        self._resume_after = state['key']
+
+        return True
+
+    def _get_all_query_and_params(self) -> tuple:
+        params = {**self._all_query_params, **self._filter_params}
+        if self._resume_after is not None:
+            params[self.RESUME_PARAM] = self._resume_after
+
+        return self._filter_query(self._get_all_query, True), params
+
+    def _filter_query(self, query: str, keyset: bool = False) -> str:
+        """ Wrap query with the pushed down predicates. With `keyset` (all
+            items query) it is ordered by `checkpoint_key` and resumed rows
+            are skipped.
+        """
+        keyset = keyset and bool(self._checkpoint_key)
+        conditions = [self._filter_where] if self._filter_where else []
+        if keyset and self._resume_after is not None:
+            conditions.append('{} > %({})s'.format(
+                self._quote_column(self._checkpoint_key), self.RESUME_PARAM
+            ))
+
+        if not conditions and not keyset:
+            return query
+
+        query = 'SELECT * FROM ({}) AS _tpd_filtered'.format(query.strip().rstrip(';'))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        if keyset:
+            query += ' ORDER BY ' + self._quote_column(self._checkpoint_key)
+
+        return query
+
+    def _quote_column(self, column: str) -> str:
+        return '`{}`'.format(str(column).replace('`', '``'))
+
+    def _get_condition(self, predicate: Predicate, params: dict) -> str:
+        column = self._quote_column(predicate.field)
+
+        if predicate.op == 'is_null':
+            return column + ' IS NULL'
+        if predicate.op == 'not_null':
+            return column + ' IS NOT NULL'
+
+        if predicate.op in ('in', 'not_in'):
+            # Null values never match, like the Python check. Nulls in the
+            # list would make `NOT IN` always unknown in SQL
+            values = [v for v in predicate.value if v is not None]
+            if not values:
+                return 'FALSE' if predicate.op == 'in' else column + ' IS NOT NULL'
+
+            placeholders = [self._add_param(v, params) for v in values]
+            return '{} {} ({})'.format(column,
+                                       'IN' if predicate.op == 'in' else 'NOT IN',
+                                       ', '.join(placeholders))
+
+        return '{} {} {}'.format(column, self.SQL_OPS[predicate.op],
+                                 self._add_param(predicate.value, params))
+
+    def _add_param(self, value, params: dict) -> str:
+        name = self.PARAM_PREFIX + str(len(params))
+        params[name] = value
+
+        return '%({})s'.format(name)
 
     def _get_paged_query(self, query: str, num_page: int) -> str:
 
@@ -89,8 +261,16 @@ class MysqlDataInput(IDataInput):
         try:
             cursor = self._get_db_cursor()
             cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            if self._record_batches:
+                return RecordBatch.from_rows(Schema.get(cursor.column_names), rows)
 
-            return cursor.fetchall()
+            if self._compact_records:
+                schema = Schema.get(cursor.column_names)
+                return [Record(schema, row) for row in rows]
+
+            return rows
 
         finally:
             cursor.close()
@@ -101,8 +281,12 @@ class MysqlDataInput(IDataInput):
         try:
             cursor = self._get_db_cursor()
             cursor.execute(query, params)
+            row = cursor.fetchone()
+
+            if (self._compact_records or self._record_batches) and row is not None:
+                return Record(Schema.get(cursor.column_names), row)
 
-            return cursor.fetchone()
+            return row
 
         finally:
             cursor.close()
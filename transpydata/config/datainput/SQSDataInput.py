@@ -1,14 +1,17 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from uuid import uuid4
-import json
 
 import boto3
 from botocore.exceptions import ClientError
 
+from transpydata.util import compression
+from transpydata.util.blobstore import IBlobStore, get_blob_store
+from transpydata.util.serialization import JsonSerializer, get_serializer
+from transpydata.config import ICheckpointable
 from . import IDataInput
 
 
-class SQSDataInput(IDataInput):
+class SQSDataInput(IDataInput, ICheckpointable):
     """ DataOutput that sends messages to AWS SQS.
 
     Config dict format:
@@ -32,9 +35,21 @@ class SQSDataInput(IDataInput):
             fields (only works if 'parse_body_as_json' is enabled).
             If not the result dict will contain one field 'message' and
             another 'attributes' with the data inside.
-        'delete_messages': bool # Delete messages after processing. Defaults to `true`.
+        'delete_messages': bool, # Delete messages after processing. Defaults to `true`.
+        'serializer': Union[str, JsonSerializer], # JSON backend ('auto', 'json',
+            'orjson', 'ujson') or serializer instance. Defaults to 'auto'
+        'blob_store': Union[str, IBlobStore], # Blob store where claim-checked
+            bodies are read from (directory path for a local store or
+            `IBlobStore` instance). Compressed and claim-checked messages sent
+            by `SQSDataOutput` are decoded transparently.
+        'delete_blobs': bool, # Delete claim-checked bodies from the blob store
+            when messages are deleted. Defaults to `false`.
     }
 
+    The queue keeps the progress of resumed runs (received messages are
+    deleted or become visible again), so `TransPy` does not skip records by
+    position.
+
     """
 
     MAX_BATCH_SIZE = 10 # https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sqs.html#SQS.Client.receive_message
@@ -43,11 +58,18 @@ class SQSDataInput(IDataInput):
     BODY_KEY = 'message'
     ATTR_KEY = 'attributes'
 
+    ENCODING_ATTR = 'TranspyContentEncoding'
+    CLAIM_CHECK_ATTR = 'TranspyClaimCheck'
+
     def __init__(self, config: dict = None):
+        super().__init__()
         self.url = None
         self.flatten_attributes = False
         self.parse_body_as_json = False
         self.delete_messages = True
+        self.serializer = get_serializer() # type: JsonSerializer
+        self.blob_store = None # type: IBlobStore
+        self.delete_blobs = False
 
         self._client_id = ''
         self._secret = ''
@@ -73,6 +95,15 @@ class SQSDataInput(IDataInput):
         self._session_token = config.get('session_token', self._session_token)
         self._endpoint_url = config.get('endpoint_url', self._endpoint_url)
         self.delete_messages = config.get('delete_messages', self.delete_messages)
+        self.serializer = get_serializer(config.get('serializer', self.serializer))
+        self.blob_store = get_blob_store(config.get('blob_store', self.blob_store))
+        self.delete_blobs = config.get('delete_blobs', self.delete_blobs)
+
+    def checkpoint_state(self, record: dict) -> dict:
+        return {}
+
+    def restore_checkpoint(self, state: dict) -> bool:
+        return True
 
     def get_one(self, data: dict = {}) -> dict:
         sqs_req = {
@@ -145,15 +176,21 @@ class SQSDataInput(IDataInput):
                 ReceiptHandle = msg['ReceiptHandle']
             )
 
+            if self.delete_blobs and self.CLAIM_CHECK_ATTR in msg.get('MessageAttributes', {}):
+                self.blob_store.delete(msg['Body'])
+
     def _process_msg(self, msg: dict) -> dict:
+        attributes = dict(msg.get('MessageAttributes', {}))
+        body = self._decode_body(msg['Body'], attributes)
+
         if not self.parse_body_as_json:
             return {
-                self.BODY_KEY: msg['Body'],
-                self.ATTR_KEY: self._process_attributes(msg.get('MessageAttributes', {}))
+                self.BODY_KEY: body,
+                self.ATTR_KEY: self._process_attributes(attributes)
             }
 
-        msg_body = json.loads(msg['Body'])
-        msg_attr = self._process_attributes(msg.get('MessageAttributes', {}))
+        msg_body = self.serializer.loads(body)
+        msg_attr = self._process_attributes(attributes)
 
         proc_msg = {}
         if self.flatten_attributes:
@@ -166,6 +203,28 @@ class SQSDataInput(IDataInput):
 
         return proc_msg
 
+    def _decode_body(self, body: str, attributes: Dict[str, dict]) -> str:
+        """ Resolve claim-checked and compressed bodies. Encoding attributes
+            are removed from `attributes`.
+
+        Args:
+            body (str): SQS message body
+            attributes (Dict[str, dict]): SQS message attributes
+
+        Returns:
+            str: Message body as sent originally
+        """
+        if attributes.pop(self.CLAIM_CHECK_ATTR, None):
+            if not self.blob_store:
+                raise RuntimeError("'blob_store' needed to read claim-checked messages")
+            body = self.blob_store.get(body).decode('utf-8')
+
+        encoding = attributes.pop(self.ENCODING_ATTR, None)
+        if encoding:
+            body = compression.decode_text(body, encoding['StringValue'])
+
+        return body
+
     def _process_attributes(self, attributes: Dict[str, dict]) -> Dict[str, Any]:
         proc_attr = {}
         for attr_name, attr_data in attributes.items():
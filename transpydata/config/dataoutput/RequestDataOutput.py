@@ -1,28 +1,90 @@
 import re
-import json
-from typing import List
-from requests import request
-
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple, Union
+from urllib.parse import quote
+import requests
+
+from transpydata.config import IOwnershipAware
+from transpydata.util import compression
+from transpydata.util.paths import get_path, parse_path
+from transpydata.util.ratelimit import AdaptiveRateLimiter, get_rate_limiter
+from transpydata.util.serialization import JsonSerializer, get_serializer
 from . import IDataOutput
 
 
-class RequestDataOutput(IDataOutput):
+class RequestDataOutput(IDataOutput, IOwnershipAware):
     """ DataOutput that performs requests. Config dict format:
     {
         'url': str, # Will interpolate data variables in url when is called by
-            migration using "{var_name}" synthax
+            migration using "{var_name}" synthax. Values are converted to
+            string and url encoded
         'query_params', # Name of variables that must be used as query params
-            in request
+            in request. Url and query param variables are not sent in payload
         'req_verb': str, # Default 'POST'
         'headers': dict,
         'encode_json': bool # Encode data dictionary to JSON. Default `False`
-        'json_response': bool # Parse JSON response to object. Default `False`
+        'json_response': bool, # Parse JSON response to object. Default `False`
+        'serializer': Union[str, JsonSerializer], # JSON backend used with
+            `encode_json` ('auto', 'json', 'orjson', 'ujson') or serializer
+            instance. Default 'auto'
+        'pool_connections': int, # Number of per host connection pools kept by
+            the session. Default 10
+        'pool_maxsize': int, # Connections kept alive per host. Default 10
+        'pool_block': bool, # Block when `pool_maxsize` connections to a host
+            are in use, making it a hard per host limit. Default `False`
+        'keep_alive': bool, # Reuse connections between requests. Default `True`
+        'max_retries': int, # Retries on connection errors. Default 0
+        'timeout': Union[float, Tuple[float, float]], # Per request timeout in
+            seconds (or connect and read timeouts). Default `None` (no timeout)
+        'concurrency': int, # Max requests in flight on `send_all`. Responses
+            are returned in input order. Default 1
+        'bulk_url': str, # Enables bulk mode on `send_all`: records are packed
+            in JSON array bodies and sent to this url with `req_verb`.
+            Records are sent as they are (no url or query param variables)
+        'bulk_size': int, # Max records per bulk request. Default 100
+        'bulk_max_bytes': int, # Max body size in bytes per bulk request.
+            Default `None` (no limit)
+        'bulk_stream': bool, # Stream bulk bodies with chunked transfer
+            encoding, serializing records as they are sent. `bulk_max_bytes`
+            is not applied. Default `False`
+        'request_compression': str, # Compress request bodies with 'gzip' or
+            'deflate' and set `Content-Encoding` header. Applies to JSON
+            encoded payloads and bulk bodies. Default `None` (disabled)
+        'request_compression_threshold': int, # Min body size in bytes to
+            compress. Streamed bodies are always compressed. Default 1024
+        'rate_limit': Union[dict, AdaptiveRateLimiter], # Adaptive rate and
+            concurrency limiter (shared instance or dict with its init args,
+            e.g. `{'target_rps': 100}`). `max_concurrency` defaults to
+            `concurrency`. Responses with codes in `THROTTLE_CODES` decrease
+            the limits. Default `None` (disabled)
+        'response_mode': str, # How responses are read, result `message` is:
+            - 'full': Response content (parsed if `json_response`). Default
+            - 'status': `None`, body is streamed and discarded
+            - 'headers': Response headers dict, body is streamed and discarded
+            - 'json_field': Value of `response_field` in JSON response,
+              `None` if missing or the body is not JSON
+        'response_field': str, # Path of the field to extract in 'json_field'
+            mode, e.g. 'data.id' or 'items[0].id'
+        'response_max_bytes': int, # Max content bytes kept in 'full' mode.
+            Longer responses are truncated (and not parsed as JSON).
+            Default `None` (no limit)
+        'inplace': bool, # Remove url and query param variables from the
+            records instead of copying them to build the payload. Only safe
+            when nothing else refers to the records, `TransPy` enables it
+            when configured with `inplace_records`. Default `False`
     }
+
+    Requests are sent through a `requests.Session` opened on `initialize` and
+    closed on `dispose`, so connections are reused between records.
     """
 
     URL_PARSE_RX = re.compile('{([^}]*)}') # type: re.Pattern
+    THROTTLE_CODES = (429, 503)
+    RESPONSE_MODES = ('full', 'status', 'headers', 'json_field')
+    DISCARD_MAX_BYTES = 65536 # Bigger bodies are not drained, connection is closed
 
     def __init__(self, config: dict = None):
+        super().__init__()
         self._config = config
 
         self._url = ''
@@ -32,7 +94,42 @@ class RequestDataOutput(IDataOutput):
 
         self._encode_json = False
         self._json_response = False
+        self._serializer = get_serializer() # type: JsonSerializer
         self._url_vars = []
+        self._url_format = ''
+        self._payload_exclude = frozenset()
+
+        self._pool_connections = 10
+        self._pool_maxsize = 10
+        self._pool_block = False
+        self._keep_alive = True
+        self._max_retries = 0
+        self._session = None # type: requests.Session
+
+        self._timeout = None
+        self._concurrency = 1
+        self._executor = None # type: ThreadPoolExecutor
+
+        self._bulk_url = None
+        self._bulk_size = 100
+        self._bulk_max_bytes = None
+        self._bulk_headers = {}
+        self._bulk_stream = False
+
+        self._request_compression = None
+        self._request_compression_threshold = 1024
+        self._compressed_headers = {}
+        self._compressed_bulk_headers = {}
+
+        self.rate_limiter = None # type: AdaptiveRateLimiter
+
+        self._response_mode = 'full'
+        self._response_field = None
+        self._response_field_path = ()
+        self._response_max_bytes = None
+        self._stream_response = False
+
+        self._inplace = False
 
         if config: self.configure(config)
 
@@ -47,9 +144,73 @@ class RequestDataOutput(IDataOutput):
 
         self._json_response = config.get('json_response', self._json_response)
         self._encode_json = config.get('encode_json', self._encode_json)
+        self._serializer = get_serializer(config.get('serializer', self._serializer))
+
+        self._pool_connections = config.get('pool_connections', self._pool_connections)
+        self._pool_maxsize = config.get('pool_maxsize', self._pool_maxsize)
+        self._pool_block = config.get('pool_block', self._pool_block)
+        self._keep_alive = config.get('keep_alive', self._keep_alive)
+        self._max_retries = config.get('max_retries', self._max_retries)
+
+        self._timeout = config.get('timeout', self._timeout)
+        self._concurrency = config.get('concurrency', self._concurrency)
+        if self._concurrency < 1:
+            raise RuntimeError("'concurrency' must be greater than 0")
+
+        self._bulk_url = config.get('bulk_url', self._bulk_url)
+        self._bulk_size = config.get('bulk_size', self._bulk_size)
+        self._bulk_max_bytes = config.get('bulk_max_bytes', self._bulk_max_bytes)
+        self._bulk_stream = config.get('bulk_stream', self._bulk_stream)
+        self._bulk_headers = self._get_bulk_headers()
+
+        self._request_compression = config.get('request_compression',
+                                               self._request_compression)
+        self._request_compression_threshold = config.get(
+            'request_compression_threshold', self._request_compression_threshold
+        )
+        if (self._request_compression
+            and self._request_compression not in compression.HTTP_CODECS):
+            raise RuntimeError(
+                "'request_compression' must be one of {}".format(compression.HTTP_CODECS)
+            )
+        self._compressed_headers = {**self._headers,
+                                    'Content-Encoding': self._request_compression}
+        self._compressed_bulk_headers = {**self._bulk_headers,
+                                         'Content-Encoding': self._request_compression}
+
+        self.rate_limiter = get_rate_limiter(config.get('rate_limit', self.rate_limiter),
+                                             max_concurrency=self._concurrency)
+
+        self._configure_response_handling(config)
+
+        self._inplace = config.get('inplace', self._inplace)
 
         self._process_url()
 
+    def set_records_owned(self, owned: bool):
+        self._inplace = owned
+
+    def initialize(self):
+        """ Open HTTP session.
+        """
+        super().initialize()
+        self._get_session()
+
+    def dispose(self):
+        """ Close HTTP session and its pooled connections.
+        """
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+        if self._session:
+            self._session.close()
+            self._session = None
+
+        if self.rate_limiter and self.logger:
+            self.logger.info('RequestDataOutput rate limiter metrics: %s',
+                             self.rate_limiter.metrics())
+
     def send_one(self, data: dict) -> dict:
         """ Sends requests and return a dict with fields:
          - `code`: Response code
@@ -62,25 +223,25 @@ class RequestDataOutput(IDataOutput):
         Returns:
             dict: Response data (code and message).
         """
-        payload = data.copy()
-        url = self._generate_url(payload)
-        q_params = self._get_query_params(payload)
+        url = self._generate_url(data)
+        q_params = self._get_query_params(data)
+        payload = self._get_payload(data, q_params)
 
+        headers = self._headers
         if self._encode_json:
-            payload = json.dumps(payload)
+            payload = self._serializer.dumps(payload).encode('utf-8')
+            if self._should_compress(payload):
+                payload = compression.compress(payload, self._request_compression)
+                headers = self._compressed_headers
 
-        res = request(self._req_verb, url, headers=self._headers,
-                      params=q_params, data=payload)
+        res = self._request(url, headers=headers, params=q_params, data=payload)
 
-        msg = res.content
-        if self._json_response:
-            msg = res.json()
-
-        return {'code': res.status_code, 'message': msg}
+        return {'code': res.status_code, 'message': self._get_response_message(res)}
 
     def send_all(self, data: List[dict]) -> List[dict]:
         """ Sends are request per dict mesasge in list. Returns a list of
-        responses as specified in `self.send_one`.
+        responses as specified in `self.send_one`. Up to `concurrency`
+        requests are sent at the same time.
 
         Args:
             data (List[dict]): List of payloads for requests.
@@ -88,7 +249,203 @@ class RequestDataOutput(IDataOutput):
         Returns:
             List[dict]: Responses data (code and message per request).
         """
-        return [self.send_one(d) for d in data]
+        send_m = self.send_one
+        if self._bulk_url:
+            send_m = self._send_bulk
+            data = self._get_bulk_batches(data)
+
+        if self._concurrency == 1:
+            results = [send_m(d) for d in data]
+        else:
+            results = list(self._get_executor().map(send_m, data))
+
+        if self._bulk_url:
+            results = [r for bulk_res in results for r in bulk_res]
+
+        return results
+
+    def _send_bulk(self, batch: Tuple[int, Union[str, List[dict]]]) -> List[dict]:
+        """ Send a bulk request and split its response per record. If response
+            is a JSON array with one item per record each record gets its
+            item, otherwise all records get the whole response.
+
+        Args:
+            batch (Tuple[int, Union[str, List[dict]]]): Number of records and
+                request body (or records when streaming bodies)
+
+        Returns:
+            List[dict]: Response data (code and message) per record.
+        """
+        records_count, body = batch
+        headers = self._bulk_headers
+        if self._bulk_stream:
+            body = self._stream_bulk_body(body)
+            if self._request_compression:
+                body = compression.compress_stream(body, self._request_compression)
+                headers = self._compressed_bulk_headers
+        else:
+            body = body.encode('utf-8')
+            if self._should_compress(body):
+                body = compression.compress(body, self._request_compression)
+                headers = self._compressed_bulk_headers
+
+        res = self._request(self._bulk_url, headers=headers, data=body)
+
+        msg = self._get_response_message(res)
+        if isinstance(msg, list) and len(msg) == records_count:
+            return [{'code': res.status_code, 'message': m} for m in msg]
+
+        return [{'code': res.status_code, 'message': msg}
+                for _ in range(records_count)]
+
+    def _request(self, url: str, **kwargs) -> requests.Response:
+        kwargs['timeout'] = self._timeout
+        if self._stream_response:
+            kwargs['stream'] = True
+
+        if not self.rate_limiter:
+            return self._get_session().request(self._req_verb, url, **kwargs)
+
+        start = self.rate_limiter.acquire()
+        try:
+            res = self._get_session().request(self._req_verb, url, **kwargs)
+        except Exception:
+            self.rate_limiter.release(start, success=False)
+            raise
+
+        self.rate_limiter.release(start, success=res.status_code < 500,
+                                  throttled=res.status_code in self.THROTTLE_CODES)
+
+        return res
+
+    def _should_compress(self, body: bytes) -> bool:
+        return (bool(self._request_compression)
+                and len(body) >= self._request_compression_threshold)
+
+    def _stream_bulk_body(self, records: List[dict]) -> Iterator[bytes]:
+        yield b'['
+        for i, record in enumerate(records):
+            if i: yield b','
+            yield self._serializer.dumps(record).encode('utf-8')
+        yield b']'
+
+    def _get_bulk_batches(self, data: List[dict]) -> List[Tuple[int, Union[str, List[dict]]]]:
+        """ Pack records in JSON array bodies limited by `bulk_size` records
+            and `bulk_max_bytes` bytes. When streaming bodies records are only
+            split by `bulk_size` and serialized on send.
+
+        Args:
+            data (List[dict]): Records
+
+        Returns:
+            List[Tuple[int, Union[str, List[dict]]]]: Number of records and
+                body (or records when streaming) per batch
+        """
+        if self._bulk_stream:
+            chunks = (data[n:n + self._bulk_size]
+                      for n in range(0, len(data), self._bulk_size))
+            return [(len(chunk), chunk) for chunk in chunks]
+
+        batches = []
+        entries = []
+        entries_size = 2 # Array brackets
+        for d in data:
+            entry = self._serializer.dumps(d)
+            entry_size = len(entry.encode('utf-8')) + 1 # Entry separator
+
+            if entries and (len(entries) >= self._bulk_size
+                            or (self._bulk_max_bytes
+                                and entries_size + entry_size > self._bulk_max_bytes)):
+                batches.append((len(entries), '[' + ','.join(entries) + ']'))
+                entries = []
+                entries_size = 2
+
+            entries.append(entry)
+            entries_size += entry_size
+
+        if entries:
+            batches.append((len(entries), '[' + ','.join(entries) + ']'))
+
+        return batches
+
+    def _get_response_message(self, res: requests.Response):
+        if self._response_mode == 'status':
+            self._discard_content(res)
+            return None
+
+        if self._response_mode == 'headers':
+            self._discard_content(res)
+            return dict(res.headers)
+
+        if self._response_mode == 'json_field':
+            # Error pages and empty bodies are not JSON, like a missing field
+            try:
+                return get_path(res.json(), self._response_field_path, None)
+            except ValueError:
+                return None
+
+        if self._response_max_bytes is not None:
+            msg, truncated = self._read_capped_content(res)
+            if self._json_response and not truncated:
+                msg = self._serializer.loads(msg)
+
+            return msg
+
+        msg = res.content
+        if self._json_response:
+            msg = res.json()
+
+        return msg
+
+    def _discard_content(self, res: requests.Response):
+        """ Drain small bodies so the connection goes back to the pool, bigger
+            ones are dropped closing the connection.
+        """
+        read = 0
+        for chunk in res.iter_content(8192):
+            read += len(chunk)
+            if read > self.DISCARD_MAX_BYTES: break
+
+        res.close()
+
+    def _read_capped_content(self, res: requests.Response) -> Tuple[bytes, bool]:
+        content = bytearray()
+        truncated = False
+        for chunk in res.iter_content(8192):
+            content += chunk
+            if len(content) > self._response_max_bytes:
+                truncated = True
+                break
+
+        res.close()
+
+        return bytes(content[:self._response_max_bytes]), truncated
+
+    def _configure_response_handling(self, config: dict):
+        self._response_mode = config.get('response_mode', self._response_mode)
+        if self._response_mode not in self.RESPONSE_MODES:
+            raise RuntimeError(
+                "'response_mode' must be one of {}".format(self.RESPONSE_MODES)
+            )
+
+        self._response_field = config.get('response_field', self._response_field)
+        if self._response_mode == 'json_field' and not self._response_field:
+            raise RuntimeError("'response_field' needed in 'json_field' response mode")
+        self._response_field_path = (parse_path(self._response_field)
+                                     if self._response_field else ())
+
+        self._response_max_bytes = config.get('response_max_bytes',
+                                              self._response_max_bytes)
+        self._stream_response = (self._response_mode in ('status', 'headers')
+                                 or (self._response_mode == 'full'
+                                     and self._response_max_bytes is not None))
+
+    def _get_bulk_headers(self) -> dict:
+        headers = dict(self._headers)
+        if not any(h.lower() == 'content-type' for h in headers):
+            headers['Content-Type'] = 'application/json'
+
+        return headers
 
     def _generate_url(self, data: dict) -> str:
         """ Generate url interpolating variables.
@@ -102,17 +459,9 @@ class RequestDataOutput(IDataOutput):
         if not self._url_vars: return self._url
 
         try:
-            var_map = {var:data[var] for var in self._url_vars}
-
-            url = self._url
-            for var, val in var_map.items():
-                url = re.sub(f'{{{var}}}', val, url)
-
-                # For now we are not going to sendig values that are used in
-                # url in payload
-                del(data[var])
-
-            return url
+            return self._url_format.format(
+                *[quote(str(data[var]), safe='') for var in self._url_vars]
+            )
         except KeyError as ke:
             raise RuntimeError('Value for url variable not found', data) from ke
 
@@ -124,11 +473,66 @@ class RequestDataOutput(IDataOutput):
 
             q_params[var] = val
 
-            # For now we are not going to sendig values that are used in
-            # url in payload
-            del(data[var])
-
         return q_params
 
+    def _get_payload(self, data: dict, q_params: dict) -> dict:
+        """ Copy data without the fields used as url variables or sent as
+            query params (`None` query params stay in the payload). In place
+            mode the fields are removed from data instead.
+        """
+        exclude = self._payload_exclude
+        if q_params:
+            exclude = exclude.union(q_params)
+
+        if self._inplace and type(data) is dict:
+            for k in exclude:
+                data.pop(k, None)
+            return data
+
+        if not exclude:
+            return dict(data)
+
+        return {k: v for k, v in data.items() if k not in exclude}
+
     def _process_url(self):
-        self._url_vars = self.URL_PARSE_RX.findall(self._url)
+        """ Compile url template into a format string with positional fields
+            and precompute the fields excluded from the payload.
+        """
+        url_parts = self.URL_PARSE_RX.split(self._url)
+        url_literals = [p.replace('{', '{{').replace('}', '}}') for p in url_parts[::2]]
+
+        self._url_vars = url_parts[1::2]
+        self._url_format = ''.join(
+            literal + ('{%d}' % i if i < len(self._url_vars) else '')
+            for i, literal in enumerate(url_literals)
+        )
+        self._payload_exclude = frozenset(self._url_vars)
+
+    def _get_session(self) -> requests.Session:
+        if self._session:
+            return self._session
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=max(self._pool_maxsize, self._concurrency),
+            pool_block=self._pool_block,
+            max_retries=self._max_retries
+        )
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self._keep_alive:
+            session.headers['Connection'] = 'close'
+
+        self._session = session
+
+        return self._session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if not self._executor:
+            self._get_session()
+            self._executor = ThreadPoolExecutor(max_workers=self._concurrency,
+                                                thread_name_prefix='request-output')
+
+        return self._executor
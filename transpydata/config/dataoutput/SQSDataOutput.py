@@ -1,13 +1,20 @@
-from typing import Tuple, List
-import json
+from typing import Tuple, List, Union
+from concurrent.futures import Future
+import threading
+import time
 
 import boto3
 from botocore.exceptions import ClientError
 
+from transpydata.util import compression
+from transpydata.util.blobstore import IBlobStore, get_blob_store
+from transpydata.util.ratelimit import AdaptiveRateLimiter, get_rate_limiter
+from transpydata.util.serialization import JsonSerializer, get_serializer
+from transpydata.config import IOwnershipAware
 from . import IDataOutput
 
 
-class SQSDataOutput(IDataOutput):
+class SQSDataOutput(IDataOutput, IOwnershipAware):
     """ DataOutput that sends messages to AWS SQS.
 
     Config dict format:
@@ -28,15 +35,59 @@ class SQSDataOutput(IDataOutput):
         'endpoint_url': str, # AWS endpoint url config param. Mostly for local and development setups
         'attributes': dict, # Fields in data input that shoul go as attributes
             (key) and the name of the property (value)
+        'buffered': bool, # Buffer `send_one` calls and send them in batches.
+            `send_one` returns a `Future` resolved with the message result
+            once its batch is sent. Defaults to `False`.
+        'buffer_size': int, # Messages per buffered batch (max 10). Defaults to 10.
+        'max_linger': float, # Max seconds a message waits in the buffer before
+            the batch is sent even if not full. Defaults to 1.0
+        'serializer': Union[str, JsonSerializer], # JSON backend ('auto', 'json',
+            'orjson', 'ujson') or serializer instance. Defaults to 'auto'
+        'compression': str, # Compress message bodies ('zlib' or 'zstd') and
+            send them base64 encoded. Codec is set in message attribute
+            `TranspyContentEncoding`. Defaults to `None` (no compression)
+        'compression_threshold': int, # Min body size in bytes to compress.
+            Defaults to 1024
+        'blob_store': Union[str, IBlobStore], # Blob store for claim-check mode
+            (directory path for a local store or `IBlobStore` instance)
+        'claim_check_threshold': int, # Bodies bigger than this size in bytes
+            (after compression) are stored in `blob_store` and only a pointer
+            is sent. Message attribute `TranspyClaimCheck` flags them.
+            Defaults to `None` (disabled)
+        'rate_limit': Union[dict, AdaptiveRateLimiter], # Adaptive rate and
+            concurrency limiter for SQS API calls (shared instance or dict
+            with its init args, e.g. `{'target_rps': 100}`). Throttling errors
+            decrease the limits. Defaults to `None` (disabled)
+        'inplace': bool, # Pop attribute fields from the records instead of
+            copying message fields to a new dict. Only safe when nothing else
+            refers to the records, `TransPy` enables it when configured with
+            `inplace_records`. Defaults to `False`
     }
 
     """
 
     MAX_BATCH_SIZE = 10 # https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sqs.html#SQS.Client.send_message_batch
 
+    ENCODING_ATTR = 'TranspyContentEncoding'
+    CLAIM_CHECK_ATTR = 'TranspyClaimCheck'
+
+    THROTTLE_ERRORS = ('ThrottlingException', 'RequestThrottled',
+                       'AWS.SimpleQueueService.RequestThrottled')
+
     def __init__(self, config: dict = None):
+        super().__init__()
         self.url = None
         self.attributes = {}
+        self.buffered = False
+        self.buffer_size = self.MAX_BATCH_SIZE
+        self.max_linger = 1.0
+        self.serializer = get_serializer() # type: JsonSerializer
+        self.compression = None
+        self.compression_threshold = 1024
+        self.blob_store = None # type: IBlobStore
+        self.claim_check_threshold = None
+        self.rate_limiter = None # type: AdaptiveRateLimiter
+        self.inplace = False
 
         self._client_id = ''
         self._secret = ''
@@ -45,6 +96,12 @@ class SQSDataOutput(IDataOutput):
         self._session_token = ''
         self._sqs_client = None
 
+        self._buffer = [] # type: List[Tuple[dict, Future]]
+        self._buffer_since = 0.0
+        self._buffer_lock = threading.Lock()
+        self._linger_stop = None # type: threading.Event
+        self._linger_thread = None # type: threading.Thread
+
         if config:
             self.configure(config)
 
@@ -60,26 +117,73 @@ class SQSDataOutput(IDataOutput):
         self._session_token = config.get('session_token', self._session_token)
         self._endpoint_url = config.get('endpoint_url', self._endpoint_url)
 
-    def send_one(self, data: dict) -> dict:
+        self.buffered = config.get('buffered', self.buffered)
+        self.buffer_size = config.get('buffer_size', self.buffer_size)
+        self.max_linger = config.get('max_linger', self.max_linger)
+        if not 0 < self.buffer_size <= self.MAX_BATCH_SIZE:
+            raise RuntimeError(
+                "'buffer_size' must be between 1 and {}".format(self.MAX_BATCH_SIZE)
+            )
+        self.serializer = get_serializer(config.get('serializer', self.serializer))
+
+        self.compression = config.get('compression', self.compression)
+        self.compression_threshold = config.get('compression_threshold',
+                                                self.compression_threshold)
+        if self.compression:
+            compression.check_codec(self.compression)
+
+        self.blob_store = get_blob_store(config.get('blob_store', self.blob_store))
+        self.claim_check_threshold = config.get('claim_check_threshold',
+                                                self.claim_check_threshold)
+        if self.claim_check_threshold is not None and not self.blob_store:
+            raise RuntimeError("'blob_store' needed to enable claim-check")
+
+        self.rate_limiter = get_rate_limiter(config.get('rate_limit', self.rate_limiter))
+        self.inplace = config.get('inplace', self.inplace)
+
+    def set_records_owned(self, owned: bool):
+        self.inplace = owned
+
+    def initialize(self):
+        """ Start the buffer linger flusher when buffering is enabled.
+        """
+        super().initialize()
+        if self.buffered and self.max_linger:
+            self._start_linger_flusher()
+
+    def dispose(self):
+        """ Stop the linger flusher and send any buffered message.
+        """
+        self._stop_linger_flusher()
+        self.flush()
+
+        if self.rate_limiter and self.logger:
+            self.logger.info('SQSDataOutput rate limiter metrics: %s',
+                             self.rate_limiter.metrics())
+
+    def send_one(self, data: dict) -> Union[dict, Future]:
         """ Send one data entry to SQS.
 
         Args:
             data (dict): SQS message data
 
         Returns:
-            dict: Dict with process result. Result format:
+            Union[dict, Future]: Dict with process result, or a `Future` that
+            resolves to it when buffering is enabled. Result format:
             {
                 'success': bool, # Whether messager has been posted correctly on SQS or not
                 'message_id': str, # Message id in SQS (only if sucessful sending)
                 'error': str, # Error in case of not successful sending
             }
         """
-        sqs_client = self._get_sqs_client()
+        if self.buffered:
+            return self._buffer_one(data)
+
         sqs_msg = self._get_sqs_message_data(data)
 
         res = {}
         try:
-            sqs_res = sqs_client.send_message(**sqs_msg)
+            sqs_res = self._call_sqs('send_message', **sqs_msg)
             res = {'success': True, 'message_id': sqs_res['MessageId']}
         except ClientError as e:
             res = {'success': False, 'error': e}
@@ -101,17 +205,99 @@ class SQSDataOutput(IDataOutput):
                 'error': str, # Error in case of not successful sending
             }
         """
-        sqs_client = self._get_sqs_client()
         results = []
         for n in range(0, len(data), self.MAX_BATCH_SIZE):
             data_batch = data[n:n + self.MAX_BATCH_SIZE]
             sqs_data = self._get_sqs_messages_data(data_batch, n)
 
-            sqs_res = sqs_client.send_message_batch(**sqs_data)
+            sqs_res = self._call_sqs('send_message_batch', **sqs_data)
             results.extend(self._process_sqs_batch_result(sqs_res))
 
         return results
 
+    def flush(self):
+        """ Send buffered messages, resolving their pending results.
+        """
+        with self._buffer_lock:
+            batch = self._take_buffer()
+
+        if batch:
+            self._send_buffered_batch(batch)
+
+    def _buffer_one(self, data: dict) -> Future:
+        future = Future()
+        with self._buffer_lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+            self._buffer.append((data, future))
+
+            batch = []
+            if len(self._buffer) >= self.buffer_size or self._is_buffer_lingered():
+                batch = self._take_buffer()
+
+        if batch:
+            self._send_buffered_batch(batch)
+
+        return future
+
+    def _take_buffer(self) -> List[Tuple[dict, Future]]:
+        batch = self._buffer
+        self._buffer = []
+
+        return batch
+
+    def _is_buffer_lingered(self) -> bool:
+        return (bool(self._buffer) and bool(self.max_linger)
+                and time.monotonic() - self._buffer_since >= self.max_linger)
+
+    def _send_buffered_batch(self, batch: List[Tuple[dict, Future]]):
+        try:
+            sqs_data = self._get_sqs_messages_data([d for d, _ in batch])
+            sqs_res = self._call_sqs('send_message_batch', **sqs_data)
+        except ClientError as e:
+            for _, future in batch:
+                future.set_result({'success': False, 'error': e})
+            return
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for msg_res in self._process_sqs_batch_result(sqs_res):
+            _, future = batch[int(msg_res.pop('id'))]
+            future.set_result(msg_res)
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result({'success': False,
+                                   'error': 'Message missing in batch response'})
+
+    def _start_linger_flusher(self):
+        if self._linger_thread and self._linger_thread.is_alive():
+            return
+
+        self._linger_stop = threading.Event()
+        self._linger_thread = threading.Thread(target=self._linger_flusher,
+                                               name='sqs-linger-flusher',
+                                               daemon=True)
+        self._linger_thread.start()
+
+    def _stop_linger_flusher(self):
+        if not self._linger_thread:
+            return
+
+        self._linger_stop.set()
+        self._linger_thread.join()
+        self._linger_thread = None
+
+    def _linger_flusher(self):
+        while not self._linger_stop.wait(self.max_linger / 2):
+            with self._buffer_lock:
+                batch = self._take_buffer() if self._is_buffer_lingered() else []
+
+            if batch:
+                self._send_buffered_batch(batch)
+
     def _process_sqs_batch_result(self, result: dict) -> List[dict]:
         proc_result = []
         if 'Successful' in result:
@@ -138,7 +324,7 @@ class SQSDataOutput(IDataOutput):
             msg_data, attributes = self._process_data_and_attributes(data_entry)
             sqs_data['Entries'].append({
                 'Id': str(i),
-                'MessageBody': json.dumps(msg_data),
+                'MessageBody': self._encode_body(msg_data, attributes),
                 'MessageAttributes': attributes
             })
 
@@ -148,11 +334,46 @@ class SQSDataOutput(IDataOutput):
         sqs_data = {'QueueUrl': self.url}
 
         msg_data, attributes = self._process_data_and_attributes(data)
-        sqs_data['MessageBody'] = json.dumps(msg_data)
+        sqs_data['MessageBody'] = self._encode_body(msg_data, attributes)
         sqs_data['MessageAttributes'] = attributes
 
         return sqs_data
 
+    def _encode_body(self, msg_data: dict, attributes: dict) -> str:
+        """ Serialize message data, compressing it or offloading it to the blob
+            store if configured. Attributes flagging the encoding are added to
+            `attributes`.
+
+        Args:
+            msg_data (dict): Message data
+            attributes (dict): Message attributes
+
+        Returns:
+            str: Message body
+        """
+        body = self.serializer.dumps(msg_data)
+        if not self.compression and self.claim_check_threshold is None:
+            return body
+
+        body_size = len(body.encode('utf-8'))
+        if self.compression and body_size >= self.compression_threshold:
+            body = compression.encode_text(body, self.compression)
+            body_size = len(body)
+            attributes[self.ENCODING_ATTR] = {
+                'StringValue': self.compression,
+                'DataType': 'String'
+            }
+
+        if (self.claim_check_threshold is not None
+            and body_size > self.claim_check_threshold):
+            body = self.blob_store.put(body.encode('utf-8'))
+            attributes[self.CLAIM_CHECK_ATTR] = {
+                'StringValue': 'true',
+                'DataType': 'String'
+            }
+
+        return body
+
     def _process_data_and_attributes(self, data: dict) -> Tuple[dict, dict]:
         """ Process data and split between message and attributes fields
 
@@ -165,6 +386,9 @@ class SQSDataOutput(IDataOutput):
         if not self.attributes:
             return data, {}
 
+        if self.inplace and type(data) is dict:
+            return data, self._pop_attributes(data)
+
         msg_data = {}
         msg_attributes = {}
         for key, val in data.items():
@@ -178,6 +402,39 @@ class SQSDataOutput(IDataOutput):
 
         return msg_data, msg_attributes
 
+    def _pop_attributes(self, data: dict) -> dict:
+        msg_attributes = {}
+        for key, attr_name in self.attributes.items():
+            if key not in data: continue
+
+            val = data.pop(key)
+            msg_attributes[attr_name] = {
+                'StringValue': str(val),
+                'DataType': 'Number' if type(val) in [int, float] else 'String'
+            }
+
+        return msg_attributes
+
+    def _call_sqs(self, method: str, **kwargs) -> dict:
+        sqs_m = getattr(self._get_sqs_client(), method)
+        if not self.rate_limiter:
+            return sqs_m(**kwargs)
+
+        start = self.rate_limiter.acquire()
+        try:
+            res = sqs_m(**kwargs)
+        except ClientError as e:
+            throttled = e.response.get('Error', {}).get('Code') in self.THROTTLE_ERRORS
+            self.rate_limiter.release(start, success=False, throttled=throttled)
+            raise
+        except Exception:
+            self.rate_limiter.release(start, success=False)
+            raise
+
+        self.rate_limiter.release(start)
+
+        return res
+
     def _get_sqs_client(self):
         if self._sqs_client:
             return self._sqs_client
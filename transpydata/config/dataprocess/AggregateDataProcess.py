@@ -0,0 +1,163 @@
+import heapq
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Tuple
+
+from transpydata.util.aggregation import Aggregate, get_aggregate
+from transpydata.util.keysets import key_digest
+from transpydata.util.paths import MISSING, get_path, parse_path
+from transpydata.util.spill import SpillFile
+from .IDataProcess import IDataProcess
+
+
+class AggregateDataProcess(IDataProcess):
+    """ DataProcess grouping records and computing aggregates per group, it
+        returns one record per group. Config dict format:
+        {
+            'group_by': list, # Fields making the group key. Can be paths to
+                nested fields. Output records have them with the same names
+            'aggregations': dict, # Keys are output field names and values
+                dicts with 'op', 'field' and 'order_by' keys or `Aggregate`
+                instances. E.j:
+                {
+                    'orders': {'op': 'count'},
+                    'total': {'op': 'sum', 'field': 'amount'},
+                    'status': {'op': 'latest', 'field': 'status',
+                               'order_by': 'updated_at'}
+                }
+                Refer to `Aggregate` for available operations
+            'max_groups': int, # Memory budget, groups kept in memory. Over
+                that, partial aggregates are sorted and spilled to a
+                temporary file, and all files are merged at the end.
+                Default 100000
+            'spill_dir': str # Directory of spill files. Default system
+                temporary directory
+        }
+
+        Groups are returned in first seen order when nothing was spilled,
+        otherwise in an arbitrary (but deterministic) order. Only
+        `process_all` is supported, the process is not record wise.
+    """
+
+    def __init__(self, config: dict = None):
+        super().__init__()
+        self._config = config
+
+        self._group_by = [] # type: List[Any]
+        self._aggregations = {} # type: Dict[str, Aggregate]
+        self._max_groups = 100000
+        self._spill_dir = None
+
+        self._group_paths = [] # type: List[tuple]
+        self.spills = 0
+
+        if config: self.configure(config)
+
+    def configure(self, config: dict):
+        self._group_by = config.get('group_by', self._group_by)
+        self._aggregations = {
+            k: get_aggregate(a)
+            for k, a in config.get('aggregations', self._aggregations).items()
+        }
+        self._max_groups = config.get('max_groups', self._max_groups)
+        self._spill_dir = config.get('spill_dir', self._spill_dir)
+
+        if not self._aggregations:
+            raise RuntimeError("'aggregations' needs to be provided")
+        if self._max_groups < 1:
+            raise RuntimeError("'max_groups' must be greater than 0")
+
+        self._group_paths = [parse_path(k) if isinstance(k, str) else (k,)
+                             for k in self._group_by]
+
+    def process_one(self, data: dict) -> dict:
+        raise RuntimeError(
+            "'AggregateDataProcess' needs all records, it can not process by one"
+        )
+
+    def process_all(self, data: List[dict]) -> List[dict]:
+        """ Aggregate all data entries.
+
+        Args:
+            data (List[dict]): List of data to be aggregated.
+
+        Returns:
+            List[dict]: List with a record per group.
+        """
+        aggregates = list(self._aggregations.values())
+        initial = [a.initial() for a in aggregates]
+        get_key = self._get_key
+
+        groups = {} # type: Dict[tuple, list]
+        runs = [] # type: List[SpillFile]
+        try:
+            for record in data:
+                key = get_key(record)
+                states = groups.get(key)
+                if states is None:
+                    if len(groups) >= self._max_groups:
+                        runs.append(self._spill(groups))
+                        groups = {}
+                    states = groups[key] = list(initial)
+
+                for i, aggregate in enumerate(aggregates):
+                    states[i] = aggregate.update(states[i], record)
+
+            if runs:
+                runs.append(self._spill(groups))
+                groups = None
+                return [self._get_record(key, states)
+                        for key, states in self._merge_runs(runs)]
+
+            return [self._get_record(key, states)
+                    for key, states in groups.items()]
+        finally:
+            for run in runs:
+                run.close()
+
+    def _get_key(self, data: dict) -> tuple:
+        key = []
+        for path in self._group_paths:
+            value = data.get(path[0]) if len(path) == 1 else get_path(data, path)
+            key.append(None if value is MISSING else value)
+
+        return tuple(key)
+
+    def _get_record(self, key: tuple, states: list) -> dict:
+        record = dict(zip(self._group_by, key))
+        for (field, aggregate), state in zip(self._aggregations.items(), states):
+            record[field] = aggregate.result(state)
+
+        return record
+
+    def _spill(self, groups: Dict[tuple, list]) -> SpillFile:
+        """ Write partial aggregates sorted by key digest (a total order for
+            keys of any type).
+        """
+        run = SpillFile(self._spill_dir, 'transpy_aggregate_')
+        entries = sorted(((key_digest(k), k, s) for k, s in groups.items()),
+                         key=itemgetter(0))
+        for entry in entries:
+            run.write(entry)
+
+        self.spills += 1
+        if self.logger is not None:
+            self.logger.debug("Aggregate spilled %s groups to %s",
+                              len(entries), run.path)
+
+        return run
+
+    def _merge_runs(self, runs: List[SpillFile]) -> Iterator[Tuple[tuple, list]]:
+        """ Merge sorted runs, combining partial aggregates of the same group.
+            Runs are merged in spill order (`heapq.merge` is stable), so
+            order dependent aggregates see partials in record order.
+        """
+        aggregates = list(self._aggregations.values())
+        merged = heapq.merge(*runs, key=itemgetter(0))
+        for _, entries in groupby(merged, key=itemgetter(0)):
+            _, key, states = next(entries)
+            for _, _, other in entries:
+                states = [a.merge(s, o)
+                          for a, s, o in zip(aggregates, states, other)]
+
+            yield key, states
@@ -0,0 +1,136 @@
+from typing import List, Callable
+
+from transpydata.config import IOwnershipAware
+from transpydata.util.batches import adapt_input
+from .IDataProcess import IDataProcess
+
+
+class ChainDataProcess(IDataProcess, IOwnershipAware):
+    """ DataProcess running several data processes in sequence. Config dict
+        format:
+        {
+            'stages': List[IDataProcess] # Data processes, in execution order
+        }
+
+        Adjacent record wise stages (refer to `IDataProcess.is_record_wise`)
+        are fused: `process_all` runs all of them on each record in a single
+        pass, without intermediate lists. Other stages receive the whole list
+        on their `process_all`.
+
+        The chain accepts batches (`transpydata.util.batches.RecordBatch`),
+        they are passed to stages accepting them and converted to records for
+        the others. Fused stages iterate batches as records.
+
+        Records dropped by a stage (`process_one` returning `None`) do not go
+        through the next ones.
+
+        Stages without logger get the chain logger on `initialize`. Records
+        ownership (`set_records_owned`) is forwarded to all stages.
+    """
+
+    def __init__(self, config: dict = None):
+        super().__init__()
+        self._config = config
+
+        self.stages = [] # type: List[IDataProcess]
+        self._segments = [] # type: List[List[IDataProcess]]
+
+        if config: self.configure(config)
+
+    def configure(self, config: dict):
+        self.stages = list(config.get('stages', self.stages))
+        for stage in self.stages:
+            if not isinstance(stage, IDataProcess):
+                raise RuntimeError(
+                    "'{}' class does not implement methods or inherit from class '{}'"
+                    .format(stage.__class__.__name__, IDataProcess.__name__)
+                )
+
+        self._segments = self._get_segments()
+
+    def initialize(self):
+        super().initialize()
+        for stage in self.stages:
+            if stage.logger is None:
+                stage.logger = self.logger
+            stage.initialize()
+
+    def dispose(self):
+        for stage in self.stages:
+            stage.dispose()
+
+    def set_records_owned(self, owned: bool):
+        for stage in self.stages:
+            if isinstance(stage, IOwnershipAware):
+                stage.set_records_owned(owned)
+
+    def is_record_wise(self) -> bool:
+        return all(self._is_stage_record_wise(s) for s in self.stages)
+
+    def accepts_batches(self) -> bool:
+        return True
+
+    def process_one(self, data: dict) -> dict:
+        """ Process one data entry through all stages.
+
+        Args:
+            data (dict): Data to process.
+
+        Returns:
+            dict: Processed data.
+        """
+        for stage in self.stages:
+            data = stage.process_one(data)
+            if data is None: break
+
+        return data
+
+    def process_all(self, data: List[dict]) -> List[dict]:
+        """ Process all data entries through all stages.
+
+        Args:
+            data (List[dict]): List of data to be processed.
+
+        Returns:
+            List[dict]: List with data processed.
+        """
+        for segment in self._segments:
+            if len(segment) == 1:
+                data = segment[0].process_all(adapt_input(segment[0], data))
+            else:
+                data = self._process_fused(
+                    [stage.process_one for stage in segment], data
+                )
+
+        return data
+
+    def _process_fused(self, process_ms: List[Callable[[dict], dict]],
+                       data: List[dict]) -> List[dict]:
+        result = []
+        append = result.append
+        for datum in data:
+            for process_m in process_ms:
+                datum = process_m(datum)
+                if datum is None: break
+            else:
+                append(datum)
+
+        return result
+
+    def _get_segments(self) -> List[List[IDataProcess]]:
+        """ Group adjacent record wise stages, other stages go alone.
+        """
+        segments = []
+        for stage in self.stages:
+            if (segments and self._is_stage_record_wise(stage)
+                and self._is_stage_record_wise(segments[-1][-1])):
+                segments[-1].append(stage)
+            else:
+                segments.append([stage])
+
+        return segments
+
+    def _is_stage_record_wise(self, stage: IDataProcess) -> bool:
+        is_record_wise = getattr(stage, 'is_record_wise', None)
+
+        return bool(is_record_wise and is_record_wise())
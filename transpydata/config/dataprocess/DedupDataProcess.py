@@ -0,0 +1,139 @@
+from typing import Any, List, Union
+
+from transpydata.util.keysets import BloomKeySet, ExactKeySet, key_digest
+from transpydata.util.paths import MISSING, get_path, parse_path
+from .IDataProcess import IDataProcess
+
+
+class DedupDataProcess(IDataProcess):
+    """ DataProcess dropping records whose key was already seen. Config dict
+        format:
+        {
+            'keys': list, # Fields making the record key. Can be paths to
+                nested fields (refer to `transpydata.util.paths.parse_path`).
+                Missing fields are `None`
+            'mode': str, # 'exact' or 'approximate'. Default 'exact'
+            'max_memory_keys': int, # Exact mode. Keys kept in memory, over
+                that they are moved to a SQLite temporary file. Default `None`
+                (all keys in memory)
+            'spill_dir': str, # Exact mode. Directory of the spill file.
+                Default system temporary directory
+            'capacity': int, # Approximate mode. Expected distinct keys.
+                Default 1000000
+            'fp_rate': float # Approximate mode. Probability of dropping a
+                record with a new key, at `capacity` keys. Default 0.001
+        }
+
+        Exact mode keeps 128 bits digests of the keys. Approximate mode uses a
+        Bloom filter with fixed memory (~1.8 bytes per key at 0.1%), it never
+        lets a duplicate through but drops new records with probability
+        `fp_rate`.
+
+        Seen keys are kept across `process_one`/`process_all` calls and reset
+        on `initialize` and `dispose`.
+    """
+
+    MODES = ('exact', 'approximate')
+
+    def __init__(self, config: dict = None):
+        super().__init__()
+        self._config = config
+
+        self._keys = [] # type: List[Any]
+        self._mode = 'exact'
+        self._max_memory_keys = None
+        self._spill_dir = None
+        self._capacity = 1000000
+        self._fp_rate = 0.001
+
+        self._key_paths = [] # type: List[tuple]
+        self._seen = None # type: Union[ExactKeySet, BloomKeySet]
+        self.duplicates = 0
+
+        if config: self.configure(config)
+
+    def configure(self, config: dict):
+        self._keys = config.get('keys', self._keys)
+        self._mode = config.get('mode', self._mode)
+        self._max_memory_keys = config.get('max_memory_keys', self._max_memory_keys)
+        self._spill_dir = config.get('spill_dir', self._spill_dir)
+        self._capacity = config.get('capacity', self._capacity)
+        self._fp_rate = config.get('fp_rate', self._fp_rate)
+
+        if not self._keys:
+            raise RuntimeError("'keys' needs to be provided")
+        if self._mode not in self.MODES:
+            raise RuntimeError("Unknown dedup mode '{}'".format(self._mode))
+
+        self._key_paths = [parse_path(k) if isinstance(k, str) else (k,)
+                           for k in self._keys]
+        self._reset()
+
+    def initialize(self):
+        super().initialize()
+        self._reset()
+
+    def dispose(self):
+        if self.logger is not None:
+            self.logger.info("Dedup dropped %s duplicates. Key set: %s",
+                             self.duplicates, self._get_seen().stats())
+        self._reset()
+
+    def is_record_wise(self) -> bool:
+        return True
+
+    def stats(self) -> dict:
+        """ Dropped duplicates and key set counters.
+        """
+        return {'duplicates': self.duplicates, **self._get_seen().stats()}
+
+    def process_one(self, data: dict) -> Union[dict, None]:
+        """ Deduplicate one data entry.
+
+        Args:
+            data (dict): Data to deduplicate.
+
+        Returns:
+            Union[dict, None]: Data if its key was not seen, `None` otherwise.
+        """
+        if self._get_seen().add(key_digest(self._get_key(data))):
+            return data
+
+        self.duplicates += 1
+
+        return None
+
+    def process_all(self, data: List[dict]) -> List[dict]:
+        """ Deduplicate all data entries.
+
+        Args:
+            data (List[dict]): List of data to deduplicate.
+
+        Returns:
+            List[dict]: List with first data of each key.
+        """
+        process_m = self.process_one
+        return [d for d in data if process_m(d) is not None]
+
+    def _get_key(self, data: dict) -> tuple:
+        key = []
+        for path in self._key_paths:
+            value = data.get(path[0]) if len(path) == 1 else get_path(data, path)
+            key.append(None if value is MISSING else value)
+
+        return tuple(key)
+
+    def _get_seen(self) -> Union[ExactKeySet, BloomKeySet]:
+        if self._seen is None:
+            if self._mode == 'approximate':
+                self._seen = BloomKeySet(self._capacity, self._fp_rate)
+            else:
+                self._seen = ExactKeySet(self._max_memory_keys, self._spill_dir)
+
+        return self._seen
+
+    def _reset(self):
+        if self._seen is not None:
+            self._seen.close()
+        self._seen = None
+        self.duplicates = 0
@@ -0,0 +1,245 @@
+from typing import Any, Dict, List, Union
+
+from transpydata.config import IOwnershipAware, IPredicatePushdown
+from transpydata.config.datainput import IDataInput
+from transpydata.util.cache import LRUCache
+from transpydata.util.paths import MISSING, get_path, parse_path
+from transpydata.util.predicates import Predicate
+from .IDataProcess import IDataProcess
+
+
+_NOT_CACHED = object()
+
+
+class EnrichDataProcess(IDataProcess, IOwnershipAware):
+    """ DataProcess joining records with rows of a lookup datainput (e.g. a
+        `MysqlDataInput` on another table). Config dict format:
+        {
+            'lookup': IDataInput, # Datainput returning lookup rows on
+                `get_all`. Its resources are managed by this process
+            'lookup_key': str, # Lookup rows field to join on
+            'record_key': str, # Records field to join on, can be a path to a
+                nested field. Default `lookup_key`
+            'fields': Union[list, dict], # Lookup fields to add to records. A
+                dict maps lookup field names to record field names. Default
+                all lookup fields but `lookup_key`
+            'mode': str, # 'preload': load all lookup rows into a hash index
+                on first use. 'batched': query the keys of each `process_all`
+                call not in cache with `in` predicates, in batches (lookup
+                must implement `IPredicatePushdown`). Default 'preload'
+            'batch_size': int, # Batched mode. Keys per query. Default 500
+            'cache_size': int, # Batched mode. Max keys cached (found and
+                not found). Default 10000
+            'cache_ttl': float, # Batched mode. Seconds a key is cached.
+                Default `None` (no expiration)
+            'missing': str, # 'keep' records without lookup row unchanged or
+                'drop' them. Default 'keep'
+            'inplace': bool # Add fields to input records instead of copies.
+                `TransPy` enables it when configured with `inplace_records`.
+                Default `False`
+        }
+
+        Lookup rows must be unique by key, the first one is used otherwise.
+    """
+
+    MODES = ('preload', 'batched')
+
+    def __init__(self, config: dict = None):
+        super().__init__()
+        self._config = config
+
+        self._lookup = None # type: IDataInput
+        self._lookup_key = None
+        self._record_key = None
+        self._fields = None # type: Union[list, dict]
+        self._mode = 'preload'
+        self._batch_size = 500
+        self._cache_size = 10000
+        self._cache_ttl = None
+        self._missing = 'keep'
+        self._inplace = False
+
+        self._record_key_path = () # type: tuple
+        self._index = None # type: Dict[Any, dict]
+        self._cache = None # type: LRUCache
+        self._lookup_init = False
+        self._predicates_pushed = False
+        self.queries = 0
+
+        if config: self.configure(config)
+
+    def configure(self, config: dict):
+        self._lookup = config.get('lookup', self._lookup)
+        self._lookup_key = config.get('lookup_key', self._lookup_key)
+        self._record_key = config.get('record_key', self._record_key)
+        self._fields = config.get('fields', self._fields)
+        self._mode = config.get('mode', self._mode)
+        self._batch_size = config.get('batch_size', self._batch_size)
+        self._cache_size = config.get('cache_size', self._cache_size)
+        self._cache_ttl = config.get('cache_ttl', self._cache_ttl)
+        self._missing = config.get('missing', self._missing)
+        self._inplace = config.get('inplace', self._inplace)
+
+        if not isinstance(self._lookup, IDataInput):
+            raise RuntimeError("'lookup' needs to be an 'IDataInput'")
+        if self._lookup_key is None:
+            raise RuntimeError("'lookup_key' needs to be provided")
+        if self._mode not in self.MODES:
+            raise RuntimeError("Unknown enrich mode '{}'".format(self._mode))
+        if (self._mode == 'batched'
+            and not isinstance(self._lookup, IPredicatePushdown)):
+            raise RuntimeError(
+                "'batched' mode needs a lookup implementing 'IPredicatePushdown'"
+            )
+
+        record_key = self._record_key if self._record_key is not None \
+            else self._lookup_key
+        self._record_key_path = parse_path(record_key) \
+            if isinstance(record_key, str) else (record_key,)
+        self._index = None
+        self._cache = LRUCache(self._cache_size, self._cache_ttl)
+
+    def initialize(self):
+        super().initialize()
+        if self._lookup_init:
+            return
+
+        if self._lookup.logger is None:
+            self._lookup.logger = self.logger
+        self._lookup.initialize()
+        self._lookup_init = True
+
+    def dispose(self):
+        if self.logger is not None:
+            self.logger.info("Enrich lookup queries: %s. Cache: %s",
+                             self.queries, self._cache.stats())
+        if self._predicates_pushed:
+            # Lookup input may be reused without the batch filter
+            self._lookup.push_down_predicates([])
+            self._predicates_pushed = False
+        if self._lookup_init:
+            self._lookup.dispose()
+            self._lookup_init = False
+        self._index = None
+        self._cache.clear()
+
+    def set_records_owned(self, owned: bool):
+        self._inplace = owned
+
+    def is_record_wise(self) -> bool:
+        # Batched mode queries all keys of a `process_all` call at once
+        return self._mode == 'preload'
+
+    def process_one(self, data: dict) -> Union[dict, None]:
+        """ Enrich one data entry.
+
+        Args:
+            data (dict): Data to enrich.
+
+        Returns:
+            Union[dict, None]: Enriched data. `None` if it has no lookup row
+                and `missing` is 'drop'.
+        """
+        if self._mode == 'preload':
+            return self._join(data, self._get_index().get(self._get_key(data)))
+
+        key = self._get_key(data)
+        return self._join(data, self._get_rows([key]).get(key))
+
+    def process_all(self, data: List[dict]) -> List[dict]:
+        """ Enrich all data entries.
+
+        Args:
+            data (List[dict]): List of data to enrich.
+
+        Returns:
+            List[dict]: List with enriched data.
+        """
+        keys = [self._get_key(d) for d in data]
+        if self._mode == 'preload':
+            rows = self._get_index()
+        else:
+            rows = self._get_rows(keys)
+
+        joined = (self._join(d, rows.get(k)) for d, k in zip(data, keys))
+
+        return [d for d in joined if d is not None]
+
+    def _get_key(self, data: dict) -> Any:
+        path = self._record_key_path
+        value = data.get(path[0]) if len(path) == 1 else get_path(data, path)
+
+        return None if value is MISSING else value
+
+    def _join(self, data: dict, row: Union[dict, None]) -> Union[dict, None]:
+        if row is None:
+            return None if self._missing == 'drop' else data
+
+        values = self._get_values(row)
+        if self._inplace and type(data) is dict:
+            data.update(values)
+            return data
+
+        return {**data, **values}
+
+    def _get_values(self, row: dict) -> dict:
+        if self._fields is None:
+            return {k: v for k, v in row.items() if k != self._lookup_key}
+
+        if isinstance(self._fields, dict):
+            return {dst: row.get(src) for src, dst in self._fields.items()}
+
+        return {f: row.get(f) for f in self._fields}
+
+    def _get_index(self) -> Dict[Any, dict]:
+        if self._index is None:
+            self._index = self._index_rows(self._fetch_lookup())
+
+        return self._index
+
+    def _get_rows(self, keys: List[Any]) -> Dict[Any, dict]:
+        """ Lookup rows by key, from cache or querying keys not cached. Keys
+            without row map to `None`.
+        """
+        rows = {}
+        misses = []
+        for key in dict.fromkeys(keys):
+            row = self._cache.get(key, _NOT_CACHED)
+            if row is _NOT_CACHED:
+                misses.append(key)
+            else:
+                rows[key] = row
+
+        for i in range(0, len(misses), self._batch_size):
+            batch = misses[i:i + self._batch_size]
+            found = self._index_rows(self._fetch_lookup(batch))
+            for key in batch:
+                rows[key] = found.get(key)
+                self._cache.set(key, rows[key])
+
+        return rows
+
+    def _fetch_lookup(self, keys: List[Any] = None) -> List[dict]:
+        if not self._lookup_init:
+            self.initialize()
+
+        if keys is not None:
+            self._predicates_pushed = True
+            if not self._lookup.push_down_predicates([
+                    Predicate(self._lookup_key, 'in', keys)]):
+                raise RuntimeError(
+                    "Lookup '{}' can not filter by '{}'"
+                    .format(self._lookup.__class__.__name__, self._lookup_key)
+                )
+
+        self.queries += 1
+
+        return self._lookup.get_all() or []
+
+    def _index_rows(self, rows: List[dict]) -> Dict[Any, dict]:
+        index = {}
+        key_field = self._lookup_key
+        for row in rows:
+            index.setdefault(row.get(key_field), row)
+
+        return index
@@ -0,0 +1,70 @@
+from typing import List, Union
+
+from transpydata.util.predicates import Predicate, get_predicate
+from .IDataProcess import IDataProcess
+
+
+class FilterDataProcess(IDataProcess):
+    """ DataProcess dropping records not matching all predicates. Config dict
+        format:
+        {
+            'predicates': list, # Dicts with 'field', 'op' and 'value' keys or
+                `Predicate` instances. E.j:
+                [
+                    {'field': 'credits', 'op': '<=', 'value': 10},
+                    {'field': 'module_Id', 'op': 'in', 'value': ['CS101']},
+                    {'field': 'user.deleted_at', 'op': 'is_null'}
+                ]
+                Refer to `Predicate` for available operators
+            'pushdown': bool # Let `TransPy` push predicates down to the
+                datainput (if it implements `IPredicatePushdown`) when this is
+                the first data process. Default `True`
+        }
+
+        `process_one` returns `None` for dropped records. Predicates are
+        checked even if pushed down.
+    """
+
+    def __init__(self, config: dict = None):
+        super().__init__()
+        self._config = config
+
+        self.predicates = [] # type: List[Predicate]
+        self.pushdown = True
+
+        if config: self.configure(config)
+
+    def configure(self, config: dict):
+        self.predicates = [get_predicate(p)
+                           for p in config.get('predicates', self.predicates)]
+        self.pushdown = config.get('pushdown', self.pushdown)
+
+    def is_record_wise(self) -> bool:
+        return True
+
+    def process_one(self, data: dict) -> Union[dict, None]:
+        """ Filter one data entry.
+
+        Args:
+            data (dict): Data to filter.
+
+        Returns:
+            Union[dict, None]: Data if it matches predicates, `None` otherwise.
+        """
+        for predicate in self.predicates:
+            if not predicate(data):
+                return None
+
+        return data
+
+    def process_all(self, data: List[dict]) -> List[dict]:
+        """ Filter all data entries.
+
+        Args:
+            data (List[dict]): List of data to be filtered.
+
+        Returns:
+            List[dict]: List with data matching predicates.
+        """
+        predicates = self.predicates
+        return [d for d in data if all(p(d) for p in predicates)]
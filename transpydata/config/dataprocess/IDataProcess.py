@@ -18,6 +18,16 @@ class IDataProcess(IDataService, metaclass=ABCMeta):
     def process_all_method_name(self) -> str:
         return 'process_all'
 
+    def is_record_wise(self) -> bool:
+        """ Whether `process_all` is equivalent to calling `process_one` on
+            each record in order. Record wise processes can be fused with
+            adjacent ones in a `ChainDataProcess`.
+
+        Returns:
+            bool: Process is record wise. Defaults to `False`.
+        """
+        return False
+
     @abstractmethod
     def process_one(self, data: dict) -> dict:
         """ Process one data entry.
@@ -26,7 +36,8 @@ class IDataProcess(IDataService, metaclass=ABCMeta):
             data (dict): Data to process.
 
         Returns:
-            dict: Processed data.
+            dict: Processed data. `None` drops the record, it is not sent to
+                the data output.
         """
         raise NotImplementedError
 
@@ -8,6 +8,13 @@ class NoneDataProcess(IDataProcess):
     """
     def configure(self):
         pass
+
+    def is_record_wise(self) -> bool:
+        return True
+
+    def accepts_batches(self) -> bool:
+        return True
+
     def process_one(self, data: dict) -> dict:
         return data
 
@@ -1,9 +1,22 @@
-from typing import List, Any, Tuple
+from operator import itemgetter
+from typing import List, Any, Tuple, Callable, Dict, Set, Union
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from transpydata.config import IOwnershipAware
+from transpydata.util.batches import RecordBatch
+from transpydata.util.cache import CachedTransformation
+from transpydata.util.paths import (
+    MISSING, delete_path, get_path, is_nested, parse_path, set_path
+)
+from transpydata.util.records import Record, Schema
 from .IDataProcess import IDataProcess
 
 
-class TranslateDataProcess(IDataProcess):
+class TranslateDataProcess(IDataProcess, IOwnershipAware):
     """ DataProcess to change data fields names and preform tranformations on the
         values. Config dict foramat:
         {
@@ -11,12 +24,69 @@ class TranslateDataProcess(IDataProcess):
             'translations': dict, # Dict where keys are field names on
                 input (generated data of DataInput) and values are a new name
                 for that field
-            'transformations': dict # Dict where keys are field names and
+            'transformations': dict, # Dict where keys are field names and
                 values can be a function to execute on the value or a constat
                 value to be asigned to that field
+            'codegen': bool, # Generate and cache a specialised function per
+                record shape (tuple of input keys). Faster on wide records
+                with few distinct shapes. Default `False`
+            'vectorized_transformations': dict, # Dict where keys are field
+                names and values functions receiving a NumPy array with the
+                values of the field for all records, returning an array (or
+                list) of the same length, or a scalar set on all records.
+                Enables the columnar path on `process_all` (requires `numpy`)
+            'cached_transformations': dict, # Dict where keys are field names
+                with a function in `transformations` and values the LRU cache
+                config of that function: max entries (int) or dict with
+                'maxsize' and 'ttl' (seconds) keys. Use it for pure, expensive
+                lookups called with few distinct values
+            'nested_paths': bool, # Read keys in `exclude`, `translations` and
+                `transformations` as paths to nested fields. Default `False`
+                (keys are top level field names)
+            'inplace': bool # Modify input records (dicts) instead of building
+                new ones. Only safe when nothing else refers to the records,
+                `TransPy` enables it when configured with `inplace_records`.
+                Renamed fields are moved to the end of the record. Records
+                where a renamed field would overwrite an untranslated field
+                (or configs renaming several fields to one) are copied. Default
+                `False`
         }
+
+        Transformations can also be wrapped with
+        `transpydata.util.cache.cached`. Cache counters are returned by
+        `cache_stats`.
+
+        Columnar path: `process_all` converts records to columns, applies
+        vectorized transformations per column (other transformations per
+        value) and converts back to records. It is used when all records
+        have the same fields and there are no nested paths, otherwise records
+        are processed one by one. `process_one` applies vectorized
+        transformations on single value arrays.
+
+        With `nested_paths`, keys in `exclude`, `translations` (keys and
+        values) and `transformations` can be paths to nested fields, e.g.
+        `{'translations': {'user.address.zip': 'zip'}}`. Refer to
+        `transpydata.util.paths.parse_path` for the syntax. Source paths are
+        read from the input record, so their first segment should not be
+        renamed by a top level translation. Nested containers are shared with
+        the input record and only copied along the paths being modified.
+
+        Batches (`transpydata.util.batches.RecordBatch`) are accepted by
+        `process_all` when there are no nested paths operations, columns are
+        processed as in the columnar path and a new batch is returned.
+        Vectorized transformations results are kept as NumPy arrays.
+
+        Compact records (`transpydata.util.records.Record`) without nested
+        paths operations are translated into records, with the output schema
+        and value indexes computed once per input schema.
+
+        Configuration is compiled on `configure`, changes on the dicts passed
+        in config after that are not applied.
     """
 
+    MAX_SHAPES = 64 # Max generated functions when `codegen` is enabled, and
+                    # record schemas plans
+
 
     def __init__(self, config: dict=None):
         super().__init__()
@@ -25,6 +95,20 @@ class TranslateDataProcess(IDataProcess):
         self._exclude = []
         self._translations = {}
         self._transformations = {}
+        self._codegen = False
+        self._vectorized_transformations = {}
+        self._cached_transformations = {}
+        self._caches = {} # type: Dict[Any, CachedTransformation]
+        self._inplace = False
+        self._nested_paths = False
+
+        self._exclude_set = frozenset()
+        self._field_plan = {} # type: Dict[Any, Tuple[Any, Callable]]
+        self._shape_fns = {} # type: Dict[tuple, Callable[[dict], dict]]
+        self._record_plans = {} # type: Dict[Schema, Tuple[Schema, list]]
+        self._nested_moves = [] # type: List[Tuple[tuple, tuple, Callable]]
+        self._nested_deletes = [] # type: List[tuple]
+        self._inplace_collisions = frozenset() # type: Union[frozenset, None]
 
         if config: self.configure(config)
 
@@ -33,6 +117,33 @@ class TranslateDataProcess(IDataProcess):
         self._translations = config.get('translations', self._translations)
         self._transformations = config.get('transformations',
                                            self._transformations)
+        self._codegen = config.get('codegen', self._codegen)
+        self._vectorized_transformations = config.get('vectorized_transformations',
+                                                      self._vectorized_transformations)
+        if self._vectorized_transformations and np is None:
+            raise RuntimeError("'numpy' package is needed for 'vectorized_transformations'")
+        duplicated = set(self._vectorized_transformations) & set(self._transformations)
+        if duplicated:
+            raise RuntimeError(
+                "Fields {} in both 'transformations' and 'vectorized_transformations'"
+                .format(sorted(map(str, duplicated)))
+            )
+        self._cached_transformations = config.get('cached_transformations',
+                                                  self._cached_transformations)
+        self._inplace = config.get('inplace', self._inplace)
+        self._nested_paths = config.get('nested_paths', self._nested_paths)
+
+        self._compile()
+
+    def set_records_owned(self, owned: bool):
+        self._inplace = owned
+
+    def is_record_wise(self) -> bool:
+        # Columnar path is faster on lists, do not fuse it
+        return not self._vectorized_transformations
+
+    def accepts_batches(self) -> bool:
+        return not self._nested_moves and not self._nested_deletes
 
     def process_one(self, data: dict) -> dict:
         """ Process one data entry.
@@ -43,11 +154,21 @@ class TranslateDataProcess(IDataProcess):
         Returns:
             dict: Processed data.
         """
-        p_data = {}
-        for k, v in data.items():
-            if k in self._exclude: continue
-            p_key, p_val = self._process_field(k, v)
-            p_data[p_key] = p_val
+        if self._inplace and type(data) is dict and self._is_inplace_safe(data):
+            return self._process_inplace(data)
+
+        if (type(data) is Record and not self._nested_moves
+            and not self._nested_deletes):
+            return self._process_record(data)
+
+        if self._codegen:
+            p_data = self._get_shape_fn(data)(data)
+        else:
+            p_data = self._process_fields(data)
+
+        if self._nested_moves or self._nested_deletes:
+            nested_values = self._get_nested_values(data)
+            self._set_nested_values(p_data, nested_values, {id(p_data)})
 
         return p_data
 
@@ -60,17 +181,302 @@ class TranslateDataProcess(IDataProcess):
         Returns:
             List[dict]: List with data processed.
         """
-        return [self.process_one(d) for d in data]
+        if isinstance(data, RecordBatch):
+            if self.accepts_batches():
+                return self._process_batch(data)
+            data = data.to_records()
+
+        if (self._vectorized_transformations and not self._inplace
+            and not self._nested_moves and not self._nested_deletes):
+            p_data = self._process_columnar(data)
+            if p_data is not None:
+                return p_data
+
+        process_m = self.process_one
+        return [process_m(d) for d in data]
+
+    def _process_columnar(self, data: List[dict]) -> List[dict]:
+        """ Process records as columns. Returns `None` if records do not share
+            the same fields.
+        """
+        if not data:
+            return []
+
+        keys = tuple(data[0])
+        if any(map(len(keys).__ne__, map(len, data))):
+            return None
+
+        try:
+            columns = [list(map(itemgetter(k), data)) for k in keys]
+        except KeyError:
+            return None
+
+        p_keys = []
+        p_columns = []
+        for key, column in zip(keys, columns):
+            if key in self._exclude_set: continue
+
+            p_key, transform = self._field_plan.get(key, (key, None))
+            if key in self._vectorized_transformations:
+                column = self._apply_vectorized(key, column).tolist()
+            elif transform is not None:
+                column = [transform(v) for v in column]
+
+            p_keys.append(p_key)
+            p_columns.append(column)
+
+        return list(map(dict, map(zip, [p_keys] * len(data), zip(*p_columns))))
+
+    def _process_batch(self, batch: RecordBatch) -> RecordBatch:
+        p_columns = {}
+        for key, column in zip(batch.schema.fields, batch.columns):
+            if key in self._exclude_set: continue
+
+            p_key, transform = self._field_plan.get(key, (key, None))
+            if key in self._vectorized_transformations:
+                column = self._apply_vectorized(key, column)
+            elif transform is not None:
+                if np is not None and isinstance(column, np.ndarray):
+                    column = column.tolist()
+                column = [transform(v) for v in column]
+
+            p_columns[p_key] = column
+
+        return RecordBatch(Schema.get(p_columns), list(p_columns.values()))
+
+    def _apply_vectorized(self, key: Any, column: list) -> 'np.ndarray':
+        p_column = np.asarray(self._vectorized_transformations[key](np.asarray(column)))
+        if p_column.ndim == 0: # Scalar, same value for all records
+            p_column = np.full(len(column), p_column.item())
+        if len(p_column) != len(column):
+            raise RuntimeError(
+                "Vectorized transformation of '{}' returned {} values for {} records"
+                .format(key, len(p_column), len(column))
+            )
+
+        return p_column
+
+    def cache_stats(self) -> Dict[Any, dict]:
+        """ Counters (size, hits, misses, evictions...) of each cached
+            transformation, by field.
+        """
+        return {key: cache.stats() for key, cache in self._caches.items()}
+
+    def _process_fields(self, data: dict) -> dict:
+        exclude = self._exclude_set
+        plan = self._field_plan
+
+        p_data = {}
+        for k, v in data.items():
+            if k in exclude: continue
+
+            step = plan.get(k)
+            if step is None:
+                p_data[k] = v
+                continue
+
+            p_key, transform = step
+            p_data[p_key] = v if transform is None else transform(v)
+
+        return p_data
+
+    def _process_record(self, data: Record) -> Record:
+        plan = self._record_plans.get(data.schema)
+        if plan is None:
+            if len(self._record_plans) >= self.MAX_SHAPES:
+                return self._process_fields(data)
+
+            plan = self._get_record_plan(data.schema)
+            self._record_plans[data.schema] = plan
+
+        p_schema, steps = plan
+        row = data.row
+
+        return Record(p_schema, tuple([row[i] if transform is None else transform(row[i])
+                                       for i, transform in steps]))
+
+    def _get_record_plan(self, schema: Schema) -> Tuple[Schema, list]:
+        """ Output schema and (input index, transformation) of each output
+            field, for records with `schema`.
+        """
+        steps = {}
+        for i, key in enumerate(schema.fields):
+            if key in self._exclude_set: continue
+
+            p_key, transform = self._field_plan.get(key, (key, None))
+            steps[p_key] = (i, transform)
+
+        return Schema.get(steps), list(steps.values())
+
+    def _process_inplace(self, data: dict) -> dict:
+        nested_values = None
+        if self._nested_moves or self._nested_deletes:
+            nested_values = self._get_nested_values(data)
+
+        for key in self._exclude_set:
+            data.pop(key, None)
+
+        moved = []
+        for key, (p_key, transform) in self._field_plan.items():
+            if key not in data: continue
+
+            value = data[key] if key == p_key else data.pop(key)
+            moved.append((p_key, value if transform is None else transform(value)))
+
+        for p_key, value in moved:
+            data[p_key] = value
+
+        if nested_values is not None:
+            self._set_nested_values(data, nested_values, None)
+
+        return data
+
+    def _get_nested_values(self, data: dict) -> List[Tuple[tuple, Any]]:
+        """ Read (and transform) values of nested paths operations from the
+            input record.
+        """
+        values = []
+        for src, dst, transform in self._nested_moves:
+            value = get_path(data, src)
+            if value is MISSING: continue
+
+            values.append((dst, value if transform is None else transform(value)))
+
+        return values
+
+    def _set_nested_values(self, p_data: dict, values: List[Tuple[tuple, Any]],
+                           copied: Set[int]):
+        """ Remove nested sources and excluded paths and set values on their
+            destination paths.
+        """
+        for path in self._nested_deletes:
+            delete_path(p_data, path, copied)
+
+        for dst, value in values:
+            set_path(p_data, dst, value, copied)
+
+    def _compile(self):
+        """ Compile configuration into an exclude set and a plan with the
+            destination key and transformation function per field. Operations
+            on nested paths are compiled into path segments.
+        """
+        exclude = [k for k in self._exclude if not self._is_nested(k)]
+        nested_deletes = [parse_path(k) for k in self._exclude if self._is_nested(k)]
+
+        plan = {}
+        nested_moves = []
+        self._caches = {}
+        for key in dict.fromkeys(list(self._translations) + list(self._transformations)
+                                 + list(self._vectorized_transformations)):
+            transform = None
+            if key in self._vectorized_transformations:
+                transform = self._vectorized_row(self._vectorized_transformations[key])
+            elif key in self._transformations:
+                transform = self._get_transformation(key)
+
+            p_key = self._translations.get(key, key)
+            if not self._is_nested(key) and not self._is_nested(p_key):
+                plan[key] = (p_key, transform)
+                continue
+
+            src, dst = parse_path(key), parse_path(p_key)
+            nested_moves.append((src, dst, transform))
+            if len(src) == 1:
+                exclude.append(key)
+            elif src != dst:
+                nested_deletes.append(src)
+
+        self._exclude_set = frozenset(exclude)
+        self._field_plan = plan
+        self._inplace_collisions = self._get_inplace_collisions(plan)
+        self._nested_moves = nested_moves
+        self._nested_deletes = nested_deletes
+        self._shape_fns = {}
+        self._record_plans = {}
+
+    def _get_inplace_collisions(self, plan: dict) -> Union[frozenset, None]:
+        """ Rename targets that would overwrite a field not processed by the
+            plan. The copying path keeps the value of the later field in the
+            record, so records having them are not processed in place. `None`
+            if targets are duplicated (never processed in place).
+        """
+        targets = [p_key for key, (p_key, _) in plan.items() if p_key != key]
+        all_targets = [p_key for p_key, _ in plan.values()]
+        if len(set(all_targets)) != len(all_targets):
+            return None
+
+        return frozenset(targets) - frozenset(plan) - self._exclude_set
+
+    def _is_inplace_safe(self, data: dict) -> bool:
+        collisions = self._inplace_collisions
+        return collisions is not None and collisions.isdisjoint(data)
+
+    def _is_nested(self, key: Any) -> bool:
+        return self._nested_paths and is_nested(key)
+
+    def _get_transformation(self, key: Any) -> Callable[[Any], Any]:
+        transform = self._transformations[key]
+        if not callable(transform):
+            return self._constant(transform)
+
+        cache_config = self._cached_transformations.get(key)
+        if cache_config is not None:
+            if not isinstance(cache_config, dict):
+                cache_config = {'maxsize': cache_config}
+            transform = CachedTransformation(transform, **cache_config)
+
+        if isinstance(transform, CachedTransformation):
+            self._caches[key] = transform
+
+        return transform
+
+    def _get_shape_fn(self, data: dict) -> Callable[[dict], dict]:
+        shape = tuple(data)
+        shape_fn = self._shape_fns.get(shape)
+        if shape_fn is None:
+            if len(self._shape_fns) >= self.MAX_SHAPES:
+                return self._process_fields
+
+            shape_fn = self._generate_shape_fn(shape)
+            self._shape_fns[shape] = shape_fn
+
+        return shape_fn
+
+    def _generate_shape_fn(self, shape: tuple) -> Callable[[dict], dict]:
+        """ Generate a function building the processed dict in one dict display
+            for records with keys `shape`. Keys and transformations are bound
+            as default arguments so they are accessed as locals.
+        """
+        args = ['d']
+        entries = []
+        bindings = {}
+        for i, key in enumerate(shape):
+            if key in self._exclude_set: continue
+
+            p_key, transform = self._field_plan.get(key, (key, None))
+            bindings['k%d' % i] = key
+            bindings['p%d' % i] = p_key
+            value = 'd[k%d]' % i
+            if transform is not None:
+                bindings['t%d' % i] = transform
+                value = 't%d(%s)' % (i, value)
+
+            entries.append('p%d: %s' % (i, value))
 
+        args.extend('{0}={0}'.format(name) for name in bindings)
+        source = 'def _translate({}):\n    return {{{}}}\n'.format(
+            ', '.join(args), ', '.join(entries)
+        )
 
-    def _process_field(self, key, value) -> Tuple[Any, Any]:
-        r_key = self._translations.get(key, key)
+        namespace = {}
+        exec(source, dict(bindings), namespace)
 
-        if not key in self._transformations:
-            return r_key, value
+        return namespace['_translate']
 
-        r_value = self._transformations.get(key)
-        if callable(r_value):
-            r_value = r_value(value)
+    @staticmethod
+    def _vectorized_row(transform: Callable) -> Callable[[Any], Any]:
+        return lambda v: np.asarray(transform(np.asarray([v]))).reshape(-1).tolist()[0]
 
-        return r_key, r_value
+    @staticmethod
+    def _constant(value: Any) -> Callable[[Any], Any]:
+        return lambda _: value
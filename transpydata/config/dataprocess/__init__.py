@@ -1,3 +1,8 @@
 from .IDataProcess import IDataProcess
 from .NoneDataProcess import NoneDataProcess
 from .TranslateDataProcess import TranslateDataProcess
+from .ChainDataProcess import ChainDataProcess
+from .FilterDataProcess import FilterDataProcess
+from .DedupDataProcess import DedupDataProcess
+from .EnrichDataProcess import EnrichDataProcess
+from .AggregateDataProcess import AggregateDataProcess
@@ -0,0 +1,117 @@
+from typing import Any, Union
+
+from transpydata.util.paths import MISSING, get_path, parse_path
+
+
+class Aggregate():
+    """ Mergeable aggregate function over a record field. Operations:
+        'count' (records, or non null values of `field` when given), 'sum',
+        'min', 'max', 'avg', 'first', 'last' and 'latest' (value of `field`
+        in the record with the greatest `order_by`). Null values are ignored,
+        except by 'first', 'last' and 'count' without field.
+
+        States are immutable values, so they can be pickled and merged with
+        partial states computed on other records. `merge` expects `other` to
+        come from records after the ones of `state`.
+    """
+
+    OPS = ('count', 'sum', 'min', 'max', 'avg', 'first', 'last', 'latest')
+
+    def __init__(self, op: str, field: str = None, order_by: str = None):
+        if op not in self.OPS:
+            raise RuntimeError("Unknown aggregate '{}'".format(op))
+        if field is None and op != 'count':
+            raise RuntimeError("Aggregate '{}' needs a 'field'".format(op))
+        if op == 'latest' and order_by is None:
+            raise RuntimeError("Aggregate 'latest' needs 'order_by'")
+
+        self.op = op
+        self.field = field
+        self.order_by = order_by
+
+        self._field_path = _get_path(field)
+        self._order_path = _get_path(order_by)
+
+    def initial(self) -> Any:
+        return 0 if self.op == 'count' else None
+
+    def update(self, state: Any, record: dict) -> Any:
+        op = self.op
+        if op == 'count':
+            if self._field_path is None:
+                return state + 1
+            return state + (_get_value(record, self._field_path) is not None)
+
+        value = _get_value(record, self._field_path)
+        if op == 'first':
+            return state if state is not None else (value,)
+        if op == 'last':
+            return (value,)
+
+        if value is None:
+            return state
+
+        if op == 'latest':
+            order = _get_value(record, self._order_path)
+            if order is None:
+                return state
+            return self.merge(state, (order, value))
+
+        return self.merge(state, (value, 1) if op == 'avg' else value)
+
+    def merge(self, state: Any, other: Any) -> Any:
+        if state is None:
+            return other
+        if other is None:
+            return state
+
+        op = self.op
+        if op in ('count', 'sum'):
+            return state + other
+        if op == 'min':
+            return other if other < state else state
+        if op == 'max':
+            return other if other > state else state
+        if op == 'avg':
+            return (state[0] + other[0], state[1] + other[1])
+        if op == 'first':
+            return state
+        if op == 'last':
+            return other
+
+        # latest, ties go to the later record
+        return other if other[0] >= state[0] else state
+
+    def result(self, state: Any) -> Any:
+        if state is None or self.op in ('count', 'sum', 'min', 'max'):
+            return state
+        if self.op == 'avg':
+            return state[0] / state[1]
+        if self.op in ('first', 'last'):
+            return state[0]
+
+        return state[1]
+
+
+def get_aggregate(aggregate: Union[dict, Aggregate]) -> Aggregate:
+    """ Get aggregate from config value: an `Aggregate` instance or a dict with
+        'op', 'field' and 'order_by' keys.
+    """
+    if isinstance(aggregate, Aggregate):
+        return aggregate
+
+    return Aggregate(aggregate['op'], aggregate.get('field'),
+                     aggregate.get('order_by'))
+
+
+def _get_path(field: Any) -> Union[tuple, None]:
+    if field is None:
+        return None
+
+    return parse_path(field) if isinstance(field, str) else (field,)
+
+
+def _get_value(record: dict, path: tuple) -> Any:
+    value = record.get(path[0]) if len(path) == 1 else get_path(record, path)
+
+    return None if value is MISSING else value
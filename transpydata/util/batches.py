@@ -0,0 +1,96 @@
+from typing import Any, Iterable, Iterator, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from transpydata.util.records import Record, Schema
+
+
+class RecordBatch():
+    """ Columnar batch of records: a shared `Schema` and one column per field,
+        as lists or NumPy arrays of the same length. Batches are passed
+        between pipeline stages instead of record lists to processors
+        accepting them (refer to `IProcessor.accepts_batches`), other
+        processors get records (`to_records`).
+
+        Iterating a batch yields `Record` instances. Batches should not be
+        modified, processors return new ones (columns can be shared).
+    """
+
+    __slots__ = ('schema', 'columns', '_length')
+
+    def __init__(self, schema: Schema, columns: List[Sequence[Any]]):
+        if len(schema) != len(columns):
+            raise RuntimeError("Batch needs one column per schema field")
+
+        lengths = {len(c) for c in columns}
+        if len(lengths) > 1:
+            raise RuntimeError("Batch columns must have the same length")
+
+        self.schema = schema
+        self.columns = columns
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, schema: Schema, rows: Sequence[tuple]) -> 'RecordBatch':
+        """ Build a batch from value tuples ordered as `schema` (e.g. rows
+            returned by a database cursor).
+        """
+        columns = [list(c) for c in zip(*rows)] if rows else \
+            [[] for _ in schema.fields]
+
+        return cls(schema, columns)
+
+    @classmethod
+    def from_records(cls, records: Sequence[dict]) -> 'RecordBatch':
+        """ Build a batch from records with the same fields as the first one.
+        """
+        if not records:
+            return cls(Schema.get(()), [])
+
+        fields = tuple(records[0])
+        return cls.from_rows(Schema.get(fields),
+                             [tuple(r[f] for f in fields) for r in records])
+
+    def column(self, field: Any) -> Sequence[Any]:
+        return self.columns[self.schema.index[field]]
+
+    def column_array(self, field: Any) -> 'np.ndarray':
+        """ Column as NumPy array (requires `numpy`).
+        """
+        if np is None:
+            raise RuntimeError("'numpy' package is needed for column arrays")
+
+        return np.asarray(self.column(field))
+
+    def to_records(self) -> List[Record]:
+        schema = self.schema
+        return [Record(schema, row) for row in zip(*self._column_lists())]
+
+    def __iter__(self) -> Iterator[Record]:
+        schema = self.schema
+        return (Record(schema, row) for row in zip(*self._column_lists()))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return 'RecordBatch({!r}, {} records)'.format(self.schema, self._length)
+
+    def _column_lists(self) -> List[list]:
+        # NumPy values are converted to Python ones, as outputs expect
+        return [c.tolist() if np is not None and isinstance(c, np.ndarray) else c
+                for c in self.columns]
+
+
+def adapt_input(processor: Any, data: Union[RecordBatch, Iterable[dict]]):
+    """ Convert a batch to records if `processor` does not accept batches.
+    """
+    if isinstance(data, RecordBatch):
+        accepts_batches = getattr(processor, 'accepts_batches', None)
+        if not (accepts_batches and accepts_batches()):
+            return data.to_records()
+
+    return data
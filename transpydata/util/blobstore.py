@@ -0,0 +1,89 @@
+import os
+import re
+from abc import ABCMeta, abstractmethod
+from uuid import uuid4
+
+
+class IBlobStore(metaclass=ABCMeta):
+    """ Storage for payloads too big to travel inline (claim-check pattern).
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """ Store data.
+
+        Args:
+            data (bytes): Data to store
+
+        Returns:
+            str: Pointer to retrieve the data
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, pointer: str) -> bytes:
+        """ Get data stored with `put`.
+
+        Args:
+            pointer (str): Pointer returned by `put`
+
+        Returns:
+            bytes: Stored data
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, pointer: str):
+        """ Remove data stored with `put`.
+
+        Args:
+            pointer (str): Pointer returned by `put`
+        """
+        raise NotImplementedError
+
+
+class LocalBlobStore(IBlobStore):
+    """ Blob store backed by a local (or shared mounted) directory.
+    """
+
+    POINTER_PREFIX = 'blob://'
+    KEY_RX = re.compile('^[0-9a-f]{32}$') # type: re.Pattern
+
+    def __init__(self, path: str):
+        self.path = path
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def put(self, data: bytes) -> str:
+        key = uuid4().hex
+        with open(os.path.join(self.path, key), 'wb') as f:
+            f.write(data)
+
+        return self.POINTER_PREFIX + key
+
+    def get(self, pointer: str) -> bytes:
+        with open(self._get_blob_path(pointer), 'rb') as f:
+            return f.read()
+
+    def delete(self, pointer: str):
+        try:
+            os.remove(self._get_blob_path(pointer))
+        except FileNotFoundError:
+            pass
+
+    def _get_blob_path(self, pointer: str) -> str:
+        key = pointer[len(self.POINTER_PREFIX):]
+        if not pointer.startswith(self.POINTER_PREFIX) or not self.KEY_RX.match(key):
+            raise RuntimeError("Invalid blob pointer '{}'".format(pointer))
+
+        return os.path.join(self.path, key)
+
+
+def get_blob_store(blob_store) -> IBlobStore:
+    """ Get blob store from config value: an `IBlobStore` instance or a
+        directory path for a `LocalBlobStore`.
+    """
+    if blob_store is None or isinstance(blob_store, IBlobStore):
+        return blob_store
+
+    return LocalBlobStore(blob_store)
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+_MISSING = object()
+
+
+class LRUCache():
+    """ Thread safe bounded LRU cache with optional entries time to live.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        """
+        Args:
+            maxsize (int, optional): Max entries. Defaults to 1024.
+            ttl (float, optional): Seconds an entry is valid. Defaults to
+                `None` (no expiration).
+        """
+        if maxsize < 1:
+            raise RuntimeError("Cache 'maxsize' must be greater than 0")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """ Cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedTransformation():
+    """ Memoize a pure single argument function with an `LRUCache`. Values
+        that are not hashable are passed to the function without caching.
+    """
+
+    def __init__(self, fn: Callable[[Any], Any], maxsize: int = 1024,
+                 ttl: float = None):
+        self.fn = fn
+        self.cache = LRUCache(maxsize, ttl)
+
+    def __call__(self, value: Any) -> Any:
+        try:
+            result = self.cache.get(value, _MISSING)
+        except TypeError:
+            return self.fn(value)
+
+        if result is _MISSING:
+            result = self.fn(value)
+            self.cache.set(value, result)
+
+        return result
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+def cached(fn: Callable[[Any], Any] = None, maxsize: int = 1024,
+           ttl: float = None):
+    """ Mark a transformation as cacheable. Usable as `cached(fn)` or as
+        decorator `@cached(maxsize=5000, ttl=60)`.
+    """
+    if fn is None:
+        return lambda f: CachedTransformation(f, maxsize, ttl)
+
+    return CachedTransformation(fn, maxsize, ttl)
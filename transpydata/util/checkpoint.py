@@ -0,0 +1,156 @@
+import datetime
+import json
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, List, Tuple
+
+from transpydata.util.serialization import default_encoder
+
+
+class CheckpointStore():
+    """ JSON state file written atomically: to a temporary file in the same
+        directory, synced and then renamed over the previous state.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict:
+        """ Stored state, `None` if there is no state file.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.checkpoint_', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf8') as f:
+                json.dump(state, f, default=default_encoder)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class Checkpointer():
+    """ Tracks the input position delivered by the pipeline and saves it
+        every `interval` records. The position is the number of input records
+        (in input order) whose output finished, records with pending
+        (`Future`) output results are committed once they are done.
+
+        The position does not move past a record with a failed result (refer
+        to `is_failed_result`), so a resumed run sends it again, along with
+        the records after it (delivery is at least once). A run with failed
+        records is not saved as finished.
+    """
+
+    VERSION = 1
+
+    def __init__(self, store: CheckpointStore, interval: int = 1000,
+                 state: dict = None,
+                 input_state: Callable[[Any], dict] = None):
+        """
+        Args:
+            store (CheckpointStore): State storage
+            interval (int, optional): Records between saves. Defaults to 1000.
+            state (dict, optional): Resumed state. Defaults to `None`.
+            input_state (Callable[[Any], dict], optional): Returns input state
+                to resume after a record (refer to
+                `ICheckpointable.checkpoint_state`). Defaults to `None`.
+        """
+        state = state or {}
+
+        self.store = store
+        self.interval = interval
+        self.input_state = input_state
+
+        self.position = state.get('position', 0)
+        self.delivered = state.get('delivered', 0)
+        self.failed = state.get('failed', 0)
+        self.input = state.get('input')
+
+        self._pending = deque() # type: Deque[Tuple[int, Any, List[Any]]]
+        self._saved_position = self.position
+        self._blocked = False # A record failed, position is kept before it
+
+    def commit(self, position: int, record: Any, results: List[Any]):
+        """ Input records up to `position` (exclusive) are processed.
+
+        Args:
+            position (int): Input position after the processed records
+            record (Any): Last input record processed
+            results (List[Any]): Output results of the records
+        """
+        self._pending.append((position, record, results))
+        self._advance()
+
+        if self.position - self._saved_position >= self.interval:
+            self.save()
+
+    def save(self, finished: bool = False):
+        self.store.save({
+            'version': self.VERSION,
+            'position': self.position,
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'input': self.input,
+            'finished': finished,
+            'updated_at': datetime.datetime.now(datetime.timezone.utc).isoformat()
+        })
+        self._saved_position = self.position
+
+    def finish(self):
+        """ Commit all pending records (outputs are disposed, so their
+            deferred results are done) and save the final state.
+        """
+        self._advance(wait=True)
+        self.save(finished=not self._blocked)
+
+    def _advance(self, wait: bool = False):
+        while self._pending:
+            position, record, results = self._pending[0]
+            if not wait and any(isinstance(r, Future) and not r.done()
+                                for r in results):
+                break
+
+            self._pending.popleft()
+            failed = sum(map(is_failed_result, results))
+            self.failed += failed
+            self.delivered += len(results) - failed
+
+            self._blocked = self._blocked or failed > 0
+            if self._blocked:
+                continue
+
+            self.position = position
+            if self.input_state is not None and record is not None:
+                self.input = self.input_state(record)
+
+
+def is_failed_result(result: Any) -> bool:
+    """ Whether an output result reports a failure: a `Future` that raised, a
+        result with `success` False (e.g. `SQSDataOutput`) or with an error
+        HTTP status `code` (e.g. `RequestDataOutput`).
+    """
+    if isinstance(result, Future):
+        if result.exception() is not None:
+            return True
+        result = result.result()
+
+    if not isinstance(result, dict):
+        return False
+
+    if result.get('success') is False:
+        return True
+
+    code = result.get('code')
+
+    return isinstance(code, int) and code >= 400
@@ -0,0 +1,122 @@
+import base64
+import gzip
+import zlib
+from typing import Iterable, Iterator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+CODECS = ('zlib', 'zstd', 'gzip', 'deflate')
+HTTP_CODECS = ('gzip', 'deflate') # Valid HTTP `Content-Encoding` values
+
+_ZLIB_WBITS = {'zlib': 15, 'deflate': 15, 'gzip': 31}
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """ Compress data with codec.
+
+    Args:
+        data (bytes): Data to compress
+        codec (str): One of `CODECS`
+
+    Returns:
+        bytes: Compressed data
+    """
+    if codec in ('zlib', 'deflate'):
+        return zlib.compress(data)
+
+    if codec == 'gzip':
+        return gzip.compress(data)
+
+    if codec == 'zstd':
+        return _get_zstandard().ZstdCompressor().compress(data)
+
+    raise RuntimeError("Unknown compression codec '{}'".format(codec))
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """ Decompress data compressed with `compress`.
+
+    Args:
+        data (bytes): Compressed data
+        codec (str): One of `CODECS`
+
+    Returns:
+        bytes: Decompressed data
+    """
+    if codec in ('zlib', 'deflate'):
+        return zlib.decompress(data)
+
+    if codec == 'gzip':
+        return gzip.decompress(data)
+
+    if codec == 'zstd':
+        return _get_zstandard().ZstdDecompressor().decompress(data)
+
+    raise RuntimeError("Unknown compression codec '{}'".format(codec))
+
+
+def compress_stream(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    """ Compress a stream of chunks without holding the whole data in memory.
+
+    Args:
+        chunks (Iterable[bytes]): Data chunks
+        codec (str): One of 'zlib', 'deflate' or 'gzip'
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    if codec not in _ZLIB_WBITS:
+        raise RuntimeError("Codec '{}' does not support streaming".format(codec))
+
+    compressor = zlib.compressobj(wbits=_ZLIB_WBITS[codec])
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def encode_text(text: str, codec: str) -> str:
+    """ Compress text and encode it as base64, to be sent on text only channels.
+
+    Args:
+        text (str): Text to compress
+        codec (str): One of `CODECS`
+
+    Returns:
+        str: Base64 encoded compressed text
+    """
+    return base64.b64encode(compress(text.encode('utf-8'), codec)).decode('ascii')
+
+
+def decode_text(text: str, codec: str) -> str:
+    """ Reverse `encode_text`.
+
+    Args:
+        text (str): Base64 encoded compressed text
+        codec (str): One of `CODECS`
+
+    Returns:
+        str: Original text
+    """
+    return decompress(base64.b64decode(text), codec).decode('utf-8')
+
+
+def check_codec(codec: str):
+    if codec not in CODECS:
+        raise RuntimeError("Unknown compression codec '{}'".format(codec))
+
+    if codec == 'zstd':
+        _get_zstandard()
+
+
+def _get_zstandard():
+    if zstandard is None:
+        raise RuntimeError("'zstandard' package is needed for 'zstd' compression")
+
+    return zstandard
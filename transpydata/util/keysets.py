@@ -0,0 +1,207 @@
+import decimal
+import hashlib
+import math
+import numbers
+import os
+import sqlite3
+import tempfile
+from fractions import Fraction
+from typing import Any
+
+
+def key_digest(key: Any) -> bytes:
+    """ 128 bits digest of a key, from the `repr` of its canonical form.
+        Numbers that compare equal (`1`, `1.0`, `Decimal('1')`) have the
+        same digest. Collisions are negligible (below 1e-18 with 1e9 keys).
+    """
+    return hashlib.blake2b(repr(_canonical(key)).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+def _canonical(value: Any) -> Any:
+    """ Integral numbers as `int`, other finite real numbers as exact
+        `Fraction`, recursively in tuples and lists.
+    """
+    if value is None or type(value) in (str, int, bytes):
+        return value
+
+    if isinstance(value, (tuple, list)):
+        return type(value)(map(_canonical, value))
+
+    if isinstance(value, (numbers.Real, decimal.Decimal)):
+        try:
+            value = Fraction(value)
+        except (ValueError, OverflowError): # NaN and infinity
+            return float(value)
+
+        return value.numerator if value.denominator == 1 else value
+
+    return value
+
+
+class ExactKeySet():
+    """ Set of key digests. When `max_memory_keys` is set, keys over that
+        limit are moved to a SQLite database in a temporary file, so memory
+        use is bounded.
+    """
+
+    def __init__(self, max_memory_keys: int = None, spill_dir: str = None):
+        """
+        Args:
+            max_memory_keys (int, optional): Max keys kept in memory.
+                Defaults to `None` (no limit, never spill).
+            spill_dir (str, optional): Directory of the spill file. Defaults
+                to the system temporary directory.
+        """
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+
+        self._keys = set()
+        self._db = None # type: sqlite3.Connection
+        self._db_path = None # type: str
+        self._spilled = 0
+
+    def add(self, digest: bytes) -> bool:
+        """ Add key digest.
+
+        Returns:
+            bool: Whether key was not in the set.
+        """
+        if digest in self:
+            return False
+
+        self._keys.add(digest)
+        if self.max_memory_keys and len(self._keys) >= self.max_memory_keys:
+            self._spill()
+
+        return True
+
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self._keys or (
+            self._db is not None and self._db.execute(
+                'SELECT 1 FROM keys WHERE k = ?', (digest,)).fetchone() is not None
+        )
+
+    def close(self):
+        """ Remove spill file.
+        """
+        self._keys = set()
+        self._spilled = 0
+        if self._db is not None:
+            self._db.close()
+            os.remove(self._db_path)
+            self._db = None
+
+    def stats(self) -> dict:
+        return {
+            'keys': len(self),
+            'memory_keys': len(self._keys),
+            'spilled_keys': self._spilled
+        }
+
+    def __len__(self) -> int:
+        return len(self._keys) + self._spilled
+
+    def _spill(self):
+        if self._db is None:
+            fd, self._db_path = tempfile.mkstemp(prefix='transpy_keys_',
+                                                 suffix='.sqlite',
+                                                 dir=self.spill_dir)
+            os.close(fd)
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode = OFF')
+            self._db.execute('PRAGMA synchronous = OFF')
+            self._db.execute(
+                'CREATE TABLE keys (k BLOB PRIMARY KEY) WITHOUT ROWID'
+            )
+
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO keys VALUES (?)',
+                                 ((k,) for k in self._keys))
+        self._spilled += len(self._keys)
+        self._keys = set()
+
+
+class BloomKeySet():
+    """ Approximate set of key digests backed by a Bloom filter. `add` may
+        report a new key as already seen with probability `fp_rate` (while
+        less than `capacity` keys are added), it never misses a repeated key.
+        Memory is fixed: about `-capacity * ln(fp_rate) / ln(2)^2` bits
+        (~180 MB for 100M keys at 0.1%).
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 0.001):
+        """
+        Args:
+            capacity (int): Expected number of distinct keys.
+            fp_rate (float, optional): False positive rate at `capacity` keys.
+                Defaults to 0.001.
+        """
+        if capacity < 1 or not 0 < fp_rate < 1:
+            raise RuntimeError(
+                "Bloom filter needs 'capacity' > 0 and 0 < 'fp_rate' < 1"
+            )
+
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+
+        self.num_bits = max(8, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def add(self, digest: bytes) -> bool:
+        """ Add key digest (at least 16 bytes, refer to `key_digest`).
+
+        Returns:
+            bool: Whether key was not in the set (may be a false negative).
+        """
+        bits = self._bits
+
+        new = False
+        for pos in self._positions(digest):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+
+        self._count += new
+
+        return new
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7))
+                   for pos in self._positions(digest))
+
+    def _positions(self, digest: bytes):
+        # Double hashing: bit i is h1 + i * h2, from the two halves of the digest
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        num_bits = self.num_bits
+
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def close(self):
+        """ Release the filter, the set can not be used after this.
+        """
+        self._bits = bytearray()
+        self._count = 0
+
+    def stats(self) -> dict:
+        return {
+            'keys': self._count,
+            'capacity': self.capacity,
+            'memory_bytes': len(self._bits),
+            'expected_fp_rate': self.expected_fp_rate()
+        }
+
+    def expected_fp_rate(self) -> float:
+        """ False positive rate with the keys added so far.
+        """
+        return (1 - math.exp(-self.num_hashes * self._count / self.num_bits)) \
+            ** self.num_hashes
+
+    def __len__(self) -> int:
+        return self._count
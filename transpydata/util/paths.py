@@ -0,0 +1,140 @@
+import re
+from collections.abc import Mapping
+from typing import Any, Set, Tuple, Union
+
+
+MISSING = object()
+
+PATH_TOKEN_RX = re.compile(r"\[(\d+)\]|\['([^']*)'\]|\.?([^.\[\]]+)") # type: re.Pattern
+
+
+def parse_path(path: str) -> Tuple[Union[str, int], ...]:
+    """ Parse a JSONPath-lite path into segments. Supported syntax:
+        `user.address.zip`, `$.user.address.zip`, `items[0].id`, `items.0.id`
+        and `['key.with.dots']`. Integer segments index lists.
+
+    Args:
+        path (str): Path
+
+    Returns:
+        Tuple[Union[str, int], ...]: Path segments
+    """
+    if path.startswith('$'):
+        path = path[1:]
+
+    segments = []
+    pos = 0
+    while pos < len(path):
+        match = PATH_TOKEN_RX.match(path, pos)
+        if not match or match.end() == pos:
+            raise RuntimeError("Invalid path '{}'".format(path))
+
+        index, quoted, key = match.groups()
+        if index is not None:
+            segments.append(int(index))
+        elif quoted is not None:
+            segments.append(quoted)
+        else:
+            segments.append(key)
+        pos = match.end()
+
+    return tuple(segments)
+
+
+def is_nested(key: Any) -> bool:
+    """ Whether a config key is a path to a nested field.
+    """
+    return isinstance(key, str) and len(parse_path(key)) > 1
+
+
+def get_path(root: Any, segments: tuple, default: Any = MISSING) -> Any:
+    """ Get value at path.
+
+    Args:
+        root (Any): Record
+        segments (tuple): Segments returned by `parse_path`
+        default (Any, optional): Returned if path does not exist. Defaults to
+            `MISSING`.
+
+    Returns:
+        Any: Value at path
+    """
+    node = root
+    for seg in segments:
+        node = _get_child(node, seg)
+        if node is MISSING:
+            return default
+
+    return node
+
+
+def set_path(root: dict, segments: tuple, value: Any, copied: Set[int] = None):
+    """ Set value at path, creating missing intermediate dicts.
+
+    Args:
+        root (dict): Record
+        segments (tuple): Segments returned by `parse_path`
+        value (Any): Value
+        copied (Set[int], optional): Copy-on-write mode. Ids of containers
+            owned by the record being built, other containers in the path are
+            copied before being modified (and their copies added). `None`
+            modifies containers in place. Defaults to None.
+    """
+    node = _get_parent(root, segments, copied, True)
+    _set_child(node, segments[-1], value)
+
+
+def delete_path(root: dict, segments: tuple, copied: Set[int] = None):
+    """ Remove value at path if it exists. Refer to `set_path` for `copied`.
+    """
+    if get_path(root, segments) is MISSING:
+        return
+
+    node = _get_parent(root, segments, copied, False)
+    del node[_get_index(node, segments[-1])]
+
+
+def _get_parent(root: dict, segments: tuple, copied: Set[int], create: bool):
+    node = root
+    for seg in segments[:-1]:
+        child = _get_child(node, seg)
+        if not isinstance(child, (Mapping, list)):
+            if not create:
+                return None
+            child = {}
+        elif copied is not None and id(child) not in copied:
+            child = list(child) if isinstance(child, list) else dict(child)
+        else:
+            node = child
+            continue
+
+        if copied is not None:
+            copied.add(id(child))
+        _set_child(node, seg, child)
+        node = child
+
+    return node
+
+
+def _get_child(node: Any, seg: Union[str, int]) -> Any:
+    if isinstance(node, Mapping):
+        return node.get(seg, MISSING)
+
+    if isinstance(node, list):
+        try:
+            return node[int(seg)]
+        except (ValueError, IndexError):
+            return MISSING
+
+    return MISSING
+
+
+def _set_child(node: Any, seg: Union[str, int], value: Any):
+    if isinstance(node, list):
+        node[int(seg)] = value
+    else:
+        node[seg] = value
+
+
+def _get_index(node: Any, seg: Union[str, int]) -> Union[str, int]:
+    return int(seg) if isinstance(node, list) else seg
@@ -0,0 +1,96 @@
+import operator
+from typing import Any, Union
+
+from transpydata.util.paths import MISSING, get_path, parse_path
+
+
+class Predicate():
+    """ Declarative condition on a record field. Operators:
+        '==', '!=', '<', '<=', '>', '>=' (compare with `value`),
+        'in', 'not_in' (`value` is a collection) and 'is_null', 'not_null'
+        (no `value`). Missing fields are null, comparisons on null values are
+        false (as in SQL).
+    """
+
+    COMPARISONS = {
+        '==': operator.eq,
+        '!=': operator.ne,
+        '<': operator.lt,
+        '<=': operator.le,
+        '>': operator.gt,
+        '>=': operator.ge
+    }
+    OPS = tuple(COMPARISONS) + ('in', 'not_in', 'is_null', 'not_null')
+
+    def __init__(self, field: str, op: str, value: Any = None):
+        """
+        Args:
+            field (str): Field name or path to nested field
+                (refer to `transpydata.util.paths.parse_path`)
+            op (str): One of `OPS`
+            value (Any, optional): Value to compare with. Defaults to None.
+        """
+        if op not in self.OPS:
+            raise RuntimeError("Unknown predicate operator '{}'".format(op))
+
+        self.field = field
+        self.op = op
+        self.value = value
+        self.path = parse_path(field) if isinstance(field, str) else (field,)
+
+        if op in ('in', 'not_in'):
+            try:
+                self.value = frozenset(value)
+            except TypeError:
+                self.value = tuple(value)
+
+        self._test = self._compile()
+
+    @property
+    def is_nested(self) -> bool:
+        return len(self.path) > 1
+
+    def __call__(self, record: dict) -> bool:
+        return self._test(record)
+
+    def __repr__(self) -> str:
+        return 'Predicate({!r}, {!r}, {!r})'.format(self.field, self.op, self.value)
+
+    def _compile(self):
+        field = self.path[0]
+        if self.is_nested:
+            path = self.path
+            get_value = lambda r: _none_if_missing(get_path(r, path))
+        else:
+            get_value = lambda r: r.get(field)
+
+        op, value = self.op, self.value
+        if op == 'is_null':
+            return lambda r: get_value(r) is None
+        if op == 'not_null':
+            return lambda r: get_value(r) is not None
+        if op == 'in':
+            return lambda r: _not_none(get_value(r), value.__contains__)
+        if op == 'not_in':
+            return lambda r: _not_none(get_value(r), lambda v: v not in value)
+
+        compare = self.COMPARISONS[op]
+        return lambda r: _not_none(get_value(r), lambda v: compare(v, value))
+
+
+def get_predicate(predicate: Union[dict, Predicate]) -> Predicate:
+    """ Get predicate from config value: a `Predicate` instance or a dict with
+        'field', 'op' and 'value' keys.
+    """
+    if isinstance(predicate, Predicate):
+        return predicate
+
+    return Predicate(predicate['field'], predicate['op'], predicate.get('value'))
+
+
+def _none_if_missing(value: Any) -> Any:
+    return None if value is MISSING else value
+
+
+def _not_none(value: Any, test) -> bool:
+    return value is not None and test(value)
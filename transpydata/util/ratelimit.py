@@ -0,0 +1,199 @@
+import threading
+import time
+from typing import Union
+
+
+class TokenBucket():
+    """ Thread safe token bucket. `acquire` blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self._lock = threading.Lock()
+        self._rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float):
+        with self._lock:
+            self._refill()
+            self._rate = float(rate)
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                wait = (tokens - self._tokens) / self._rate
+
+            time.sleep(wait)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+class AdaptiveRateLimiter():
+    """ Rate and concurrency limiter for outputs. Requests per second are
+        limited with a token bucket and requests in flight with a concurrency
+        limit. Both limits are adjusted with AIMD (additive increase,
+        multiplicative decrease): they grow while requests succeed under the
+        latency target and shrink when the destination throttles or responses
+        get slower than the target.
+
+        One instance can be shared by several outputs writing to the same
+        destination.
+    """
+
+    def __init__(self, target_rps: float = None, max_concurrency: int = None,
+                 min_concurrency: int = 1, initial_concurrency: int = None,
+                 latency_target: float = None, min_rps: float = 1.0,
+                 increase: float = 1.0, decrease: float = 0.5):
+        """
+        Args:
+            target_rps (float, optional): Max requests per second. `None`
+                disables rate limiting.
+            max_concurrency (int, optional): Max requests in flight. `None`
+                disables concurrency limiting.
+            min_concurrency (int, optional): Lower bound of the concurrency
+                limit. Defaults to 1.
+            initial_concurrency (int, optional): Starting concurrency limit.
+                Defaults to `max_concurrency`.
+            latency_target (float, optional): Latency in seconds above which
+                limits are decreased. Defaults to `None` (only throttling and
+                errors decrease limits).
+            min_rps (float, optional): Lower bound of the rate limit.
+                Defaults to 1.0.
+            increase (float, optional): Additive increase, in requests per
+                second (rate) and requests (concurrency), applied every round
+                trip without errors. Defaults to 1.0.
+            decrease (float, optional): Multiplicative decrease factor.
+                Defaults to 0.5.
+        """
+        self.target_rps = target_rps
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.min_rps = min_rps
+        self.increase = increase
+        self.decrease = decrease
+
+        self._bucket = TokenBucket(target_rps) if target_rps else None
+        self._concurrency_limit = float(initial_concurrency or max_concurrency or 0)
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._last_decrease = 0.0
+
+        self._requests = 0
+        self._throttled = 0
+        self._errors = 0
+        self._latency_total = 0.0
+
+    def acquire(self) -> float:
+        """ Wait until a request can be sent.
+
+        Returns:
+            float: Request start time, to be passed to `release`
+        """
+        with self._cond:
+            while (self.max_concurrency
+                   and self._in_flight >= int(self._concurrency_limit)):
+                self._cond.wait()
+            self._in_flight += 1
+
+        if self._bucket:
+            self._bucket.acquire()
+
+        return time.monotonic()
+
+    def release(self, start: float, success: bool = True,
+                throttled: bool = False):
+        """ Report a finished request and adjust limits.
+
+        Args:
+            start (float): Value returned by `acquire`
+            success (bool, optional): Request succeeded. Defaults to True.
+            throttled (bool, optional): Destination throttled the request.
+                Defaults to False.
+        """
+        now = time.monotonic()
+        latency = now - start
+        with self._cond:
+            self._in_flight -= 1
+            self._requests += 1
+            self._latency_total += latency
+            self._throttled += int(throttled)
+            self._errors += int(not success and not throttled)
+
+            slow = self.latency_target is not None and latency > self.latency_target
+            if throttled or not success or slow:
+                self._decrease_limits(now, latency)
+            else:
+                self._increase_limits()
+
+            self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        """ Current limits and counters.
+        """
+        with self._cond:
+            return {
+                'rate_limit': self._bucket.rate if self._bucket else None,
+                'target_rps': self.target_rps,
+                'concurrency_limit': (int(self._concurrency_limit)
+                                      if self.max_concurrency else None),
+                'in_flight': self._in_flight,
+                'requests': self._requests,
+                'throttled': self._throttled,
+                'errors': self._errors,
+                'avg_latency': (self._latency_total / self._requests
+                                if self._requests else 0.0)
+            }
+
+    def _increase_limits(self):
+        if self.max_concurrency:
+            self._concurrency_limit = min(
+                self.max_concurrency,
+                self._concurrency_limit + self.increase / max(self._concurrency_limit, 1)
+            )
+
+        if self._bucket:
+            rate = self._bucket.rate
+            self._bucket.rate = min(self.target_rps,
+                                    rate + self.increase / max(rate, 1))
+
+    def _decrease_limits(self, now: float, latency: float):
+        # Responses of requests sent before the last decrease reflect the old
+        # limits, decrease once per round trip
+        if now - self._last_decrease < latency:
+            return
+        self._last_decrease = now
+
+        if self.max_concurrency:
+            self._concurrency_limit = max(self.min_concurrency,
+                                          self._concurrency_limit * self.decrease)
+
+        if self._bucket:
+            self._bucket.rate = max(self.min_rps, self._bucket.rate * self.decrease)
+
+
+def get_rate_limiter(rate_limit: Union[dict, AdaptiveRateLimiter],
+                     **defaults) -> AdaptiveRateLimiter:
+    """ Get rate limiter from config value: an `AdaptiveRateLimiter` instance
+        (to share it between outputs) or a dict with its init arguments.
+    """
+    if rate_limit is None or isinstance(rate_limit, AdaptiveRateLimiter):
+        return rate_limit
+
+    return AdaptiveRateLimiter(**{**defaults, **rate_limit})
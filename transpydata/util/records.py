@@ -0,0 +1,93 @@
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+
+class Schema():
+    """ Field names of records with the same shape. Schemas are interned by
+        `get`, so records with the same fields share one instance.
+    """
+
+    __slots__ = ('fields', 'index')
+
+    _schemas = {} # type: Dict[tuple, Schema]
+
+    def __init__(self, fields: Iterable[Any]):
+        self.fields = tuple(fields)
+        self.index = {f: i for i, f in enumerate(self.fields)}
+
+    @classmethod
+    def get(cls, fields: Iterable[Any]) -> 'Schema':
+        """ Get the shared schema of `fields`.
+        """
+        fields = tuple(fields)
+        schema = cls._schemas.get(fields)
+        if schema is None:
+            schema = cls._schemas.setdefault(fields, cls(fields))
+
+        return schema
+
+    def __reduce__(self):
+        return (Schema.get, (self.fields,))
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __repr__(self) -> str:
+        return 'Schema({!r})'.format(self.fields)
+
+
+class Record(Mapping):
+    """ Compact read-only record: a shared `Schema` and a tuple of values
+        (`row`).
+        It is a `Mapping`, so it can be used where dict records are read.
+        Processes modifying records build dicts from it (e.g. `{**record}`).
+    """
+
+    __slots__ = ('schema', 'row')
+
+    def __init__(self, schema: Schema, row: Tuple[Any, ...]):
+        self.schema = schema
+        self.row = row
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Record':
+        return cls(Schema.get(data), tuple(data.values()))
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.schema.fields, self.row))
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.row[self.schema.index[key]]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        i = self.schema.index.get(key)
+        return default if i is None else self.row[i]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.schema.index
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.schema.fields)
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    def items(self) -> ItemsView:
+        return _RecordItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _RecordValuesView(self)
+
+    def __repr__(self) -> str:
+        return 'Record({!r})'.format(self.to_dict())
+
+
+class _RecordItemsView(ItemsView):
+    def __iter__(self):
+        record = self._mapping
+        return zip(record.schema.fields, record.row)
+
+
+class _RecordValuesView(ValuesView):
+    def __iter__(self):
+        return iter(self._mapping.row)
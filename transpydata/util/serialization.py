@@ -0,0 +1,161 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
+from collections.abc import Mapping
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+from transpydata.util.records import Record
+
+
+def default_encoder(obj: Any) -> Any:
+    """ Encode values JSON backends do not support natively. Covers the types
+        returned by database drivers (dates, decimals, blobs) and mappings that
+        are not dicts.
+
+    Args:
+        obj (Any): Value to encode
+
+    Raises:
+        TypeError: If value type is not supported
+
+    Returns:
+        Any: JSON serializable value
+    """
+    if type(obj) is Record:
+        return obj.to_dict()
+
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+
+    if isinstance(obj, decimal.Decimal):
+        # As string, floats lose precision of DECIMAL columns (e.g. money)
+        return str(obj)
+
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(obj)).decode('ascii')
+
+    if isinstance(obj, Mapping):
+        return dict(obj)
+
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+
+    raise TypeError(
+        "Object of type '{}' is not JSON serializable".format(type(obj).__name__)
+    )
+
+
+class JsonSerializer():
+    """ Serializer using stdlib `json`.
+    """
+
+    name = 'json'
+
+    def __init__(self, default: Callable[[Any], Any] = None):
+        self._default = default or default_encoder
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, default=self._default)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """ Serializer using `orjson` (optional dependency).
+    """
+
+    name = 'orjson'
+
+    def __init__(self, default: Callable[[Any], Any] = None):
+        if orjson is None:
+            raise RuntimeError("'orjson' package is not installed")
+
+        super().__init__(default)
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=self._default,
+                            option=self._options).decode('utf-8')
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+class UjsonSerializer(JsonSerializer):
+    """ Serializer using `ujson` (optional dependency).
+    """
+
+    name = 'ujson'
+
+    def __init__(self, default: Callable[[Any], Any] = None):
+        if ujson is None:
+            raise RuntimeError("'ujson' package is not installed")
+
+        super().__init__(default)
+
+    def dumps(self, obj: Any) -> str:
+        return ujson.dumps(obj, default=self._default)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return ujson.loads(data)
+
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+    UjsonSerializer.name: UjsonSerializer
+}
+
+
+def get_serializer(serializer: Union[str, JsonSerializer] = 'auto',
+                   default: Callable[[Any], Any] = None) -> JsonSerializer:
+    """ Get a serializer instance. With 'auto' the fastest installed backend is
+        used (orjson, ujson, then stdlib json).
+
+    Args:
+        serializer (Union[str, JsonSerializer], optional): Backend name ('auto',
+            'json', 'orjson', 'ujson') or an object with `dumps` and `loads`
+            methods, which is returned as is. Defaults to 'auto'.
+        default (Callable[[Any], Any], optional): Hook to encode values not
+            supported by the backend. Defaults to `default_encoder`.
+
+    Returns:
+        JsonSerializer: Serializer
+    """
+    if serializer is None:
+        serializer = 'auto'
+
+    if not isinstance(serializer, str):
+        return serializer
+
+    if serializer == 'auto':
+        if orjson is not None:
+            serializer = OrjsonSerializer.name
+        elif ujson is not None:
+            serializer = UjsonSerializer.name
+        else:
+            serializer = JsonSerializer.name
+
+    if serializer not in SERIALIZERS:
+        raise RuntimeError("Unknown serializer '{}'".format(serializer))
+
+    return SERIALIZERS[serializer](default)
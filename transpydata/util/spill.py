@@ -0,0 +1,149 @@
+import os
+import pickle
+import tempfile
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List
+
+
+class SpillFile():
+    """ Temporary file of pickled frames, written sequentially and read back
+        in the same order. The file is removed on `close`.
+    """
+
+    def __init__(self, spill_dir: str = None, prefix: str = 'transpy_spill_'):
+        fd, self.path = tempfile.mkstemp(prefix=prefix, dir=spill_dir)
+        self._file = os.fdopen(fd, 'w+b')
+        self.frames = 0
+
+    def write(self, obj: Any) -> int:
+        """ Append a frame.
+
+        Returns:
+            int: Frame offset in the file
+        """
+        offset = self._file.tell()
+        pickle.dump(obj, self._file, pickle.HIGHEST_PROTOCOL)
+        self.frames += 1
+
+        return offset
+
+    def read(self, offset: int) -> Any:
+        """ Read the frame at `offset` (returned by `write`).
+        """
+        self._file.flush()
+        self._file.seek(offset)
+        obj = pickle.load(self._file)
+        self._file.seek(0, os.SEEK_END)
+
+        return obj
+
+    def __iter__(self) -> Iterator[Any]:
+        """ Read all frames, from a separate file handle so writing can go on.
+        """
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            for _ in range(self.frames):
+                yield pickle.load(f)
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self.path)
+
+
+class RecordSpool(Sequence):
+    """ Append-only record sequence with a memory budget. Records are kept in
+        a list until there are more than `memory_budget`, then they are
+        written to a `SpillFile` in frames of `frame_size` records, and only
+        the last incomplete frame stays in memory. Reading (by index, slice
+        or iteration) loads one frame at a time.
+    """
+
+    def __init__(self, memory_budget: int, spill_dir: str = None,
+                 frame_size: int = 1000):
+        """
+        Args:
+            memory_budget (int): Max records in memory before spilling.
+            spill_dir (str, optional): Directory of the spill file. Defaults
+                to the system temporary directory.
+            frame_size (int, optional): Records per frame. Defaults to 1000.
+        """
+        if frame_size < 1:
+            raise RuntimeError("'frame_size' must be greater than 0")
+
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.frame_size = frame_size
+
+        self._buffer = [] # type: list
+        self._file = None # type: SpillFile
+        self._offsets = [] # type: List[int]
+        self._frame = (None, None) # Last frame read: (index, records)
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def append(self, record: Any):
+        self._buffer.append(record)
+        if self._file is not None:
+            if len(self._buffer) >= self.frame_size:
+                self._write_frames()
+        elif len(self._buffer) > self.memory_budget:
+            self._file = SpillFile(self.spill_dir, 'transpy_records_')
+            self._write_frames()
+
+    def extend(self, records: Iterable[Any]):
+        for record in records:
+            self.append(record)
+
+    def close(self):
+        """ Remove spill file and drop records.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = []
+        self._offsets = []
+        self._frame = (None, None)
+
+    def __len__(self) -> int:
+        return len(self._offsets) * self.frame_size + len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('RecordSpool index out of range')
+
+        frame_i, pos = divmod(index, self.frame_size)
+        if frame_i == len(self._offsets):
+            return self._buffer[pos]
+
+        if self._frame[0] != frame_i:
+            self._frame = (frame_i, self._file.read(self._offsets[frame_i]))
+
+        return self._frame[1][pos]
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._file is not None:
+            for frame in self._file:
+                yield from frame
+        yield from list(self._buffer)
+
+    def _write_frames(self):
+        """ Write full frames of the buffer, keep the rest in memory.
+        """
+        size = self.frame_size
+        full = len(self._buffer) - len(self._buffer) % size
+        for i in range(0, full, size):
+            self._offsets.append(self._file.write(self._buffer[i:i + size]))
+
+        self._buffer = self._buffer[full:]
@@ -0,0 +1,238 @@
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+
+class WorkQueue():
+    """ Queue of work units in a directory, shared by workers of one machine
+        or of several ones (on a shared filesystem). Each unit is a JSON file
+        that moves between state directories with atomic renames:
+
+        - `pending/<unit>.json`: waiting for a worker
+        - `claimed/<unit>__<worker>.json`: leased by a worker, it updates the
+          file modification time as heartbeat
+        - `done/<unit>.json`: finished, with the unit metrics
+        - `failed/<unit>.json`: failed `max_attempts` times
+
+        Claimed units without heartbeat for `lease_timeout` seconds are moved
+        back to pending (`requeue_expired`), so units of dead workers are
+        reassigned. A worker whose unit was reassigned can not complete it.
+    """
+
+    STATES = ('pending', 'claimed', 'done', 'failed')
+
+    def __init__(self, path: str, lease_timeout: float = 60.0,
+                 max_attempts: int = 3):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        for state in self.STATES + ('stolen',):
+            os.makedirs(self._dir(state), exist_ok=True)
+
+    def submit(self, units: Iterable[dict]) -> int:
+        """ Add units to pending. Units need a unique 'id' (str), units
+            already in the queue are not added again.
+
+        Returns:
+            int: Units added
+        """
+        known = {self._unit_id(n) for state in self.STATES
+                 for n in os.listdir(self._dir(state))}
+
+        added = 0
+        for unit in units:
+            if str(unit['id']) in known: continue
+
+            self._write(self._path('pending', unit['id']),
+                        {'attempts': 0, **unit})
+            added += 1
+
+        return added
+
+    def claim(self, worker_id: str) -> Union[Tuple[dict, str], None]:
+        """ Lease a pending unit.
+
+        Returns:
+            Union[Tuple[dict, str], None]: Unit and claim (needed for
+                `heartbeat`, `complete` and `release`). `None` if there are
+                no pending units.
+        """
+        for name in sorted(os.listdir(self._dir('pending'))):
+            if not name.endswith('.json'): continue
+
+            claim = os.path.join(self._dir('claimed'), '{}__{}.json'.format(
+                self._unit_id(name), worker_id
+            ))
+            try:
+                os.rename(os.path.join(self._dir('pending'), name), claim)
+            except FileNotFoundError: # Claimed by other worker
+                continue
+
+            os.utime(claim)
+            return self._read(claim), claim
+
+        return None
+
+    def heartbeat(self, claim: str) -> bool:
+        """ Renew the lease. Returns `False` if the lease was lost.
+        """
+        try:
+            os.utime(claim)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, claim: str, metrics: dict) -> bool:
+        """ Mark a claimed unit as done.
+
+        Returns:
+            bool: Whether the lease was still held.
+        """
+        try:
+            unit = self._read(claim)
+            done = self._path('done', unit['id'])
+            os.rename(claim, done)
+        except FileNotFoundError:
+            return False
+
+        self._write(done, {**unit, 'metrics': metrics})
+
+        return True
+
+    def release(self, claim: str, error: str = None) -> bool:
+        """ Give a claimed unit back after a failure. It goes to pending, or to
+            failed after `max_attempts`.
+
+        Returns:
+            bool: Whether the lease was still held.
+        """
+        stolen = self._steal(claim)
+        if stolen is None:
+            return False
+
+        self._retry(stolen, error)
+
+        return True
+
+    def requeue_expired(self) -> int:
+        """ Move claimed units without heartbeat for `lease_timeout` back to
+            pending (or to failed after `max_attempts`).
+
+        Returns:
+            int: Units requeued
+        """
+        requeued = 0
+        now = time.time()
+        for name in os.listdir(self._dir('claimed')):
+            claim = os.path.join(self._dir('claimed'), name)
+            try:
+                expired = now - os.path.getmtime(claim) > self.lease_timeout
+            except FileNotFoundError:
+                continue
+
+            if not expired: continue
+
+            stolen = self._steal(claim)
+            if stolen is not None:
+                self._retry(stolen, 'Lease expired')
+                requeued += 1
+
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        return {state: len([n for n in os.listdir(self._dir(state))
+                            if n.endswith('.json')])
+                for state in self.STATES}
+
+    def is_finished(self) -> bool:
+        counts = self.counts()
+        return not counts['pending'] and not counts['claimed']
+
+    def units(self, state: str) -> List[dict]:
+        units = []
+        for name in sorted(os.listdir(self._dir(state))):
+            if not name.endswith('.json'): continue
+            try:
+                units.append(self._read(os.path.join(self._dir(state), name)))
+            except FileNotFoundError:
+                continue
+
+        return units
+
+    def _steal(self, claim: str) -> Union[str, None]:
+        """ Take a claim from its worker, atomically. `None` if it is gone
+            (completed or taken by another process).
+        """
+        stolen = os.path.join(self._dir('stolen'), uuid.uuid4().hex + '.json')
+        try:
+            os.rename(claim, stolen)
+        except FileNotFoundError:
+            return None
+
+        return stolen
+
+    def _retry(self, stolen: str, error: str):
+        unit = self._read(stolen)
+        unit['attempts'] = unit.get('attempts', 0) + 1
+        unit['error'] = error
+
+        state = 'failed' if unit['attempts'] >= self.max_attempts else 'pending'
+        self._write(self._path(state, unit['id']), unit)
+        os.remove(stolen)
+
+    def _dir(self, state: str) -> str:
+        return os.path.join(self.path, state)
+
+    def _path(self, state: str, unit_id: Any) -> str:
+        return os.path.join(self._dir(state), '{}.json'.format(unit_id))
+
+    @staticmethod
+    def _unit_id(name: str) -> str:
+        return name[:-len('.json')].split('__')[0]
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        with open(path, 'r', encoding='utf8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write(path: str, data: dict):
+        """ Write atomically (temporary file renamed over `path`).
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix='.unit_', suffix='.tmp',
+                                        dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w', encoding='utf8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+def source_slices(length: int, unit_size: int) -> List[dict]:
+    """ Work units with slices (`datainput_slice`) of an input of `length`
+        records.
+    """
+    if unit_size < 1:
+        raise RuntimeError("'unit_size' must be greater than 0")
+
+    return [{'id': 'slice_{:08d}'.format(start), 'kind': 'slice',
+             'start': start, 'stop': min(start + unit_size, length)}
+            for start in range(0, length, unit_size)]
+
+
+def key_ranges(key: str, low: int, high: int, num_units: int) -> List[dict]:
+    """ Work units splitting integer `key` values in [low, high] into
+        `num_units` ranges (unit 'low' inclusive, 'high' exclusive).
+    """
+    if num_units < 1:
+        raise RuntimeError("'num_units' must be greater than 0")
+
+    num_units = max(1, min(num_units, high - low + 1))
+    step = (high - low + 1) / num_units
+    bounds = [low + round(i * step) for i in range(num_units)] + [high + 1]
+
+    return [{'id': 'range_{:08d}'.format(i), 'kind': 'key_range', 'key': key,
+             'low': bounds[i], 'high': bounds[i + 1]}
+            for i in range(num_units)]